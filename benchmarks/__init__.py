@@ -0,0 +1 @@
+"""Suite de benchmarks des fonctions backend, sur une école synthétique en base locale."""
@@ -0,0 +1,270 @@
+"""
+Mesure le coût d'une interaction sur un vrai serveur Streamlit.
+
+Un serveur `streamlit run` est lancé sur une base SQLite synthétique, puis un client
+websocket minimal rejoue ce que fait le navigateur : il envoie l'état des widgets
+(`BackMsg.rerun_script`), avec l'identifiant du fragment quand le widget en fait
+partie, et lit les `ForwardMsg` jusqu'à la fin de l'exécution. Pour chaque scénario :
+
+- durée de l'exécution vue du client (p50/p95) ;
+- temps CPU consommé par le processus serveur (lu dans /proc, Linux seulement) ;
+- octets et messages reçus sur le websocket ;
+- part des exécutions limitées à un fragment.
+
+    python -m benchmarks.app_interactions --runs 20
+    python -m benchmarks.app_interactions --app /chemin/vers/une/autre/version/app.py
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from benchmarks.run import percentile
+
+CREDENTIALS = [
+    {'id': 'ADMIN', 'role': 'ADMIN', 'password': 'admin'},
+    {'id': 'LT', 'role': 'DELEGATE', 'password': 'lt'},
+]
+
+
+def cpu_seconds(pid):
+    """Temps CPU (utilisateur + système) du processus, en secondes ; None hors Linux."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+class BrowserSession:
+    """Client websocket qui rejoue les exécutions déclenchées par le navigateur."""
+
+    def __init__(self, port, server_pid):
+        from websockets.sync.client import connect
+
+        self.server_pid = server_pid
+        self.ws = connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"],
+                          max_size=None, open_timeout=30)
+        self.widgets = {}   # id -> (type, proto de l'élément, fragment)
+        self.states = {}    # id -> WidgetState envoyé (valeurs conservées d'une exécution à l'autre)
+        self.pages = {}     # url_pathname -> page_script_hash
+        self.page_script_hash = ''
+
+    def close(self):
+        self.ws.close()
+
+    def find(self, key=None, kind=None, label=None):
+        for widget_id, (widget_type, proto, fragment_id) in self.widgets.items():
+            if key is not None and not widget_id.endswith(f"-{key}"):
+                continue
+            if kind is not None and widget_type != kind:
+                continue
+            if label is not None and label not in getattr(proto, 'label', ''):
+                continue
+            return widget_id, fragment_id
+        raise LookupError(f"widget introuvable : key={key} kind={kind} label={label}")
+
+    def rerun(self, changes=(), fragment_id='', page=None):
+        """Envoie `changes` (WidgetState) et attend la fin de l'exécution : durée, CPU serveur, octets, messages."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        if page is not None:
+            self.page_script_hash = self.pages[page]
+        msg = BackMsg()
+        client_state = msg.rerun_script
+        client_state.page_script_hash = self.page_script_hash
+        client_state.fragment_id = fragment_id
+        triggers = []
+        for state in changes:
+            if state.WhichOneof('value') == 'trigger_value':
+                triggers.append(state)
+            else:
+                self.states[state.id] = state
+        client_state.widget_states.widgets.extend(list(self.states.values()) + triggers)
+
+        cpu_before = cpu_seconds(self.server_pid)
+        started = time.perf_counter()
+        self.ws.send(msg.SerializeToString())
+        received = messages = 0
+        while True:
+            data = self.ws.recv(timeout=120)
+            received += len(data)
+            messages += 1
+            forward = ForwardMsg()
+            forward.ParseFromString(data)
+            kind = forward.WhichOneof('type')
+            if kind == 'new_session':
+                if not forward.new_session.fragment_ids_this_run:
+                    self.widgets = {}
+            elif kind == 'navigation':
+                self.pages = {p.url_pathname: p.page_script_hash for p in forward.navigation.app_pages}
+            elif kind == 'delta' and forward.delta.WhichOneof('type') == 'new_element':
+                element = forward.delta.new_element
+                element_type = element.WhichOneof('type')
+                proto = getattr(element, element_type)
+                if element_type == 'exception':
+                    raise RuntimeError(proto.message)
+                widget_id = getattr(proto, 'id', '')
+                if widget_id:
+                    self.widgets[widget_id] = (element_type, proto, forward.delta.fragment_id)
+            elif kind == 'script_finished':
+                status = forward.script_finished
+                if status in (ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY):
+                    break
+                if status == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise RuntimeError("erreur de compilation du script")
+        elapsed = time.perf_counter() - started
+        cpu_after = cpu_seconds(self.server_pid)
+        return {
+            'ms': elapsed * 1000,
+            'cpu_ms': (cpu_after - cpu_before) * 1000 if cpu_before is not None else None,
+            'bytes': received,
+            'messages': messages,
+            'fragment': status == ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY,
+        }
+
+    def interact(self, widget_id, fragment_id, **value):
+        """Change la valeur d'un widget (`string_value=...`, `trigger_value=True`...) comme le navigateur."""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        state = WidgetState(id=widget_id, **value)
+        return self.rerun([state], fragment_id=fragment_id)
+
+    def click(self, **find):
+        widget_id, fragment_id = self.find(kind='button', **find)
+        return self.interact(widget_id, fragment_id, trigger_value=True)
+
+    def login(self, identifier, password):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        self.click(key='nav_admin_access')
+        user = self.find(key='login_identifier')[0]
+        secret = self.find(key='login_password')[0]
+        button = self.find(kind='button', label='Se connecter')[0]
+        self.rerun([WidgetState(id=user, string_value=identifier), WidgetState(id=secret, string_value=password),
+                    WidgetState(id=button, trigger_value=True)])
+
+
+def editor_toggle(session, column, index):
+    """Coche / décoche la première ligne de la grille éditable de la page (alternativement)."""
+    widget_id, fragment_id = next(
+        (widget_id, fragment_id) for widget_id, (kind, proto, fragment_id) in session.widgets.items()
+        if kind == 'dataframe' and proto.editing_mode
+    )
+    edits = {'edited_rows': {'0': {column: False}} if index % 2 == 0 else {}, 'added_rows': [], 'deleted_rows': []}
+    return session.interact(widget_id, fragment_id, string_value=json.dumps(edits))
+
+
+def search_scenario(session, index):
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+    widget_id, fragment_id = session.find(key='main_search')
+    button_id = session.find(key='search_btn')[0]
+    return session.rerun([WidgetState(id=widget_id, string_value=('LF-LT-0001', 'LF-GC-0002')[index % 2]),
+                          WidgetState(id=button_id, trigger_value=True)], fragment_id=fragment_id)
+
+
+def setup_roll_call(session):
+    session.login('LT', 'lt')
+    session.click(key='load_students')
+
+
+def setup_correction(session):
+    session.login('ADMIN', 'admin')
+    session.rerun(page='corrections')
+    session.click(key='load_session')
+
+
+def admin_search_scenario(session, index):
+    widget_id, fragment_id = session.find(key='student_search')
+    return session.interact(widget_id, fragment_id, string_value=('ko', 'am')[index % 2])
+
+
+# scénario -> (préparation, interaction mesurée)
+SCENARIOS = {
+    'recherche publique': (lambda session: None, search_scenario),
+    "case de l'appel": (setup_roll_call, lambda session, i: editor_toggle(session, 'Présent', i)),
+    'grille de correction': (setup_correction, lambda session, i: editor_toggle(session, 'Présent', i)),
+    'onglet Super Admin': (lambda session: session.login('ADMIN', 'admin'), admin_search_scenario),
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(app, port, env):
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', os.path.basename(app), '--server.headless', 'true',
+         '--server.port', str(port), '--server.address', '127.0.0.1', '--browser.gatherUsageStats', 'false',
+         '--server.fileWatcherType', 'none'],
+        cwd=os.path.dirname(app), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=2):
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("le serveur Streamlit n'a pas démarré")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Coût d'une interaction sur un serveur Streamlit réel.")
+    parser.add_argument('--app', default='app.py', help="point d'entrée Streamlit")
+    parser.add_argument('--runs', type=int, default=20, help="interactions chronométrées par scénario")
+    parser.add_argument('--warmup', type=int, default=3, help="interactions non chronométrées avant la mesure")
+    parser.add_argument('--students', type=int, default=50, help="étudiants par filière de la base synthétique")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        from benchmarks.synthetic import generate_school
+        from epl.repository import create_repository
+
+        db_path = os.path.join(workdir, 'bench.db')
+        repo = create_repository('sqlite', path=db_path)
+        generate_school(repo, students_per_stream=args.students)
+        repo.upsert_credentials(CREDENTIALS)
+
+        env = dict(os.environ, DATA_BACKEND='sqlite', SQLITE_PATH=db_path,
+                   OUTBOX_PATH=os.path.join(workdir, 'outbox.db'))
+        port = free_port()
+        server = start_server(os.path.abspath(args.app), port, env)
+        try:
+            print(f"{'scénario':<22}{'p50 (ms)':>10}{'p95 (ms)':>10}{'CPU serveur (ms)':>18}"
+                  f"{'reçu (Ko)':>11}{'messages':>10}{'fragment':>10}")
+            for name, (setup, interaction) in SCENARIOS.items():
+                session = BrowserSession(port, server.pid)
+                try:
+                    session.rerun()
+                    setup(session)
+                    for i in range(args.warmup):
+                        interaction(session, i)
+                    results = [interaction(session, args.warmup + i) for i in range(args.runs)]
+                finally:
+                    session.close()
+                timings = [r['ms'] for r in results]
+                cpu = [r['cpu_ms'] for r in results if r['cpu_ms'] is not None]
+                print(f"{name:<22}{percentile(timings, 50):>10.1f}{percentile(timings, 95):>10.1f}"
+                      f"{(sum(cpu) / len(cpu) if cpu else float('nan')):>18.1f}"
+                      f"{sum(r['bytes'] for r in results) / len(results) / 1024:>11.1f}"
+                      f"{sum(r['messages'] for r in results) / len(results):>10.1f}"
+                      f"{sum(r['fragment'] for r in results) / len(results):>10.0%}")
+        finally:
+            server.terminate()
+            server.wait(10)
+
+
+if __name__ == '__main__':
+    main()
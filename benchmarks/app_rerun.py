@@ -0,0 +1,98 @@
+"""
+Mesure le coût d'une exécution du script Streamlit, page par page.
+
+Pour chaque profil (visiteur, délégué, professeur, admin), un processus neuf exécute
+l'application avec `AppTest` sur une base SQLite synthétique :
+
+- premier rendu à froid : imports de l'application, initialisation des ressources
+  partagées et premier affichage (l'import de Streamlit lui-même n'est pas compté) ;
+- réexécutions à chaud : p50/p95 de `--runs` réexécutions de la même page, ce que
+  coûte chaque interaction ;
+- les modules lourds effectivement chargés (altair).
+
+    python -m benchmarks.app_rerun --runs 20
+    python -m benchmarks.app_rerun --app app.py --students 100
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.run import percentile
+
+# profil -> (rôle, périmètre) placés dans la session avant la première exécution
+PROFILES = {
+    'visiteur': (None, None),
+    'délégué': ('DELEGATE', 'LT'),
+    'professeur': ('PROF', 'ALL'),
+    'admin': ('ADMIN', 'ALL'),
+}
+
+
+def measure(app, role, scope, runs):
+    """Exécuté dans le processus enfant : retourne les mesures d'un profil."""
+    from streamlit.testing.v1 import AppTest
+
+    started = time.perf_counter()
+    at = AppTest.from_file(os.path.abspath(app), default_timeout=120)
+    if role:
+        at.session_state['user_role'] = role
+        at.session_state['user_scope'] = scope
+    at.run()
+    first = time.perf_counter() - started
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+    reruns = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        at.run()
+        reruns.append((time.perf_counter() - started) * 1000)
+    return {
+        'first_run_ms': first * 1000,
+        'rerun_p50_ms': percentile(reruns, 50),
+        'rerun_p95_ms': percentile(reruns, 95),
+        'altair_loaded': 'altair' in sys.modules,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Coût des exécutions du script Streamlit, par profil.")
+    parser.add_argument('--app', default='app.py', help="point d'entrée Streamlit")
+    parser.add_argument('--runs', type=int, default=20, help="réexécutions chronométrées par profil")
+    parser.add_argument('--students', type=int, default=50, help="étudiants par filière de la base synthétique")
+    parser.add_argument('--child', nargs=2, metavar=('ROLE', 'SCOPE'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        role, scope = (None if value == '-' else value for value in args.child)
+        print(json.dumps(measure(args.app, role, scope, args.runs)))
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        from benchmarks.synthetic import generate_school
+        from epl.repository import create_repository
+
+        db_path = os.path.join(workdir, 'bench.db')
+        repo = create_repository('sqlite', path=db_path)
+        generate_school(repo, students_per_stream=args.students)
+
+        env = dict(os.environ, DATA_BACKEND='sqlite', SQLITE_PATH=db_path,
+                   OUTBOX_PATH=os.path.join(workdir, 'outbox.db'))
+        print(f"{'profil':<12}{'1er rendu (ms)':>16}{'réexéc. p50':>14}{'réexéc. p95':>14}  altair")
+        for name, (role, scope) in PROFILES.items():
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.app_rerun', '--app', args.app, '--runs', str(args.runs),
+                 '--child', role or '-', scope or '-'],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{name:<12}{result['first_run_ms']:>16.0f}{result['rerun_p50_ms']:>14.1f}"
+                  f"{result['rerun_p95_ms']:>14.1f}  {'oui' if result['altair_loaded'] else 'non'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+"""
+Mesure les fonctions backend à plusieurs tailles d'école.
+
+Pour chaque taille, une base SQLite jetable est remplie par `generate_school`, puis chaque
+fonction est appelée `--repeat` fois : latence p50/p95, allers-retours vers la base par
+appel et pic mémoire (tracemalloc, sur un appel supplémentaire hors chronométrage).
+
+    python -m benchmarks.run --sizes 25,100,400 --repeat 20
+    python -m benchmarks.run --rtt-ms 40    # latence réseau simulée par aller-retour
+    python -m benchmarks.run --compare benchmarks/results/ancienne.json benchmarks/results/nouvelle.json
+
+Les résultats sont écrits en JSON (par défaut benchmarks/results/<version>.json) pour
+comparer les versions entre elles.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta, timezone
+
+from benchmarks.synthetic import STREAMS, generate_school
+from epl import backend
+from epl.repository import create_repository
+from epl.search import StudentSearchIndex
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+
+class CountingRepository:
+    """
+    Enveloppe un Repository et compte les appels de méthodes publiques (un appel = un aller-retour).
+    `rtt_ms` simule la latence réseau du projet hébergé sur chaque aller-retour.
+    """
+
+    def __init__(self, inner, rtt_ms=0.0):
+        self.inner = inner
+        self.rtt = rtt_ms / 1000
+        self.calls = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self.inner, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        def counted(*args, **kwargs):
+            self.calls += 1
+            if self.rtt:
+                time.sleep(self.rtt)
+            return attr(*args, **kwargs)
+        return counted
+
+
+class BenchContext:
+    """Données partagées par les scénarios d'une taille donnée."""
+
+    def __init__(self, repo, school, workdir, seed):
+        self.repo = repo
+        self.school = school
+        self.workdir = workdir
+        self.rng = random.Random(seed)
+        self.student_ids = [sid for ids in school['students'].values() for sid in ids]
+        self.rosters = {stream: repo.inner.list_students(stream) for stream in school['students']}
+        self.search_index = StudentSearchIndex(student for roster in self.rosters.values() for student in roster)
+        # Les appels de benchmark créent des séances après la fin du semestre généré
+        self.next_day = date(2026, 6, 1)
+
+    def new_day(self):
+        self.next_day += timedelta(days=1)
+        return self.next_day
+
+
+def bench_student_stats(ctx):
+    backend.compute_student_stats(ctx.repo, ctx.rng.choice(ctx.student_ids))
+
+
+def bench_search_student(ctx):
+    student = ctx.rng.choice([s for roster in ctx.rosters.values() for s in roster])
+    query = ctx.rng.choice([student['id'][:7], student['last_name'][:4], student['first_name'].lower()[:-1]])
+    ctx.search_index.search(query)
+
+
+def bench_save_attendance(ctx):
+    stream = ctx.rng.choice(list(ctx.rosters))
+    roster = ctx.rosters[stream]
+    present_ids = {s['id'] for s in roster if ctx.rng.random() < 0.85}
+    course_id = ctx.rng.choice(ctx.school['courses'][stream])
+    # L'écriture faite par la file des appels (epl/outbox.py), sans l'attente de la file
+    ctx.repo.save_roll_call(
+        course_id, ctx.new_day().isoformat(), backend.build_roll_call(roster, lambda sid: sid in present_ids)
+    )
+
+
+def bench_past_sessions(ctx):
+    backend.list_past_sessions(ctx.repo, ctx.school['courses'][ctx.rng.choice(list(ctx.rosters))])
+
+
+def bench_activity_log(ctx):
+    backend.build_activity_log(ctx.repo, stream=ctx.rng.choice(list(ctx.rosters)))
+
+
+def bench_attendance_export(ctx):
+    backend.export_attendance(ctx.repo, os.path.join(ctx.workdir, 'export.csv'), 'csv')
+
+
+# nom affiché -> (scénario, diviseur du nombre de répétitions pour les scénarios lourds)
+BENCHMARKS = {
+    'get_student_stats': (bench_student_stats, 1),
+    'search_student': (bench_search_student, 1),
+    'save_attendance': (bench_save_attendance, 1),
+    'get_past_sessions': (bench_past_sessions, 1),
+    'get_delegate_activity_log': (bench_activity_log, 1),
+    'get_all_attendance_export': (bench_attendance_export, 5),
+}
+
+
+def percentile(values, q):
+    """Percentile par rang le plus proche (q entre 0 et 100)."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def run_benchmark(ctx, func, repeat):
+    latencies = []
+    ctx.repo.calls = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(ctx)
+        latencies.append((time.perf_counter() - started) * 1000)
+    round_trips = ctx.repo.calls / repeat
+
+    tracemalloc.start()
+    func(ctx)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'round_trips': round(round_trips, 2),
+        'peak_memory_kb': round(peak / 1024, 1),
+        'calls': repeat,
+    }
+
+
+def run_suite(sizes, repeat, courses, weeks, only=None, rtt_ms=0.0, seed=42, log=print):
+    results = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as workdir:
+            repo = CountingRepository(create_repository('sqlite', path=os.path.join(workdir, 'bench.db')), rtt_ms)
+            started = time.perf_counter()
+            school = generate_school(repo.inner, students_per_stream=size, courses_per_stream=courses,
+                                     weeks=weeks, seed=seed)
+            log(f"[{size} étudiants/filière] {len(STREAMS) * size} étudiants, {school['sessions']} séances, "
+                f"{school['attendance']} présences générés en {time.perf_counter() - started:.1f}s")
+            ctx = BenchContext(repo, school, workdir, seed)
+
+            for name, (func, divisor) in BENCHMARKS.items():
+                if only and name not in only:
+                    continue
+                stats = run_benchmark(ctx, func, max(3, repeat // divisor))
+                stats.update(function=name, students_per_stream=size, attendance_rows=school['attendance'])
+                results.append(stats)
+                log(f"  {name:<28} p50 {stats['p50_ms']:>9.2f} ms  p95 {stats['p95_ms']:>9.2f} ms  "
+                    f"{stats['round_trips']:>6.1f} A/R  {stats['peak_memory_kb']:>9.1f} Ko")
+            repo.inner.conn.close()
+    return results
+
+
+def current_version():
+    try:
+        return subprocess.run(
+            ['git', 'describe', '--always', '--dirty'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'inconnue'
+
+
+def compare(base_path, new_path, threshold):
+    """Affiche l'évolution p50/p95 entre deux fichiers de résultats ; retourne le nombre de régressions."""
+    with open(base_path, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(new_path, encoding='utf-8') as f:
+        new = json.load(f)
+    base_index = {(r['function'], r['students_per_stream']): r for r in base['results']}
+
+    print(f"{base['version']} -> {new['version']}")
+    regressions = 0
+    for row in new['results']:
+        old = base_index.get((row['function'], row['students_per_stream']))
+        if not old:
+            continue
+        ratio = row['p95_ms'] / old['p95_ms'] if old['p95_ms'] else float('inf')
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  ⚠️ régression"
+            regressions += 1
+        print(f"  {row['function']:<28} {row['students_per_stream']:>5}  "
+              f"p50 {old['p50_ms']:>9.2f} -> {row['p50_ms']:>9.2f} ms  "
+              f"p95 {old['p95_ms']:>9.2f} -> {row['p95_ms']:>9.2f} ms  "
+              f"A/R {old['round_trips']:>5.1f} -> {row['round_trips']:>5.1f}  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks des fonctions backend du portail EPL.")
+    parser.add_argument('--sizes', default='25,100,400', help="étudiants par filière, séparés par des virgules")
+    parser.add_argument('--repeat', type=int, default=20, help="appels chronométrés par fonction")
+    parser.add_argument('--courses', type=int, default=8, help="cours par filière")
+    parser.add_argument('--weeks', type=int, default=15, help="semaines de cours générées (un semestre)")
+    parser.add_argument('--only', help="fonctions à mesurer, séparées par des virgules")
+    parser.add_argument('--rtt-ms', type=float, default=0.0, help="latence réseau simulée par aller-retour")
+    parser.add_argument('--output', help="fichier JSON de résultats (défaut : benchmarks/results/<version>.json)")
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NOUVEAU'), help="compare deux fichiers de résultats")
+    parser.add_argument('--threshold', type=float, default=0.2, help="hausse de p95 signalée comme régression")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return 1 if compare(*args.compare, args.threshold) else 0
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    only = set(args.only.split(',')) if args.only else None
+    results = run_suite(sizes, args.repeat, args.courses, args.weeks, only, args.rtt_ms)
+
+    version = current_version()
+    output = args.output or os.path.join(RESULTS_DIR, f"{version}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'version': version,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'config': {
+                'sizes': sizes, 'repeat': args.repeat, 'courses': args.courses,
+                'weeks': args.weeks, 'rtt_ms': args.rtt_ms,
+            },
+            'results': results,
+        }, f, indent=2, ensure_ascii=False)
+    print(f"Résultats enregistrés dans {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,68 @@
+"""
+Générateur d'école synthétique : filières, étudiants, cours et un semestre de séances.
+
+Les données sont écrites via le `Repository`, ce qui permet de remplir n'importe quel
+backend ; la suite de benchmarks l'utilise sur une base SQLite jetable.
+"""
+import random
+from datetime import date, datetime, timedelta
+
+STREAMS = ("LT", "GC", "IABD", "IS", "GE", "GM")
+
+LAST_NAMES = (
+    "AGBEKO", "AMEGAH", "ADJO", "KOFFI", "MENSAH", "DOSSOU", "AKAKPO", "KODJO",
+    "LAWSON", "SENOU", "TCHALLA", "GNASSINGBE", "APEDO", "KPODAR", "ATTIPOE", "EDORH",
+)
+FIRST_NAMES = (
+    "Ama", "Kofi", "Afi", "Kodjo", "Akossiwa", "Yao", "Essi", "Komlan",
+    "Abla", "Koami", "Dzifa", "Selom", "Mawuli", "Enyonam", "Kafui", "Edem",
+)
+SUBJECTS = (
+    "Mathématiques", "Physique", "Algorithmique", "Électronique", "Anglais",
+    "Mécanique", "Résistance des matériaux", "Bases de données", "Réseaux", "Thermodynamique",
+)
+
+
+def generate_school(repo, students_per_stream=50, courses_per_stream=8, weeks=15,
+                    streams=STREAMS, presence_rate=0.85, start=date(2025, 10, 6), seed=42):
+    """
+    Remplit `repo` avec une école synthétique et retourne un résumé :
+    {'students': {filière: [ids]}, 'courses': {filière: [ids]}, 'sessions': n, 'attendance': n}.
+
+    Chaque cours a une séance par semaine pendant `weeks` semaines ; chaque étudiant
+    est présent avec la probabilité `presence_rate`.
+    """
+    rng = random.Random(seed)
+    summary = {'students': {}, 'courses': {}, 'sessions': 0, 'attendance': 0}
+
+    for stream in streams:
+        students = [{
+            'id': f"LF-{stream}-{i:04d}",
+            'last_name': rng.choice(LAST_NAMES),
+            'first_name': rng.choice(FIRST_NAMES),
+            'stream': stream,
+        } for i in range(1, students_per_stream + 1)]
+        repo.insert_students(students)
+
+        courses = repo.insert_courses([{
+            'name': f"{SUBJECTS[k % len(SUBJECTS)]} {k // len(SUBJECTS) + 1}",
+            'stream_target': stream,
+        } for k in range(courses_per_stream)])
+
+        summary['students'][stream] = [s['id'] for s in students]
+        summary['courses'][stream] = [c['id'] for c in courses]
+
+        for week in range(weeks):
+            for k, course in enumerate(courses):
+                day = start + timedelta(weeks=week, days=k % 5)
+                starts_at = datetime(day.year, day.month, day.day, 8 + 2 * (k % 4))
+                session_id = repo.create_session(course['id'], starts_at.isoformat())
+                repo.upsert_attendance([{
+                    'session_id': session_id,
+                    'student_id': s['id'],
+                    'status': "PRESENT" if rng.random() < presence_rate else "ABSENT",
+                } for s in students])
+                summary['sessions'] += 1
+                summary['attendance'] += len(students)
+
+    return summary
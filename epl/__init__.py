@@ -0,0 +1 @@
+"""Modules backend du Portail Académique EPL (accès aux données, outils hors interface)."""
@@ -0,0 +1,143 @@
+"""
+Vérification des accès (table delegate_access).
+
+Les mots de passe sont stockés sous forme de hachés salés PBKDF2-SHA256
+(« pbkdf2_sha256$<itérations>$<sel>$<haché> »). La connexion lit une seule ligne,
+par identifiant (ADMIN, PROF, LT, GC...) : la table n'est jamais chargée en entier
+ni gardée en mémoire.
+
+Les lignes encore en clair (colonne `password`, d'avant la migration) sont acceptées
+une dernière fois, puis réécrites en haché à la première connexion réussie. De même, un
+haché calculé avec moins d'itérations que `ITERATIONS` est recalculé à la connexion.
+
+Un petit cache des vérifications réussies évite de recalculer PBKDF2 (volontairement
+lent) à chaque connexion ; il ne contient ni mot de passe ni haché, seulement une
+empreinte HMAC avec une clé aléatoire propre au processus.
+"""
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+ALGORITHM = 'pbkdf2_sha256'
+ITERATIONS = 200_000
+
+STAFF_ROLES = ('ADMIN', 'PROF')
+
+
+def hash_password(password, iterations=None):
+    iterations = iterations or ITERATIONS
+    salt = secrets.token_hex(16)
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), iterations).hex()
+    return f"{ALGORITHM}${iterations}${salt}${digest}"
+
+
+def verify_password(password, encoded):
+    try:
+        algorithm, iterations, salt, digest = encoded.split('$')
+    except (AttributeError, ValueError):
+        return False
+    if algorithm != ALGORITHM:
+        return False
+    candidate = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), int(iterations)).hex()
+    return hmac.compare_digest(candidate, digest)
+
+
+def needs_rehash(encoded):
+    """Vrai si `encoded` n'est pas un haché PBKDF2 avec au moins `ITERATIONS` itérations."""
+    try:
+        algorithm, iterations, _, _ = encoded.split('$')
+        return algorithm != ALGORITHM or int(iterations) < ITERATIONS
+    except (AttributeError, ValueError):
+        return True
+
+
+def normalize_identifier(identifier):
+    """Identifiant saisi sans les espaces autour ; la casse est ignorée par `get_credential`."""
+    return (identifier or '').strip()
+
+
+def access_scope(identifier, role):
+    """Le personnel voit tout (ALL) ; un délégué ne voit que sa filière (son identifiant)."""
+    return 'ALL' if role in STAFF_ROLES else identifier
+
+
+class VerifiedSessionCache:
+    """Vérifications réussies récentes : (identifiant, empreinte du mot de passe) -> accès, pendant `ttl` s."""
+
+    def __init__(self, ttl=300.0, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.key = os.urandom(32)
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def _fingerprint(self, identifier, password):
+        return identifier.casefold(), hmac.new(self.key, password.encode(), hashlib.sha256).digest()
+
+    def get(self, identifier, password):
+        key = self._fingerprint(identifier, password)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            access, expires = entry
+            if expires <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return dict(access)
+
+    def put(self, identifier, password, access):
+        key = self._fingerprint(identifier, password)
+        with self.lock:
+            self.entries[key] = (dict(access), time.monotonic() + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def forget(self, identifier):
+        """Oublie les vérifications d'un identifiant (après un changement de mot de passe)."""
+        with self.lock:
+            for key in [k for k in self.entries if k[0] == identifier.casefold()]:
+                del self.entries[key]
+
+
+def authenticate(repo, identifier, password, verified=None):
+    """
+    Accès {'role', 'scope'} si le mot de passe de `identifier` est correct, sinon None.
+    Une requête par clé primaire au plus ; aucune si la vérification est dans `verified`.
+    """
+    identifier = normalize_identifier(identifier)
+    if not identifier or not password:
+        return None
+    if verified is not None:
+        access = verified.get(identifier, password)
+        if access is not None:
+            return access
+
+    row = repo.get_credential(identifier)
+    if row is None:
+        return None
+
+    if row.get('password_hash'):
+        if not verify_password(password, row['password_hash']):
+            return None
+        if needs_rehash(row['password_hash']):
+            # Haché d'un réglage plus faible : recalculé tant que le mot de passe vérifié est connu
+            repo.upsert_credentials([{'id': row['id'], 'role': row['role'], 'password_hash': hash_password(password)}])
+    else:
+        # Ligne d'avant la migration : dernière comparaison en clair, puis remplacement par un haché
+        if row.get('password') is None or not hmac.compare_digest(row['password'].encode(), password.encode()):
+            return None
+        repo.upsert_credentials([{
+            'id': row['id'], 'role': row['role'], 'password_hash': hash_password(password), 'password': None
+        }])
+
+    access = {'role': row['role'], 'scope': access_scope(row['id'], row['role'])}
+    if verified is not None:
+        verified.put(identifier, password, access)
+    return access
@@ -0,0 +1,414 @@
+"""
+Fonctions backend du portail, indépendantes de Streamlit.
+
+Elles reçoivent le `Repository` en premier argument : l'application les enveloppe
+(cache, affichage des erreurs) et la suite de benchmarks les appelle directement
+sur une base locale.
+"""
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from epl.search import normalize
+
+
+# --- STATISTIQUES ÉTUDIANT ---
+def compute_student_stats(repo, student_id):
+    """
+    Statistiques de présence d'un étudiant (globales et par matière), ou None sans données.
+    Les comptages sont faits par la base : une ligne par matière, quel que soit le nombre de séances.
+    """
+    course_rows = repo.student_course_stats(student_id)
+    
+    if not course_rows:
+        return None
+        
+    total_sessions = sum(row['total_count'] for row in course_rows)
+    present_count = sum(row['present_count'] for row in course_rows)
+    absent_count = total_sessions - present_count
+    attendance_percentage = (present_count / total_sessions * 100) if total_sessions > 0 else 0
+    
+    # Les séances sans cours comptent dans le total mais pas dans le détail par matière
+    courses_stats = {
+        row['course_name']: {'present': row['present_count'], 'total': row['total_count']}
+        for row in course_rows if row['course_name'] is not None
+    }
+    
+    return {
+        'total_sessions': total_sessions,
+        'present_count': present_count,
+        'absent_count': absent_count,
+        'attendance_percentage': round(attendance_percentage, 1),
+        'courses_stats': courses_stats,
+        'last_updated': datetime.now().strftime("%d/%m/%Y %H:%M")
+    }
+
+
+# --- DONNÉES DES GRAPHIQUES (agrégées avant l'envoi au navigateur) ---
+RATE_BIN_WIDTH = 5  # largeur des classes de l'histogramme des taux, en points de pourcentage
+
+
+def rate_histogram(df, column='attendance_percentage', group='stream', bin_width=RATE_BIN_WIDTH):
+    """
+    Histogramme des taux par filière sur des classes fixes de 0 à 100 % :
+    une ligne par (filière, classe non vide) -> {group, 'bin_start', 'bin_end', 'count'}.
+    La taille du résultat ne dépend pas du nombre d'étudiants.
+    """
+    edges = np.arange(0, 100 + bin_width, bin_width)
+    frames = []
+    for name, values in df.groupby(group)[column]:
+        counts, _ = np.histogram(values.dropna().clip(0, 100), bins=edges)
+        frames.append(pd.DataFrame({group: name, 'bin_start': edges[:-1], 'bin_end': edges[1:], 'count': counts}))
+    if not frames:
+        return pd.DataFrame(columns=[group, 'bin_start', 'bin_end', 'count'])
+    histogram = pd.concat(frames, ignore_index=True)
+    return histogram[histogram['count'] > 0].reset_index(drop=True)
+
+
+def rate_boxplot(df, column='attendance_percentage', group='stream'):
+    """
+    Statistiques de boîte à moustaches par filière (quartiles, moustaches de Tukey à 1,5 × IQR
+    bornées aux valeurs observées, nombre de valeurs hors moustaches) : une ligne par filière.
+    """
+    rows = []
+    for name, values in df.groupby(group)[column]:
+        values = values.dropna().to_numpy()
+        if values.size == 0:
+            continue
+        q1, median, q3 = np.percentile(values, [25, 50, 75])
+        iqr = q3 - q1
+        inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+        rows.append({
+            group: name,
+            'lower': inside.min(),
+            'q1': q1,
+            'median': median,
+            'q3': q3,
+            'upper': inside.max(),
+            'outliers': int(values.size - inside.size),
+            'count': int(values.size),
+        })
+    return pd.DataFrame(rows, columns=[group, 'lower', 'q1', 'median', 'q3', 'upper', 'outliers', 'count'])
+
+
+# --- CROISSANCE HEBDOMADAIRE (statistiques de la base) ---
+def weekly_growth(weekly, today=None):
+    """
+    Sessions et présences créées cette semaine et la semaine précédente (semaines calendaires,
+    du lundi au dimanche, en UTC comme la base) à partir des lignes `weekly` de
+    `database_statistics` : une semaine sans ligne compte 0.
+
+    Retourne ({'sessions', 'attendance'} de cette semaine, idem pour la semaine précédente).
+    """
+    today = today or datetime.now(timezone.utc).date()
+    monday = today - timedelta(days=today.weekday())
+    by_week = {row['week']: row for row in weekly}
+
+    def totals(week_start):
+        row = by_week.get(week_start.isoformat(), {})
+        return {'sessions': int(row.get('sessions') or 0), 'attendance': int(row.get('attendance') or 0)}
+
+    return totals(monday), totals(monday - timedelta(weeks=1))
+
+
+# --- APPEL ET CORRECTIONS ---
+def build_roll_call(all_students, is_present):
+    """Une ligne {student_id, status} par étudiant ; `is_present(student_id)` donne le statut."""
+    return [{
+        "student_id": s['id'],
+        "status": "PRESENT" if is_present(s['id']) else "ABSENT"
+    } for s in all_students]
+
+
+def filter_roster(students, text):
+    """Étudiants dont le matricule, le nom ou le prénom contient `text` (sans casse ni accents)."""
+    needle = normalize(text).strip()
+    if not needle:
+        return list(students)
+    return [s for s in students
+            if needle in normalize(f"{s['id']} {s.get('last_name') or ''} {s.get('first_name') or ''}")]
+
+
+def attendance_changes(session_id, original_presence, updated_presence):
+    """
+    Lignes de présence à réécrire après une correction : statut modifié, ou étudiant sans ligne
+    enregistrée (None dans `original_presence`), qui reçoit alors son statut explicitement.
+    """
+    return [{
+        "session_id": session_id,
+        "student_id": student_id,
+        "status": "PRESENT" if present else "ABSENT"
+    } for student_id, present in updated_presence.items()
+        if original_presence.get(student_id) is None or bool(original_presence[student_id]) != bool(present)]
+
+
+def correct_attendance(repo, session_id, original_presence, updated_presence):
+    """
+    Corrige les présences d'une session passée ({student_id: présent}) en n'envoyant que les
+    lignes modifiées, en un seul upsert ; retourne ces lignes.
+    """
+    changes = attendance_changes(session_id, original_presence, updated_presence)
+    if changes:
+        repo.upsert_attendance(changes)
+    return changes
+
+
+def _comparable(value):
+    # Cellules vides du data_editor (NaN, NA, None) comparées comme None
+    return None if value is None or (not isinstance(value, (list, dict)) and pd.isna(value)) else value
+
+
+def changed_rows(original, edited, columns, key='id'):
+    """
+    Lignes de `edited` (liste de dicts) dont l'une des `columns` diffère de la ligne de même `key`
+    dans `original` ; les lignes sans correspondance (ajoutées dans l'éditeur) sont ignorées.
+    Chaque ligne retournée contient `key` et toutes les `columns`, prête pour un upsert.
+    """
+    before = {row[key]: row for row in original}
+    changes = []
+    for row in edited:
+        previous = before.get(row.get(key))
+        if previous is None:
+            continue
+        values = {column: _comparable(row.get(column)) for column in columns}
+        if any(values[column] != _comparable(previous.get(column)) for column in columns):
+            changes.append({key: row[key], **values})
+    return changes
+
+
+def list_past_sessions(repo, course_ids, date_from=None, date_to=None, before=None, limit=20):
+    """
+    Une page de sessions des cours `course_ids` (plus récentes d'abord), avec le nom du cours.
+    Retourne (sessions, curseur de la page suivante ou None) ; le curseur se passe en `before`.
+    """
+    if not course_ids:
+        return [], None
+    sessions = repo.list_sessions(list(course_ids), limit=limit, date_from=date_from, date_to=date_to, before=before)
+    next_cursor = (sessions[-1]['date_time'], sessions[-1]['id']) if len(sessions) == limit else None
+    return sessions, next_cursor
+
+
+# --- JOURNAL D'ACTIVITÉ ---
+ACTIVITY_LOG_COLUMNS = [
+    'Délégué_Responsable', 'Matière', 'Date_Session_Prévue',
+    'Heure_Remplissage_Reelle', 'Date_Remplissage_Reelle', 'Statut_Session'
+]
+
+
+def local_day_bounds(first_day, last_day=None):
+    """
+    Période de remplissage couvrant les jours locaux `first_day` à `last_day` inclus (jours du fuseau
+    du serveur, celui de l'affichage du journal), en bornes UTC ISO 8601 : (début inclus, fin exclue).
+    Sans `last_day`, la fin est None (jusqu'à aujourd'hui).
+    """
+    def utc_midnight(day):
+        # Minuit local de ce jour (décalage d'été compris), converti en UTC
+        return datetime.combine(day, datetime.min.time()).astimezone().astimezone(timezone.utc).isoformat()
+
+    return utc_midnight(first_day), utc_midnight(last_day + timedelta(days=1)) if last_day is not None else None
+
+
+def build_activity_log(repo, stream=None, created_from=None, created_to=None, before=None, limit=100):
+    """
+    Une page du journal des sessions enregistrées (plus récentes d'abord), avec les informations
+    de création réelles (created_at). Filière et période de remplissage sont filtrées par la base.
+
+    Retourne (DataFrame, curseur de la page suivante ou None) ; le curseur se passe en `before`.
+    """
+    # Récupère l'heure de CRÉATION réelle (created_at) et la date de la session (date_time)
+    data = repo.list_recent_sessions(
+        limit=limit, stream=stream, created_from=created_from, created_to=created_to, before=before
+    )
+    if not data:
+        return pd.DataFrame(columns=ACTIVITY_LOG_COLUMNS), None
+
+    next_cursor = (data[-1]['created_at'], data[-1]['id']) if len(data) == limit else None
+
+    courses = [row.get('courses') or {} for row in data]
+    local_tz = datetime.now().astimezone().tzinfo
+
+    # Conversions vectorisées : created_at est aware, date_time est lue comme UTC si elle ne l'est pas.
+    # Les colonnes restent des dates typées (heure locale, sans fuseau) : le formatage est fait à l'affichage.
+    filling = pd.to_datetime([row['created_at'] for row in data], utc=True, format='ISO8601')\
+        .tz_convert(local_tz).tz_localize(None)
+    session = pd.to_datetime([row['date_time'] for row in data], utc=True, format='ISO8601')
+
+    log = pd.DataFrame({
+        'Délégué_Responsable': [c.get('stream_target', 'N/A') for c in courses], # Proxy pour l'identité du délégué
+        'Matière': [c.get('name', 'N/A') for c in courses],
+        'Date_Session_Prévue': session.tz_convert(local_tz).tz_localize(None).normalize(),
+        'Heure_Remplissage_Reelle': filling,
+        'Date_Remplissage_Reelle': filling.normalize(),
+        'Statut_Session': np.where(session < pd.Timestamp.now(tz='UTC'), "Complet", "Planifié")
+    })
+    return log, next_cursor
+
+
+# --- EXPORT DES PRÉSENCES (pagination keyset + écriture en flux) ---
+# Colonnes plates du fichier exporté (identiques à l'ancien export DataFrame)
+ATTENDANCE_EXPORT_COLUMNS = [
+    'session_id', 'student_id', 'last_name', 'first_name',
+    'stream', 'course_name', 'date_time', 'status'
+]
+# Taille d'une page : doit rester <= au plafond "max-rows" de PostgREST (1000 par défaut)
+EXPORT_PAGE_SIZE = 1000
+# Formats de fichier proposés : format -> type MIME
+EXPORT_MIME_TYPES = {
+    'csv': 'text/csv',
+    'json': 'application/json',
+    'parquet': 'application/vnd.apache.parquet',
+}
+# Colonnes à faible cardinalité, encodées en dictionnaire dans les exports Parquet
+EXPORT_DICTIONARY_COLUMNS = ['stream', 'stream_target', 'course_name', 'status']
+
+
+def _flatten_attendance_row(row):
+    student = row.get('students') or {}
+    session = row.get('sessions') or {}
+    course = session.get('courses') or {}
+    return {
+        'session_id': row['session_id'],
+        'student_id': student.get('id', row['student_id']),
+        'last_name': student.get('last_name'),
+        'first_name': student.get('first_name'),
+        'stream': student.get('stream'),
+        'course_name': course.get('name', 'Inconnu'),
+        'date_time': session.get('date_time', 'Inconnu'),
+        'status': row['status']
+    }
+
+
+def iter_attendance_export(repo, page_size=EXPORT_PAGE_SIZE):
+    """
+    Parcourt toute la table attendance par pages ordonnées sur (session_id, student_id).
+    Chaque page reprend après la dernière clé lue : pas d'OFFSET, et le plafond de lignes
+    de PostgREST ne peut plus tronquer l'export en silence.
+    """
+    last_key = None
+    while True:
+        rows = repo.attendance_export_page(after=last_key, limit=page_size)
+
+        # On s'arrête uniquement sur une page vide : une page courte peut venir du plafond serveur
+        if not rows:
+            break
+        yield [_flatten_attendance_row(row) for row in rows]
+        last_key = (rows[-1]['session_id'], rows[-1]['student_id'])
+
+
+def export_attendance(repo, path, fmt='csv', on_progress=None):
+    """
+    Écrit l'export des présences dans le fichier `path` (format 'csv', 'json' ou 'parquet'), page par page.
+    La mémoire reste bornée à une page ; `on_progress(lignes_écrites)` est appelé après chaque page.
+    Retourne (nombre de lignes, aperçu des premières lignes).
+    """
+    if fmt == 'parquet':
+        return _export_attendance_parquet(repo, path, on_progress)
+
+    written = 0
+    preview = []
+    encoding = 'utf-8-sig' if fmt == 'csv' else 'utf-8'
+    with open(path, 'w', newline='', encoding=encoding) as f:
+        if fmt == 'csv':
+            writer = csv.DictWriter(f, fieldnames=ATTENDANCE_EXPORT_COLUMNS)
+            writer.writeheader()
+        else:
+            f.write('[')
+
+        for chunk in iter_attendance_export(repo):
+            if fmt == 'csv':
+                writer.writerows(chunk)
+            else:
+                for i, row in enumerate(chunk):
+                    f.write(',\n' if written + i else '\n')
+                    f.write(json.dumps(row, ensure_ascii=False, indent=2))
+            written += len(chunk)
+            if len(preview) < 5:
+                preview.extend(chunk[:5 - len(preview)])
+            if on_progress:
+                on_progress(written)
+
+        if fmt != 'csv':
+            f.write('\n]')
+    return written, pd.DataFrame(preview, columns=ATTENDANCE_EXPORT_COLUMNS)
+
+
+# --- EXPLORATEUR DE STATISTIQUES (filtres, tri et pagination côté base) ---
+STUDENT_STATS_EXPORT_COLUMNS = [
+    'student_id', 'last_name', 'first_name', 'stream', 'total_sessions',
+    'present_count', 'absent_count', 'attendance_percentage', 'last_session_at'
+]
+
+
+def student_stats_csv(repo, page_size=EXPORT_PAGE_SIZE, **filters):
+    """
+    CSV (bytes) de toutes les lignes de student_stats qui passent les filtres de
+    `Repository.query_student_stats`, dans l'ordre demandé, lues par pages de `page_size`.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=STUDENT_STATS_EXPORT_COLUMNS, extrasaction='ignore')
+    writer.writeheader()
+    offset = 0
+    while True:
+        rows = repo.query_student_stats(limit=page_size, offset=offset, **filters)['rows']
+        # Arrêt sur une page vide seulement : une page courte peut venir du plafond serveur
+        if not rows:
+            break
+        writer.writerows(rows)
+        offset += len(rows)
+    return buffer.getvalue().encode('utf-8-sig')
+
+
+def _attendance_arrow_schema(session_id_sample):
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('session_id', pa.int64() if isinstance(session_id_sample, int) else pa.string()),
+        ('student_id', pa.string()),
+        ('last_name', pa.string()),
+        ('first_name', pa.string()),
+        ('stream', dictionary),
+        ('course_name', dictionary),
+        ('date_time', pa.string()),
+        ('status', dictionary),
+    ])
+
+
+def _export_attendance_parquet(repo, path, on_progress=None):
+    """Variante Parquet (zstd) de l'export : un row group par page, filière/matière/statut en dictionnaire."""
+    written = 0
+    preview = []
+    writer = None
+    try:
+        for chunk in iter_attendance_export(repo):
+            if writer is None:
+                schema = _attendance_arrow_schema(chunk[0]['session_id'])
+                writer = pq.ParquetWriter(path, schema, compression='zstd')
+            writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+            written += len(chunk)
+            if len(preview) < 5:
+                preview.extend(chunk[:5 - len(preview)])
+            if on_progress:
+                on_progress(written)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        # Aucune présence : un fichier Parquet valide, sans ligne, avec le schéma attendu (ids bigint)
+        pq.write_table(_attendance_arrow_schema(0).empty_table(), path, compression='zstd')
+    return written, pd.DataFrame(preview, columns=ATTENDANCE_EXPORT_COLUMNS)
+
+
+def dataframe_to_parquet(df):
+    """Sérialise un DataFrame en Parquet compressé (zstd), colonnes répétitives encodées en dictionnaire."""
+    df = df.copy()
+    for col in EXPORT_DICTIONARY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False, compression='zstd')
+    return buffer.getvalue()
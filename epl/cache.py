@@ -0,0 +1,227 @@
+"""
+Cache en mémoire partagé, invalidé par étiquettes.
+
+Chaque résultat mis en cache porte des étiquettes (« students », « student:LF-GC-0012 »,
+« sessions »...). Une écriture n'efface que les résultats qui portent l'étiquette
+concernée, au lieu de vider tout le cache de l'application. Les compteurs de
+succès / échecs par fonction permettent de vérifier l'effet dans l'onglet Maintenance.
+
+Avec `refresh_after`, un résultat plus ancien est servi tel quel pendant qu'un thread
+de fond le recalcule (stale-while-revalidate) : la page reste instantanée même quand
+la requête sous-jacente est lente. `Snapshot` applique le même principe à un seul
+résultat partagé et versionné (la vue student_stats des tableaux de bord).
+"""
+import copy
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+
+class TaggedCache:
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self.lock = threading.RLock()
+        self.entries = OrderedDict()  # clé -> (valeur, expiration, étiquettes, calculé à), du moins au plus récemment utilisé
+        self.tags = {}                # étiquette -> {clés}
+        self.counters = {}            # nom de fonction -> {'hits', 'misses', 'invalidated', 'refreshes'}
+        self.refreshing = set()       # clés en cours de recalcul en arrière-plan
+        # Incrémenté à chaque invalidation : un résultat calculé pendant une invalidation n'est pas conservé
+        self.generation = 0
+
+    def _counter(self, name):
+        return self.counters.setdefault(name, {'hits': 0, 'misses': 0, 'invalidated': 0, 'refreshes': 0})
+
+    def _drop(self, key):
+        tags = self.entries.pop(key)[2]
+        for tag in tags:
+            keys = self.tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tags[tag]
+
+    def _store(self, key, value, ttl, entry_tags, generation):
+        """Enregistre un résultat, sauf si une invalidation a eu lieu depuis le début de son calcul."""
+        with self.lock:
+            if generation != self.generation:
+                return
+            now = time.monotonic()
+            if key in self.entries:
+                self._drop(key)
+            self.entries[key] = (value, now + ttl if ttl is not None else None, entry_tags, now)
+            for tag in entry_tags:
+                self.tags.setdefault(tag, set()).add(key)
+            while len(self.entries) > self.max_entries:
+                self._drop(next(iter(self.entries)))
+
+    def _refresh(self, key, func, args, ttl, entry_tags, generation):
+        try:
+            self._store(key, func(*args), ttl, entry_tags, generation)
+        except Exception:
+            pass  # l'ancienne valeur reste servie jusqu'à son expiration
+        finally:
+            with self.lock:
+                self.refreshing.discard(key)
+
+    def age(self, func, *args):
+        """Âge en secondes du résultat en cache de `func(*args)`, ou None s'il n'y en a pas."""
+        with self.lock:
+            entry = self.entries.get((func.__name__, args))
+            return time.monotonic() - entry[3] if entry is not None else None
+
+    def memoize(self, ttl=None, tags=None, refresh_after=None):
+        """
+        Décorateur : met en cache le résultat par arguments, pendant `ttl` secondes (sans limite si None).
+        `tags(*args)` donne les étiquettes du résultat ; le nom de la fonction en fait toujours partie.
+        Passé `refresh_after` secondes, le résultat est encore servi mais recalculé en arrière-plan.
+        Les exceptions ne sont pas mises en cache.
+        """
+        def decorator(func):
+            name = func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args):
+                key = (name, args)
+                entry_tags = {name, *(tags(*args) if tags else ())}
+                with self.lock:
+                    counter = self._counter(name)
+                    entry = self.entries.get(key)
+                    now = time.monotonic()
+                    if entry is not None and (entry[1] is None or entry[1] > now):
+                        self.entries.move_to_end(key)
+                        counter['hits'] += 1
+                        if refresh_after is not None and now - entry[3] >= refresh_after and key not in self.refreshing:
+                            self.refreshing.add(key)
+                            counter['refreshes'] += 1
+                            threading.Thread(
+                                target=self._refresh, args=(key, func, args, ttl, entry_tags, self.generation),
+                                name=f"cache-refresh-{name}", daemon=True
+                            ).start()
+                        return copy.deepcopy(entry[0])
+                    if entry is not None:
+                        self._drop(key)
+                    counter['misses'] += 1
+                    generation = self.generation
+
+                value = func(*args)
+                self._store(key, value, ttl, entry_tags, generation)
+                return copy.deepcopy(value)
+
+            wrapper.clear = lambda: self.invalidate(name)
+            return wrapper
+        return decorator
+
+    def invalidate(self, *tags):
+        """Retire les résultats portant l'une des étiquettes ; retourne le nombre de résultats retirés."""
+        with self.lock:
+            self.generation += 1
+            keys = set()
+            for tag in tags:
+                keys |= self.tags.get(tag, set())
+            for key in keys:
+                self._drop(key)
+                self._counter(key[0])['invalidated'] += 1
+            return len(keys)
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+            self.tags.clear()
+
+    def stats(self):
+        """Compteurs par fonction, avec le nombre de résultats actuellement en cache."""
+        with self.lock:
+            sizes = {}
+            for name, _ in self.entries:
+                sizes[name] = sizes.get(name, 0) + 1
+            return {
+                name: {**counter, 'entries': sizes.get(name, 0)}
+                for name, counter in sorted(self.counters.items())
+            }
+
+
+class Snapshot:
+    """
+    Copie partagée et versionnée d'un résultat coûteux (toute une vue, par exemple).
+
+    `get()` répond toujours depuis la mémoire, sauf au tout premier chargement. Passé
+    `max_age` secondes, ou après `invalidate()`, la copie est encore servie pendant
+    qu'un thread de fond en charge une nouvelle version (stale-while-revalidate).
+    La valeur servie est partagée : elle ne doit pas être modifiée par l'appelant.
+    """
+
+    def __init__(self, load, max_age=300.0):
+        self.load = load
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.value = None
+        self.version = 0
+        self.loaded_at = None      # horodatage (time.time) de la version servie
+        self.refreshing = False
+        self.last_error = None
+        # Invalidations demandées / prises en compte : une invalidation arrivée pendant
+        # un chargement laisse la nouvelle version périmée
+        self.requested = 0
+        self.applied = 0
+        # Suivi : réponses depuis la mémoire / chargements bloquants, rechargements de fond, invalidations
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.invalidations = 0
+
+    def _install(self, value, requested):
+        self.value = value
+        self.version += 1
+        self.loaded_at = time.time()
+        self.applied = requested
+        self.last_error = None
+
+    def _refresh(self):
+        with self.lock:
+            requested = self.requested
+        try:
+            value = self.load()
+        except Exception as e:
+            with self.lock:
+                self.last_error = f"{type(e).__name__}: {e}"
+                self.refreshing = False
+            return
+        with self.lock:
+            self._install(value, requested)
+            self.refreshing = False
+
+    def is_stale(self):
+        return self.loaded_at is None or self.applied != self.requested or self.age() >= self.max_age
+
+    def age(self):
+        return time.time() - self.loaded_at if self.loaded_at is not None else None
+
+    def get(self):
+        with self.lock:
+            if self.loaded_at is None:
+                # Premier chargement : rien à servir, on attend la base (les exceptions remontent)
+                self.misses += 1
+                requested = self.requested
+                self._install(self.load(), requested)
+                return self.value
+            self.hits += 1
+            if self.is_stale() and not self.refreshing:
+                self.refreshing = True
+                self.refreshes += 1
+                threading.Thread(target=self._refresh, name="snapshot-refresh", daemon=True).start()
+            return self.value
+
+    def invalidate(self):
+        """Marque la version servie comme périmée (rechargée en arrière-plan au prochain accès)."""
+        with self.lock:
+            self.requested += 1
+            self.invalidations += 1
+
+    def stats(self):
+        """Compteurs sous la même forme que ceux de `TaggedCache.stats()` (une seule entrée)."""
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'invalidated': self.invalidations,
+                    'refreshes': self.refreshes, 'entries': int(self.loaded_at is not None)}
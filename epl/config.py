@@ -0,0 +1,34 @@
+"""
+Réglages de l'application : variables d'environnement, puis .streamlit/secrets.toml.
+
+Ce module ne crée aucune ressource : le point d'entrée vérifie la configuration
+(`check_configuration()`) avant d'importer `epl.services`, qui ouvre les connexions.
+"""
+import os
+
+import streamlit as st
+
+
+def get_setting(name, default=None):
+    """Lit un réglage dans les variables d'environnement, puis dans .streamlit/secrets.toml."""
+    if name in os.environ:
+        return os.environ[name]
+    try:
+        return st.secrets.get(name, default)
+    except FileNotFoundError:
+        return default
+
+# --- Choix du backend : "supabase" (production) ou "sqlite" (base locale pour mesurer hors ligne) ---
+DATA_BACKEND = get_setting("DATA_BACKEND", "supabase")
+
+# --- Clés Supabase (doivent rester dans secrets.toml) ---
+SUPABASE_URL = get_setting("SUPABASE_URL")
+SUPABASE_KEY = get_setting("SUPABASE_KEY")
+
+
+def check_configuration():
+    """Arrête l'exécution avec un message si une clé requise par le backend choisi manque."""
+    if DATA_BACKEND == "supabase" and (not SUPABASE_URL or not SUPABASE_KEY):
+        missing = "SUPABASE_URL" if not SUPABASE_URL else "SUPABASE_KEY"
+        st.error(f"🚨 Clé Supabase manquante ! Vérifiez si la clé '{missing}' existe dans votre .streamlit/secrets.toml")
+        st.stop()
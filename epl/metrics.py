@@ -0,0 +1,190 @@
+"""
+Mesures des fonctions du chemin critique (recherche, appel, statistiques, exports...).
+
+`Metrics.timed()` enveloppe une fonction et compte ses appels, ses exceptions et sa
+durée : histogramme cumulatif à seuils fixes (format Prometheus) et fenêtre des
+dernières durées pour des p50/p95 exacts dans l'onglet Maintenance. Une fonction
+mesurée qui rattrape elle-même une exception pour renvoyer une valeur de repli appelle
+`Metrics.fail()` : l'appel est compté en erreur comme s'il avait levé l'exception.
+
+`render_prometheus()` produit le texte d'exposition Prometheus (version 0.0.4) de ces
+mesures, avec les compteurs des caches (`TaggedCache.stats()` et équivalents) et de la
+couche HTTP (`TransportStats.snapshot()`). `TextfileExporter` l'écrit périodiquement dans
+un fichier, à la manière du collecteur « textfile » de node_exporter : un scrapeur local
+le lit sans que l'application ait à ouvrir un port.
+"""
+import functools
+import os
+import threading
+import time
+from collections import deque
+
+# Seuils de l'histogramme des durées, en secondes
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metrics:
+
+    def __init__(self, window=500):
+        self.window = window
+        self.lock = threading.Lock()
+        self.functions = {}  # nom -> {'calls', 'errors', 'sum', 'buckets', 'recent'}
+        self._calls = threading.local()  # pile des appels mesurés en cours dans le thread (échec signalé ?)
+
+    def _entry(self, name):
+        return self.functions.setdefault(name, {
+            'calls': 0, 'errors': 0, 'sum': 0.0,
+            'buckets': [0] * len(BUCKETS), 'recent': deque(maxlen=self.window),
+        })
+
+    def observe(self, name, seconds, error=False):
+        with self.lock:
+            entry = self._entry(name)
+            entry['calls'] += 1
+            entry['sum'] += seconds
+            entry['recent'].append(seconds)
+            if error:
+                entry['errors'] += 1
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    entry['buckets'][i] += 1
+
+    def timed(self, name=None):
+        """Décorateur : mesure chaque appel de la fonction (sous son nom, ou `name`)."""
+        def decorator(func):
+            metric = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                calls = self._calls.__dict__.setdefault('stack', [])
+                calls.append(False)
+                start = time.perf_counter()
+                error = False
+                try:
+                    return func(*args, **kwargs)
+                except Exception:
+                    error = True
+                    raise
+                finally:
+                    failed = calls.pop()
+                    self.observe(metric, time.perf_counter() - start, error or failed)
+            return wrapper
+        return decorator
+
+    def fail(self):
+        """Compte l'appel mesuré en cours comme une erreur (exception rattrapée, valeur de repli renvoyée)."""
+        calls = getattr(self._calls, 'stack', None)
+        if calls:
+            calls[-1] = True
+
+    def reset(self):
+        with self.lock:
+            self.functions.clear()
+
+    def snapshot(self):
+        """Par fonction : appels, exceptions, durée totale et p50/p95/max (secondes) sur la fenêtre récente."""
+        with self.lock:
+            functions = {name: (dict(entry), sorted(entry['recent'])) for name, entry in self.functions.items()}
+
+        def quantile(values, q):
+            return values[min(len(values) - 1, int(q * len(values)))] if values else None
+
+        return {
+            name: {
+                'calls': entry['calls'],
+                'errors': entry['errors'],
+                'sum': entry['sum'],
+                'buckets': list(entry['buckets']),
+                'p50': quantile(recent, 0.5),
+                'p95': quantile(recent, 0.95),
+                'max': recent[-1] if recent else None,
+            }
+            for name, (entry, recent) in sorted(functions.items())
+        }
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus(metrics, cache_stats=None, transport_stats=None, prefix='epl'):
+    """Texte d'exposition Prometheus des mesures des fonctions, du cache et de la couche HTTP."""
+    lines = []
+
+    def family(name, kind, help_text, samples):
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        for suffix, labels, value in samples:
+            rendered = ','.join(f'{key}="{_label(val)}"' for key, val in labels.items())
+            lines.append(f"{prefix}_{name}{suffix}{{{rendered}}} {value}")
+
+    functions = metrics.snapshot()
+    family('function_calls_total', 'counter', "Appels de la fonction.",
+           [('', {'function': n}, f['calls']) for n, f in functions.items()])
+    family('function_errors_total', 'counter', "Appels terminés par une exception.",
+           [('', {'function': n}, f['errors']) for n, f in functions.items()])
+    histogram = []
+    for n, f in functions.items():
+        for bound, count in zip(BUCKETS, f['buckets']):
+            histogram.append(('_bucket', {'function': n, 'le': bound}, count))
+        histogram.append(('_bucket', {'function': n, 'le': '+Inf'}, f['calls']))
+        histogram.append(('_sum', {'function': n}, f"{f['sum']:.6f}"))
+        histogram.append(('_count', {'function': n}, f['calls']))
+    family('function_duration_seconds', 'histogram', "Durée des appels, en secondes.", histogram)
+
+    if cache_stats is not None:
+        family('cache_hits_total', 'counter', "Résultats servis depuis le cache.",
+               [('', {'function': n}, c['hits']) for n, c in cache_stats.items()])
+        family('cache_misses_total', 'counter', "Résultats recalculés (absents ou expirés).",
+               [('', {'function': n}, c['misses']) for n, c in cache_stats.items()])
+        family('cache_entries', 'gauge', "Résultats actuellement en cache.",
+               [('', {'function': n}, c['entries']) for n, c in cache_stats.items()])
+
+    if transport_stats is not None:
+        family('http_requests_total', 'counter', "Requêtes HTTP vers Supabase, reprises comprises.",
+               [('', {'endpoint': n}, e['requests']) for n, e in transport_stats.items()])
+        family('http_errors_total', 'counter', "Requêtes HTTP en erreur (réseau ou 5xx).",
+               [('', {'endpoint': n}, e['errors']) for n, e in transport_stats.items()])
+        family('http_retries_total', 'counter', "Lectures rejouées.",
+               [('', {'endpoint': n}, e['retries']) for n, e in transport_stats.items()])
+
+    return '\n'.join(lines) + '\n'
+
+
+class TextfileExporter:
+    """Écrit `render()` dans `path` toutes les `interval` secondes (écriture atomique par renommage)."""
+
+    def __init__(self, path, render, interval=15.0):
+        self.path = path
+        self.render = render
+        self.interval = interval
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def write(self):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(tmp, self.path)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.write()
+                self.last_error = None
+            except Exception as e:  # un disque plein ne doit pas arrêter le thread
+                self.last_error = f"{type(e).__name__}: {e}"
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="metrics-textfile", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,248 @@
+"""
+File d'attente locale des appels (write-behind).
+
+Le formulaire « Enregistrer l'appel » ne parle plus directement à la base : l'appel est
+écrit dans un petit fichier SQLite local (durable, il survit à un redémarrage de
+l'application) et le délégué reçoit un accusé de réception immédiat. Un thread de fond
+vide la file par lots, un seul aller-retour par lot (`Repository.save_roll_calls`), avec
+un recul exponentiel (et un peu d'aléa) quand la base est lente ou injoignable. Un appel
+refusé `max_attempts` fois passe à l'état « failed » : il reste dans la file, n'est plus
+retenté automatiquement et est signalé dans l'onglet Maintenance.
+
+Chaque appel a une clé d'idempotence (cours, date, filière) : une nouvelle soumission
+du même appel remplace celle qui attend encore, et rejouer un appel déjà écrit est
+sans effet puisque l'écriture d'un appel est elle-même idempotente.
+"""
+import json
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attendance_outbox (
+    key TEXT PRIMARY KEY,
+    course_id INTEGER NOT NULL,
+    date_time TEXT NOT NULL,
+    stream TEXT,
+    records TEXT NOT NULL,
+    revision INTEGER NOT NULL DEFAULT 1,
+    enqueued_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    status TEXT NOT NULL DEFAULT 'pending'
+);
+CREATE INDEX IF NOT EXISTS attendance_outbox_due_idx ON attendance_outbox (next_attempt_at);
+"""
+
+
+def idempotency_key(course_id, date_time, stream):
+    return f"{course_id}|{date_time}|{stream}"
+
+
+class AttendanceOutbox:
+    """
+    File durable des appels en attente d'écriture.
+
+    - `batch_size` : appels envoyés au plus par cycle du thread de fond (en un aller-retour) ;
+    - `base_delay` / `max_delay` (secondes) : recul exponentiel après un échec ;
+    - `max_attempts` : échecs d'un même appel avant de le passer à l'état « failed » ;
+    - `poll_interval` : attente maximale entre deux cycles quand la file est vide ;
+    - `on_written(course_id, date_time, stream, records)` : appelé après chaque écriture réussie
+      (invalidation des caches concernés).
+    """
+
+    def __init__(self, path, repo, batch_size=20, base_delay=1.0, max_delay=300.0, max_attempts=10,
+                 poll_interval=5.0, on_written=None):
+        self.repo = repo
+        self.on_written = on_written
+        self.batch_size = batch_size
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.RLock()
+        with self.lock:
+            if path != ':memory:':
+                self.conn.execute("PRAGMA journal_mode = WAL")
+            # Files créées avant l'état « failed »
+            columns = {row['name'] for row in self.conn.execute("PRAGMA table_info(attendance_outbox)")}
+            if columns and 'status' not in columns:
+                with self.conn:
+                    self.conn.execute("ALTER TABLE attendance_outbox ADD COLUMN status TEXT NOT NULL DEFAULT 'pending'")
+            self.conn.executescript(SCHEMA)
+
+        # Mesures affichées dans l'onglet Maintenance
+        self.flush_latencies = deque(maxlen=200)  # secondes entre la soumission et l'écriture en base
+        self.last_flush_at = None
+        self.last_error = None
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- Côté formulaire ---
+    def enqueue(self, course_id, date_time, stream, records):
+        """Met un appel en file et retourne sa clé d'idempotence (aucun appel réseau)."""
+        key = idempotency_key(course_id, date_time, stream)
+        now = time.time()
+        with self.lock, self.conn:
+            # Une nouvelle soumission remplace l'ancienne et repart sans délai de recul
+            self.conn.execute(
+                "INSERT INTO attendance_outbox (key, course_id, date_time, stream, records, enqueued_at, next_attempt_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET records = excluded.records, revision = revision + 1, "
+                "enqueued_at = excluded.enqueued_at, attempts = 0, next_attempt_at = excluded.next_attempt_at, "
+                "last_error = NULL, status = 'pending'",
+                (key, course_id, date_time, stream, json.dumps(records), now, now)
+            )
+        self._wake.set()
+        return key
+
+    # --- Côté thread de fond ---
+    def flush(self, now=None):
+        """
+        Envoie les appels arrivés à échéance (un lot au plus) en un seul aller-retour ;
+        retourne le nombre d'appels écrits.
+        """
+        now = time.time() if now is None else now
+        with self.lock:
+            due = [dict(row) for row in self.conn.execute(
+                "SELECT * FROM attendance_outbox WHERE status = 'pending' AND next_attempt_at <= ? "
+                "ORDER BY enqueued_at LIMIT ?",
+                (now, self.batch_size)
+            ).fetchall()]
+        if not due:
+            return 0
+
+        for item in due:
+            item['records'] = json.loads(item['records'])
+        try:
+            results = self.repo.save_roll_calls([
+                {'course_id': item['course_id'], 'date_time': item['date_time'], 'records': item['records']}
+                for item in due
+            ])
+        except Exception as e:
+            # Base injoignable ou lot refusé en entier : tout le lot repart avec recul
+            for item in due:
+                self._reschedule(item, f"{type(e).__name__}: {e}")
+            return 0
+
+        written = []
+        for item, result in zip(due, results):
+            if result.get('error') is not None:
+                self._reschedule(item, result['error'])
+            else:
+                written.append(item)
+        with self.lock, self.conn:
+            # Ne retire que la version envoyée : une resoumission arrivée entre-temps reste en file
+            self.conn.executemany(
+                "DELETE FROM attendance_outbox WHERE key = ? AND revision = ?",
+                [(item['key'], item['revision']) for item in written]
+            )
+        if written:
+            self.last_flush_at = time.time()
+        for item in written:
+            self.flush_latencies.append(self.last_flush_at - item['enqueued_at'])
+            if self.on_written is not None:
+                self.on_written(item['course_id'], item['date_time'], item['stream'], item['records'])
+        return len(written)
+
+    def _reschedule(self, item, error):
+        attempts = item['attempts'] + 1
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+        status = 'failed' if attempts >= self.max_attempts else 'pending'
+        self.last_error = error
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE attendance_outbox SET attempts = ?, next_attempt_at = ?, last_error = ?, status = ? "
+                "WHERE key = ? AND revision = ?",
+                (attempts, time.time() + delay, error, status, item['key'], item['revision'])
+            )
+
+    def retry_failed(self):
+        """Remet en file les appels à l'état « failed » (sans délai) ; retourne leur nombre."""
+        with self.lock, self.conn:
+            count = self.conn.execute(
+                "UPDATE attendance_outbox SET status = 'pending', attempts = 0, next_attempt_at = ? "
+                "WHERE status = 'failed'",
+                (time.time(),)
+            ).rowcount
+        self._wake.set()
+        return count
+
+    def _next_wait(self):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT min(next_attempt_at) FROM attendance_outbox WHERE status = 'pending'"
+            ).fetchone()
+        if row[0] is None:
+            return self.poll_interval
+        return max(0.0, min(self.poll_interval, row[0] - time.time()))
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                # Un lot complet laisse supposer qu'il en reste : on enchaîne sans attendre
+                if self.flush() >= self.batch_size:
+                    continue
+            except Exception as e:  # la file locale elle-même ne doit jamais arrêter le thread
+                self.last_error = f"{type(e).__name__}: {e}"
+            self._wake.wait(self._next_wait())
+            self._wake.clear()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="attendance-outbox", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    # --- Suivi ---
+    def pending(self):
+        """Appels en attente ou en échec (`status`), du plus ancien au plus récent."""
+        with self.lock:
+            return [dict(row) for row in self.conn.execute(
+                "SELECT key, course_id, date_time, stream, status, enqueued_at, attempts, next_attempt_at, last_error "
+                "FROM attendance_outbox ORDER BY enqueued_at"
+            ).fetchall()]
+
+    def stats(self):
+        """
+        Profondeur de la file (hors appels en échec), âge du plus ancien appel en attente, appels
+        en reprise et en échec, latences d'écriture (p50/p95, secondes).
+        """
+        with self.lock:
+            depth, oldest, failing, failed = self.conn.execute(
+                "SELECT count(*) FILTER (WHERE status = 'pending'), min(enqueued_at) FILTER (WHERE status = 'pending'), "
+                "count(*) FILTER (WHERE status = 'pending' AND attempts > 0), count(*) FILTER (WHERE status = 'failed') "
+                "FROM attendance_outbox"
+            ).fetchone()
+        latencies = sorted(self.flush_latencies)
+
+        def quantile(q):
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))] if latencies else None
+
+        return {
+            'depth': depth,
+            'failing': failing,
+            'failed': failed,
+            'oldest_age': time.time() - oldest if oldest is not None else None,
+            'flush_p50': quantile(0.5),
+            'flush_p95': quantile(0.95),
+            'flushed': len(latencies),
+            'last_flush_at': self.last_flush_at,
+            'last_error': self.last_error,
+            'running': self._thread is not None and self._thread.is_alive(),
+        }
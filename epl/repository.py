@@ -0,0 +1,194 @@
+"""
+Couche d'accès aux données du portail.
+
+Toutes les requêtes de l'application passent par un `Repository`. Deux implémentations
+partagent exactement la même sémantique (mêmes colonnes, mêmes formes imbriquées que
+les jointures PostgREST) :
+
+- `SupabaseRepository` : le projet Supabase hébergé (production) ;
+- `SQLiteRepository` : une base locale, pour mesurer et tester hors ligne.
+
+Le choix se fait par configuration via `create_repository()`.
+
+Chaque méthode correspond à un seul aller-retour vers la base : c'est ce que
+compte la suite de benchmarks.
+"""
+from abc import ABC, abstractmethod
+
+# Tables et vue manipulées par l'application
+TABLES = ('students', 'courses', 'sessions', 'attendance', 'delegate_access')
+STATS_VIEW = 'student_stats'
+# Colonnes de student_stats selon lesquelles l'explorateur peut trier
+STATS_SORT_COLUMNS = ('attendance_percentage', 'absent_count', 'present_count', 'total_sessions',
+                      'last_name', 'first_name', 'student_id', 'stream', 'last_session_at')
+
+BACKENDS = ('supabase', 'sqlite')
+
+
+class Repository(ABC):
+    """Interface commune des backends de données."""
+
+    # --- Identifiants (delegate_access) ---
+    @abstractmethod
+    def list_credentials(self):
+        """Identifiants et rôles de delegate_access, sans mot de passe ni haché : [{'id', 'role'}]."""
+
+    @abstractmethod
+    def get_credential(self, identifier):
+        """
+        La ligne de delegate_access d'identifiant `identifier`, sans tenir compte de la casse
+        (lower(id) est indexé et unique), ou None :
+        {'id', 'role', 'password_hash', 'password'} (`password` : ancien mot de passe en clair, ou None).
+        """
+
+    @abstractmethod
+    def upsert_credentials(self, records):
+        """Insère ou met à jour des lignes de delegate_access (conflit sur id)."""
+
+    # --- Étudiants ---
+    @abstractmethod
+    def find_students_by_id(self, student_id):
+        """Étudiants dont l'id est exactement `student_id` (liste de 0 ou 1 ligne)."""
+
+    @abstractmethod
+    def list_students(self, stream=None, updated_after=None):
+        """
+        Étudiants d'une filière (ou tous si `stream` est None), triés par nom.
+        Avec `updated_after`, seulement ceux dont `updated_at` est postérieur (synchronisation différentielle).
+        """
+
+    @abstractmethod
+    def insert_student(self, data):
+        """Insère un étudiant et retourne les lignes créées."""
+
+    @abstractmethod
+    def insert_students(self, records):
+        """Insère plusieurs étudiants en une requête."""
+
+    @abstractmethod
+    def upsert_students(self, records):
+        """Insère ou met à jour plusieurs étudiants en une requête (conflit sur id)."""
+
+    # --- Cours ---
+    @abstractmethod
+    def list_courses(self, stream=None, updated_after=None):
+        """Cours d'une filière (ou tous si `stream` est None) ; `updated_after` comme pour list_students."""
+
+    @abstractmethod
+    def insert_courses(self, records):
+        """Insère plusieurs cours en une requête et retourne les lignes créées (avec leur id)."""
+
+    # --- Sessions ---
+    @abstractmethod
+    def find_session_id(self, course_id, date_time):
+        """Id de la session (course_id, date_time), ou None."""
+
+    @abstractmethod
+    def create_session(self, course_id, date_time):
+        """Crée une session et retourne son id."""
+
+    @abstractmethod
+    def save_roll_call(self, course_id, date_time, records):
+        """
+        Crée ou retrouve la session (course_id, date_time) et écrit toutes ses présences
+        `records` ([{'student_id', 'status'}]) dans une même transaction ; retourne l'id de la session.
+        """
+
+    @abstractmethod
+    def save_roll_calls(self, roll_calls):
+        """
+        Plusieurs `save_roll_call` en un seul aller-retour : `roll_calls` = [{'course_id', 'date_time',
+        'records'}]. Chaque appel est atomique et indépendant des autres ; retourne, dans l'ordre,
+        [{'session_id'}] pour un appel écrit ou [{'error'}] (message) pour un appel refusé par la base.
+        """
+
+    @abstractmethod
+    def list_sessions(self, course_ids, limit=20, date_from=None, date_to=None, before=None):
+        """
+        Sessions des cours `course_ids`, plus récentes d'abord (ordre date_time, id décroissants) :
+        [{'id', 'course_id', 'date_time', 'courses': {'name'}}]. `date_from` inclus et `date_to` exclu
+        filtrent date_time ; `before` = (date_time, id) de la dernière ligne de la page précédente.
+        """
+
+    @abstractmethod
+    def list_recent_sessions(self, limit=100, stream=None, created_from=None, created_to=None, before=None):
+        """
+        Sessions les plus récemment créées d'abord (ordre created_at, id décroissants), avec
+        `courses(name, stream_target)`. Filtres côté base : filière du cours, `created_from` inclus et
+        `created_to` exclu (horodatages ISO) ; `before` = (created_at, id) de la dernière ligne de la
+        page précédente (pagination keyset).
+        """
+
+    # --- Présences ---
+    @abstractmethod
+    def upsert_attendance(self, records):
+        """Insère ou met à jour des présences (conflit sur session_id, student_id)."""
+
+    @abstractmethod
+    def list_session_attendance(self, session_id):
+        """Présences d'une session : [{'student_id', 'status'}]."""
+
+    @abstractmethod
+    def student_course_stats(self, student_id):
+        """
+        Présences d'un étudiant agrégées par matière côté base :
+        [{'course_name', 'present_count', 'total_count'}] (course_name None pour une séance sans cours).
+        """
+
+    @abstractmethod
+    def attendance_export_page(self, after=None, limit=1000):
+        """
+        Une page de présences ordonnées sur (session_id, student_id), strictement après la clé
+        `after`, avec `students(...)` et `sessions(date_time, courses(name))`.
+        """
+
+    # --- Vue et comptages ---
+    @abstractmethod
+    def list_student_stats(self):
+        """Toutes les lignes de la vue student_stats."""
+
+    @abstractmethod
+    def query_student_stats(self, streams=None, search=None, max_rate=None, order_by='attendance_percentage',
+                            descending=False, limit=50, offset=0):
+        """
+        Une page de student_stats filtrée et triée côté base, avec le nombre total de lignes filtrées :
+        {'rows': [...], 'total': n}. Filtres : filières (`streams`), texte contenu dans le nom, le prénom
+        ou le matricule (`search`), taux strictement inférieur à `max_rate`. Tri sur une colonne de
+        STATS_SORT_COLUMNS, puis par matricule pour un ordre stable entre les pages.
+        """
+
+    @abstractmethod
+    def count_rows(self, table, estimated=False):
+        """Nombre de lignes d'une table (exact, ou estimation bon marché si `estimated`)."""
+
+    @abstractmethod
+    def database_statistics(self, weeks=8):
+        """
+        Statistiques de la base en une requête, sans parcours complet des tables :
+        {'tables': [{'table', 'estimated_rows', 'total_bytes'}],
+         'weekly': [{'week' (lundi, 'YYYY-MM-DD'), 'sessions', 'attendance'}]} sur les `weeks` dernières semaines.
+        """
+
+
+def create_repository(backend='supabase', **options):
+    """
+    Construit le backend demandé.
+
+    - 'supabase' : options `url` et `key` (ou `client`, un client déjà créé), et `http_client`
+      (un `httpx.Client`, voir epl/transport.py) pour régler pool, délais et reprises ;
+    - 'sqlite'   : option `path` (fichier de la base locale, ':memory:' accepté).
+    """
+    if backend == 'supabase':
+        from epl.supabase_repository import SupabaseRepository
+        client = options.get('client')
+        if client is None:
+            from supabase import ClientOptions, create_client
+            client_options = ClientOptions()
+            if options.get('http_client') is not None:
+                client_options.httpx_client = options['http_client']
+            client = create_client(options['url'], options['key'], client_options)
+        return SupabaseRepository(client)
+    if backend == 'sqlite':
+        from epl.sqlite_repository import SQLiteRepository
+        return SQLiteRepository(options.get('path', 'epl_local.db'))
+    raise ValueError(f"Backend de données inconnu : {backend!r} (attendu : {', '.join(BACKENDS)})")
@@ -0,0 +1,103 @@
+"""
+Listes d'étudiants et de cours gardées en mémoire, synchronisées par différence.
+
+Au premier accès la table entière est chargée ; ensuite, au plus toutes les
+`refresh_interval` secondes, une seule requête demande les lignes dont `updated_at`
+dépasse le filigrane (la plus récente valeur déjà vue) — zéro ligne en régime établi.
+La table est gardée entière, toutes filières confondues : un étudiant qui change de
+filière quitte l'ancienne liste et rejoint la nouvelle avec la même requête.
+
+Les suppressions et les lignes validées avec un `updated_at` antérieur au filigrane ne
+sont pas vues par la requête différentielle : une resynchronisation complète les
+rattrape toutes les `full_sync_interval` secondes.
+"""
+import threading
+import time
+from datetime import datetime
+
+
+def _timestamp(value):
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+class RosterCache:
+    """
+    Une table en mémoire indexée par `key`.
+
+    `load(updated_after)` interroge la base : tout si `updated_after` est None, sinon
+    seulement les lignes modifiées après ce filigrane.
+    """
+
+    def __init__(self, load, stream_field, order_by, key='id', refresh_interval=10.0, full_sync_interval=1800.0):
+        self.load = load
+        self.stream_field = stream_field
+        self.order_by = order_by
+        self.key = key
+        self.refresh_interval = refresh_interval
+        self.full_sync_interval = full_sync_interval
+
+        self.lock = threading.RLock()
+        self.rows = {}
+        self.watermark = None
+        self.checked_at = None
+        self.full_sync_at = None
+        # Suivi : nombre de synchronisations et lignes reçues à la dernière ; lectures servies
+        # sans requête (hits) ou précédées d'une synchronisation (misses), invalidations
+        self.full_syncs = 0
+        self.delta_syncs = 0
+        self.last_delta_rows = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _apply(self, rows):
+        for row in rows:
+            self.rows[row[self.key]] = row
+            stamp = row.get('updated_at')
+            if stamp is not None and (self.watermark is None or _timestamp(stamp) > _timestamp(self.watermark)):
+                self.watermark = stamp
+
+    def sync(self, force_full=False):
+        """Met la copie en mémoire à jour (complète ou différentielle) ; retourne le nombre de lignes reçues."""
+        with self.lock:
+            now = time.monotonic()
+            full = (force_full or self.full_sync_at is None or self.watermark is None
+                    or now - self.full_sync_at >= self.full_sync_interval)
+            if full:
+                rows = self.load(None)
+                self.rows, self.watermark = {}, None
+                self._apply(rows)
+                self.full_sync_at = now
+                self.full_syncs += 1
+            else:
+                rows = self.load(self.watermark)
+                self._apply(rows)
+                self.delta_syncs += 1
+                self.last_delta_rows = len(rows)
+            self.checked_at = now
+            return len(rows)
+
+    def invalidate(self):
+        """Force une synchronisation différentielle au prochain accès (après une écriture de l'application)."""
+        with self.lock:
+            self.checked_at = None
+            self.invalidations += 1
+
+    def select(self, stream=None):
+        """Lignes d'une filière (ou toutes), triées ; synchronise d'abord si la copie a plus de `refresh_interval` s."""
+        with self.lock:
+            if self.checked_at is None or time.monotonic() - self.checked_at >= self.refresh_interval:
+                self.misses += 1
+                self.sync()
+            else:
+                self.hits += 1
+            rows = [dict(row) for row in self.rows.values()
+                    if stream is None or row.get(self.stream_field) == stream]
+        rows.sort(key=lambda row: (row.get(self.order_by) is None, row.get(self.order_by)))
+        return rows
+
+    def stats(self):
+        """Compteurs sous la même forme que ceux de `TaggedCache.stats()` (une entrée par ligne en mémoire)."""
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'invalidated': self.invalidations,
+                    'refreshes': self.delta_syncs, 'entries': len(self.rows)}
@@ -0,0 +1,181 @@
+"""
+Index de recherche en mémoire sur la liste des étudiants.
+
+Remplace les requêtes `ilike` envoyées à chaque recherche : l'index répond sans
+aller-retour réseau, avec trois niveaux de correspondance, du plus au moins précis :
+
+1. matricule exact ou préfixe de matricule (« LF-LT-01 ») ;
+2. préfixes des mots du nom et du prénom (« kof am » trouve « KOFFI Ama ») ;
+3. similarité de trigrammes, pour tolérer les fautes de frappe (« kofi » trouve « KOFFI »).
+
+La comparaison ignore la casse et les accents. L'index est mis à jour étudiant par
+étudiant (`upsert`, `remove`) quand le Super Admin ajoute ou modifie un profil.
+"""
+import bisect
+import heapq
+import re
+import threading
+import unicodedata
+
+# Similarité de trigrammes minimale (coefficient de Dice) pour retenir un résultat approché
+TRIGRAM_THRESHOLD = 0.35
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text):
+    """Minuscules sans accents : « Élodie » -> « elodie »."""
+    decomposed = unicodedata.normalize('NFKD', str(text or ''))
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(normalize(text))
+
+
+def trigrams(token):
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class StudentSearchIndex:
+
+    def __init__(self, students=()):
+        self._lock = threading.RLock()
+        self._students = {}        # id -> ligne étudiant
+        self._ids = []             # matricules normalisés triés (recherche par préfixe)
+        self._id_keys = {}         # matricule normalisé -> id
+        self._tokens = {}          # mot du nom/prénom -> {ids}
+        self._sorted_tokens = []   # mots triés (recherche par préfixe)
+        self._grams = {}           # trigramme -> {mots}
+        self._gram_counts = {}     # mot -> nombre de trigrammes
+        self._student_tokens = {}  # id -> {mots}
+        for student in students:
+            self.upsert(student)
+
+    def __len__(self):
+        return len(self._students)
+
+    # --- Mise à jour incrémentale ---
+    def upsert(self, student):
+        """
+        Ajoute ou met à jour un étudiant dans l'index. `student` peut ne contenir que le matricule
+        et les colonnes modifiées : les autres gardent leur valeur indexée.
+        """
+        with self._lock:
+            student_id = student['id']
+            if student_id in self._students:
+                student = {**self._students[student_id], **student}
+                self.remove(student_id)
+
+            self._students[student_id] = dict(student)
+            id_key = normalize(student_id)
+            self._id_keys[id_key] = student_id
+            bisect.insort(self._ids, id_key)
+
+            words = set(tokenize(student.get('last_name'))) | set(tokenize(student.get('first_name')))
+            self._student_tokens[student_id] = words
+            for word in words:
+                owners = self._tokens.setdefault(word, set())
+                if not owners:
+                    bisect.insort(self._sorted_tokens, word)
+                    grams = trigrams(word)
+                    self._gram_counts[word] = len(grams)
+                    for gram in grams:
+                        self._grams.setdefault(gram, set()).add(word)
+                owners.add(student_id)
+
+    def remove(self, student_id):
+        """Retire un étudiant de l'index (sans effet s'il n'y est pas)."""
+        with self._lock:
+            if self._students.pop(student_id, None) is None:
+                return
+            id_key = normalize(student_id)
+            del self._id_keys[id_key]
+            self._ids.pop(bisect.bisect_left(self._ids, id_key))
+
+            for word in self._student_tokens.pop(student_id):
+                owners = self._tokens[word]
+                owners.discard(student_id)
+                if not owners:
+                    del self._tokens[word]
+                    del self._gram_counts[word]
+                    self._sorted_tokens.pop(bisect.bisect_left(self._sorted_tokens, word))
+                    for gram in trigrams(word):
+                        self._grams[gram].discard(word)
+
+    # --- Recherche ---
+    def _prefixed(self, sorted_keys, prefix):
+        start = bisect.bisect_left(sorted_keys, prefix)
+        end = bisect.bisect_left(sorted_keys, prefix + '\uffff')
+        return sorted_keys[start:end]
+
+    def _similar_words(self, word):
+        """Mots de l'index proches de `word`, avec leur similarité de trigrammes."""
+        query_grams = trigrams(word)
+        shared = {}
+        for gram in query_grams:
+            for candidate in self._grams.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        similar = {}
+        for candidate, count in shared.items():
+            score = 2 * count / (len(query_grams) + self._gram_counts[candidate])
+            if score >= TRIGRAM_THRESHOLD:
+                similar[candidate] = score
+        return similar
+
+    def _word_scores(self, word):
+        """Mots de l'index qui correspondent à `word` : préfixe exact (score 1.5, 2 si égal) ou approché."""
+        scores = self._similar_words(word)
+        for token in self._prefixed(self._sorted_tokens, word):
+            scores[token] = 2.0 if token == word else 1.5
+        return scores
+
+    def search(self, query, limit=10):
+        """Étudiants correspondant à `query`, les plus pertinents d'abord."""
+        key = normalize(query).strip()
+        if not key:
+            return []
+
+        with self._lock:
+            scores = {}
+
+            # 1. Matricule exact ou préfixe
+            if key in self._id_keys:
+                scores[self._id_keys[key]] = 3.0
+            for id_key in self._prefixed(self._ids, key):
+                scores.setdefault(self._id_keys[id_key], 2.5)
+
+            # 2 et 3. Chaque mot de la requête doit correspondre à un mot du nom ou du prénom
+            word_scores = [self._word_scores(word) for word in tokenize(query)]
+            if len(word_scores) == 1:
+                # Un seul mot : on parcourt les mots de l'index du plus au moins proche
+                # et on s'arrête dès que `limit` étudiants sont trouvés
+                found, last_score = 0, None
+                for token, score in sorted(word_scores[0].items(), key=lambda item: -item[1]):
+                    if found >= limit and score < last_score:
+                        break
+                    for student_id in self._tokens[token]:
+                        if student_id not in scores:
+                            scores[student_id] = score
+                            found += 1
+                    last_score = score
+            elif word_scores:
+                per_word = []
+                for token_scores in word_scores:
+                    matches = {}
+                    for token, score in token_scores.items():
+                        for student_id in self._tokens[token]:
+                            matches[student_id] = max(matches.get(student_id, 0), score)
+                    per_word.append(matches)
+
+                common = set.intersection(*(set(m) for m in per_word))
+                for student_id in common:
+                    score = sum(m[student_id] for m in per_word) / len(per_word)
+                    scores[student_id] = max(scores.get(student_id, 0), score)
+
+            ranked = heapq.nsmallest(
+                limit, scores,
+                key=lambda sid: (-scores[sid], self._students[sid].get('last_name') or '', sid)
+            )
+            return [dict(self._students[sid]) for sid in ranked]
@@ -0,0 +1,358 @@
+"""
+Services partagés par les pages de l'application Streamlit.
+
+Ressources créées une fois par processus (client HTTP, Repository, caches, file des
+appels, mesures) et fonctions appelées par les pages (`views/`) : chargements mis en
+cache, écritures et invalidations. Les calculs eux-mêmes sont dans `epl/backend.py`.
+
+Le module est importé par chaque page : il n'est exécuté qu'au premier import du
+processus, pas à chaque réexécution du script. La configuration est vérifiée avant par
+le point d'entrée (`epl.config.check_configuration()`).
+"""
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from epl import auth, backend
+from epl.cache import Snapshot, TaggedCache
+from epl.config import DATA_BACKEND, SUPABASE_KEY, SUPABASE_URL, get_setting
+from epl.metrics import Metrics, TextfileExporter, render_prometheus
+from epl.outbox import AttendanceOutbox
+from epl.repository import create_repository
+from epl.roster import RosterCache
+from epl.search import StudentSearchIndex
+from epl.tracing import TracingRepository
+from epl.transport import create_http_client
+
+# NOTE: La variable CREDENTIALS n'est plus nécessaire ici. 
+# La logique de connexion vérifie un identifiant et son mot de passe haché (voir epl/auth.py).
+
+# Client HTTP sous Supabase : pool keep-alive, délais explicites et reprises des lectures (voir epl/transport.py)
+@st.cache_resource(on_release=lambda http: http[0].close())
+def init_http_client():
+    return create_http_client(
+        connect_timeout=float(get_setting("SUPABASE_CONNECT_TIMEOUT", 5)),
+        read_timeout=float(get_setting("SUPABASE_READ_TIMEOUT", 15)),
+        pool_size=int(get_setting("SUPABASE_POOL_SIZE", 20)),
+        keepalive_expiry=float(get_setting("SUPABASE_KEEPALIVE", 30)),
+        retries=int(get_setting("SUPABASE_RETRIES", 2)),
+    )
+
+# Le Repository est enveloppé pour la trace des requêtes (sans effet quand la trace est inactive)
+@st.cache_resource
+def init_repository():
+    if DATA_BACKEND == "supabase":
+        return TracingRepository(
+            create_repository("supabase", url=SUPABASE_URL, key=SUPABASE_KEY, http_client=init_http_client()[0])
+        )
+    return TracingRepository(create_repository(DATA_BACKEND, path=get_setting("SQLITE_PATH", "epl_local.db")))
+
+repo = init_repository()
+
+# Cache partagé invalidé par étiquettes (« students:<filière> », « student:<id> », « sessions »...) ;
+# un résultat qui couvre toutes les filières porte « students:* »
+@st.cache_resource
+def init_cache():
+    return TaggedCache()
+
+cache = init_cache()
+
+# Mesures des fonctions du chemin critique (appels, exceptions, durées), partagées entre les sessions
+@st.cache_resource
+def init_metrics():
+    return Metrics()
+
+metrics = init_metrics()
+
+def cache_stats():
+    """
+    Succès / échecs par cache : résultats mémorisés (`load_*` de TaggedCache), index de recherche,
+    listes d'étudiants et de cours en mémoire, copie student_stats des tableaux de bord.
+    """
+    index = dict(search_index_counter)
+    rosters = get_rosters()
+    return {
+        **cache.stats(),
+        'load_search_index': {'hits': index['lookups'] - index['builds'], 'misses': index['builds'],
+                              'invalidated': index['invalidated'], 'refreshes': 0, 'entries': int(index['builds'] > 0)},
+        'load_students': rosters['students'].stats(),
+        'load_courses': rosters['courses'].stats(),
+        'load_global_stats': get_stats_snapshot().stats(),
+    }
+
+def render_metrics():
+    """Texte d'exposition Prometheus : fonctions, caches et (avec Supabase) couche HTTP."""
+    transport_stats = init_http_client()[1].stats.snapshot() if DATA_BACKEND == "supabase" else None
+    return render_prometheus(metrics, cache_stats(), transport_stats)
+
+# Avec METRICS_PATH, le texte est réécrit toutes les 15 s pour un scrapeur local (collecteur « textfile »)
+@st.cache_resource(on_release=lambda exporter: exporter and exporter.stop())
+def init_metrics_exporter():
+    path = get_setting("METRICS_PATH")
+    return TextfileExporter(path, render_metrics).start() if path else None
+
+init_metrics_exporter()
+
+# Copie versionnée de la vue student_stats pour les tableaux de bord (rechargée en arrière-plan)
+@st.cache_resource
+def get_stats_snapshot():
+    return Snapshot(lambda: pd.DataFrame(repo.list_student_stats()), max_age=300)
+
+def invalidate_attendance(student_ids):
+    """Après une écriture de présences : sessions récentes, statistiques des étudiants concernés et tableaux de bord."""
+    cache.invalidate('sessions', *(f"student:{sid}" for sid in student_ids))
+    get_stats_snapshot().invalidate()
+
+# File locale des appels : l'appel est accusé immédiatement, un thread de fond l'écrit en base
+@st.cache_resource(on_release=lambda outbox: outbox.stop())
+def init_outbox():
+    return AttendanceOutbox(
+        get_setting("OUTBOX_PATH", "epl_outbox.db"), repo,
+        on_written=lambda course_id, date_time, stream, records: invalidate_attendance(r['student_id'] for r in records)
+    ).start()
+
+outbox = init_outbox()
+
+def get_session_state():
+    if 'user_role' not in st.session_state: 
+        st.session_state['user_role'] = None
+    if 'user_scope' not in st.session_state: 
+        st.session_state['user_scope'] = None
+
+# Vérifications de connexion réussies récentes (empreintes, jamais les mots de passe ni la table)
+@st.cache_resource
+def get_verified_sessions():
+    return auth.VerifiedSessionCache(ttl=300)
+
+def login(identifier, password):
+    # Une seule ligne lue, par identifiant (ADMIN, PROF, LT, GC...), mot de passe vérifié sur son haché
+    try:
+        user_info = auth.authenticate(repo, identifier, password, get_verified_sessions())
+    except Exception as e:
+        st.error(f"Erreur lors de la vérification des identifiants: {e}")
+        return False
+    
+    if user_info is None:
+        return False
+    
+    st.session_state['user_role'] = user_info['role']
+    st.session_state['user_scope'] = user_info['scope']
+    return True
+        
+# Accès à l'index et constructions (les accès sans construction sont des succès du cache)
+search_index_counter = {'lookups': 0, 'builds': 0, 'invalidated': 0}
+
+@st.cache_resource(ttl=1800)
+def load_search_index():
+    search_index_counter['builds'] += 1
+    return StudentSearchIndex(repo.list_students())
+
+def get_search_index():
+    """Index en mémoire de tous les étudiants, partagé entre les sessions (reconstruit toutes les 30 min)."""
+    search_index_counter['lookups'] += 1
+    return load_search_index()
+
+@metrics.timed()
+def search_student(identifier):
+    try:
+        return get_search_index().search(identifier, limit=10)
+    except Exception as e:
+        metrics.fail()
+        st.error(f"Erreur lors de la recherche: {e}")
+        return []
+
+@cache.memoize(ttl=300, tags=lambda student_id: [f"student:{student_id}"])
+def load_student_stats(student_id):
+    return backend.compute_student_stats(repo, student_id)
+
+@metrics.timed()
+def get_student_stats(student_id):
+    try:
+        return load_student_stats(student_id)
+    except Exception as e:
+        metrics.fail()
+        st.error(f"Erreur lors du chargement des stats: {e}")
+        return None
+
+# Étudiants et cours en mémoire : au plus une requête différentielle toutes les 10 s (zéro ligne si rien n'a changé)
+@st.cache_resource
+def get_rosters():
+    return {
+        'students': RosterCache(lambda since: repo.list_students(updated_after=since),
+                                stream_field='stream', order_by='last_name'),
+        'courses': RosterCache(lambda since: repo.list_courses(updated_after=since),
+                               stream_field='stream_target', order_by='id'),
+    }
+
+@metrics.timed()
+def get_courses(stream):
+    try:
+        return get_rosters()['courses'].select(stream)
+    except Exception:
+        metrics.fail()
+        return []
+
+@metrics.timed()
+def get_students(stream):
+    return get_rosters()['students'].select(stream)
+
+def student_tags(streams):
+    """Étiquettes d'un résultat portant sur les étudiants des filières `streams` (toutes si None)."""
+    return [f"students:{stream}" for stream in streams] if streams else ['students:*']
+
+def invalidate_student(student_id, *streams):
+    """
+    Après l'ajout ou la modification d'un étudiant : sa fiche, les résultats de ses filières `streams`
+    (l'ancienne et la nouvelle s'il en change) et ceux qui couvrent toutes les filières, sa liste.
+    La copie student_stats des tableaux de bord n'est pas invalidée : elle peut montrer l'ancien
+    nom ou l'ancienne filière jusqu'à son rechargement périodique (max_age=300, soit 5 minutes).
+    """
+    cache.invalidate(f"student:{student_id}", *(f"students:{stream}" for stream in set(streams) if stream), 'students:*')
+    get_rosters()['students'].invalidate()
+
+@metrics.timed()
+def save_attendance(course_id, date_obj, stream, present_ids, all_students):
+    # Mise en file locale uniquement : l'écriture en base est faite par le thread de fond (avec reprises)
+    try:
+        outbox.enqueue(
+            course_id, date_obj.isoformat(), stream,
+            backend.build_roll_call(all_students, lambda sid: sid in present_ids)
+        )
+        return True
+    except Exception as e:
+        metrics.fail()
+        st.error(f"❌ Erreur Technique : {e}")
+        return False
+
+@metrics.timed()
+def get_past_sessions(course_ids, date_from=None, date_to=None, before=None):
+    try:
+        return backend.list_past_sessions(repo, course_ids, date_from=date_from, date_to=date_to, before=before, limit=20)
+    except Exception as e:
+        metrics.fail()
+        st.warning(f"Impossible de charger l'historique: {e}")
+        return [], None
+
+@metrics.timed()
+def update_attendance_correction(session_id, original_presence_map, updated_presence_map):
+    try:
+        changes = backend.correct_attendance(repo, session_id, original_presence_map, updated_presence_map)
+        invalidate_attendance(r['student_id'] for r in changes)
+        return True
+    except Exception as e:
+        metrics.fail()
+        st.error(str(e))
+        return False
+
+
+ACTIVITY_PAGE_SIZE = 100
+
+@cache.memoize(ttl=60, tags=lambda *args: ['sessions'])
+def load_delegate_activity_log(stream, created_from, created_to, before):
+    return backend.build_activity_log(
+        repo, stream=stream, created_from=created_from, created_to=created_to, before=before, limit=ACTIVITY_PAGE_SIZE
+    )
+
+@metrics.timed()
+def get_delegate_activity_log(stream=None, created_from=None, created_to=None, before=None):
+    """
+    Une page du journal des sessions enregistrées (filière et période filtrées côté base), avec les
+    informations de création réelles (created_at) ; retourne (DataFrame, curseur de la page suivante).
+    """
+    try:
+        return load_delegate_activity_log(stream, created_from, created_to, before)
+    except Exception as e:
+        metrics.fail()
+        # L'erreur de données vide ne sera plus affichée si le DataFrame est vide
+        st.error(f"Erreur technique lors du chargement du journal: {e}")
+        return pd.DataFrame(), None
+        
+@metrics.timed()
+def get_global_stats():
+    """Vue student_stats depuis la copie partagée (DataFrame en lecture seule)."""
+    try:
+        return get_stats_snapshot().get()
+    except Exception:
+        metrics.fail()
+        st.warning("La vue SQL 'student_stats' n'est pas trouvée.")
+        return pd.DataFrame()
+
+# Explorateur et alertes : une page de student_stats, filtrée et triée par la base
+@cache.memoize(ttl=60, tags=lambda streams, *args: ['sessions', *student_tags(streams)])
+def load_student_stats_page(streams, search, max_rate, order_by, descending, limit, offset):
+    return repo.query_student_stats(streams=streams, search=search, max_rate=max_rate, order_by=order_by,
+                                    descending=descending, limit=limit, offset=offset)
+
+@metrics.timed()
+def get_student_stats_page(streams=None, search=None, max_rate=None, order_by='attendance_percentage',
+                           descending=False, limit=50, offset=0):
+    """Une page de student_stats et le nombre total de lignes filtrées : {'rows', 'total'}."""
+    try:
+        return load_student_stats_page(streams, search, max_rate, order_by, descending, limit, offset)
+    except Exception as e:
+        metrics.fail()
+        st.warning(f"La vue SQL 'student_stats' n'a pas pu être interrogée : {e}")
+        return {'rows': [], 'total': 0}
+
+# Une requête agrégée, servie depuis le cache et recalculée en arrière-plan après 5 minutes
+@cache.memoize(ttl=3600, refresh_after=300, tags=lambda weeks: ['db_statistics'])
+def load_database_statistics(weeks):
+    stats = repo.database_statistics(weeks)
+    stats['generated_at'] = datetime.now()
+    return stats
+
+@metrics.timed()
+def get_database_statistics(weeks=8):
+    return load_database_statistics(weeks)
+
+@metrics.timed()
+def export_attendance(path, fmt='csv', on_progress=None):
+    """Export des présences dans le fichier `path` (voir backend.export_attendance) ; les exceptions remontent."""
+    return backend.export_attendance(repo, path, fmt, on_progress=on_progress)
+
+def count_attendance_estimate():
+    """Nombre approximatif de présences (statistiques du planificateur, sans scan complet)."""
+    try:
+        return repo.count_rows('attendance', estimated=True)
+    except Exception:
+        return 0
+
+# Exports de l'onglet Super Admin
+@cache.memoize(ttl=3600, tags=lambda: student_tags(None))
+def load_all_students_export():
+    return pd.DataFrame(repo.list_students())
+
+@metrics.timed()
+def get_all_students_export():
+    try:
+        return load_all_students_export()
+    except Exception as e:
+        metrics.fail()
+        st.error(f"Erreur d'exportation étudiants: {e}")
+        return pd.DataFrame()
+
+@cache.memoize(ttl=3600, tags=lambda: ['courses'])
+def load_all_courses_export():
+    return pd.DataFrame(repo.list_courses())
+
+@metrics.timed()
+def get_all_courses_export():
+    try:
+        return load_all_courses_export()
+    except Exception as e:
+        metrics.fail()
+        st.error(f"Erreur d'exportation cours: {e}")
+        return pd.DataFrame()
+
+def purge_caches():
+    """
+    Vide les données en cache (résultats mémorisés, index de recherche, listes, tableaux de bord).
+    Les ressources (connexion, file des appels, mesures) sont conservées : les pages les ont importées.
+    """
+    cache.clear()
+    load_search_index.clear()
+    search_index_counter['invalidated'] += 1
+    get_rosters.clear()
+    get_verified_sessions.clear()
+    get_stats_snapshot().invalidate()
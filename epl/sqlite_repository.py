@@ -0,0 +1,512 @@
+"""
+Backend local : une base SQLite qui reproduit le schéma Supabase.
+
+Les résultats ont la même forme que ceux de PostgREST (jointures imbriquées en
+sous-dictionnaires, horodatages ISO 8601), ce qui permet de faire tourner
+l'application et les mesures de performance sans le projet hébergé.
+"""
+import sqlite3
+import threading
+from datetime import date, datetime
+
+from epl.repository import Repository, STATS_SORT_COLUMNS, TABLES
+from epl.tracing import note_resource
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    id TEXT PRIMARY KEY,
+    last_name TEXT NOT NULL,
+    first_name TEXT NOT NULL,
+    stream TEXT NOT NULL,
+    phone TEXT,
+    email TEXT,
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+CREATE INDEX IF NOT EXISTS students_stream_idx ON students (stream, last_name);
+
+CREATE TABLE IF NOT EXISTS courses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    stream_target TEXT NOT NULL,
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+CREATE INDEX IF NOT EXISTS courses_stream_idx ON courses (stream_target);
+
+-- Filigrane de synchronisation différentielle des listes en cache
+-- (cf. supabase/migrations/20261018120000_roster_updated_at.sql)
+CREATE INDEX IF NOT EXISTS students_updated_at_idx ON students (updated_at);
+CREATE INDEX IF NOT EXISTS courses_updated_at_idx ON courses (updated_at);
+
+CREATE TRIGGER IF NOT EXISTS students_touch_updated_at AFTER UPDATE ON students
+WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE students SET updated_at = strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now') WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS courses_touch_updated_at AFTER UPDATE ON courses
+WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE courses SET updated_at = strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now') WHERE id = NEW.id;
+END;
+
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    course_id INTEGER NOT NULL REFERENCES courses (id),
+    date_time TEXT NOT NULL,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+);
+-- Une seule séance par cours et par horaire (cf. supabase/migrations/20261018110000_save_roll_call.sql)
+DROP INDEX IF EXISTS sessions_course_idx;
+CREATE UNIQUE INDEX IF NOT EXISTS sessions_course_date_key ON sessions (course_id, date_time);
+CREATE INDEX IF NOT EXISTS sessions_created_idx ON sessions (created_at);
+
+CREATE TABLE IF NOT EXISTS attendance (
+    session_id INTEGER NOT NULL REFERENCES sessions (id) ON DELETE CASCADE,
+    student_id TEXT NOT NULL REFERENCES students (id),
+    status TEXT NOT NULL CHECK (status IN ('PRESENT', 'ABSENT')),
+    PRIMARY KEY (session_id, student_id)
+);
+CREATE INDEX IF NOT EXISTS attendance_student_idx ON attendance (student_id);
+
+CREATE TABLE IF NOT EXISTS delegate_access (
+    id TEXT PRIMARY KEY,
+    role TEXT NOT NULL,
+    password TEXT,
+    password_hash TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS delegate_access_lower_id_idx ON delegate_access (lower(id));
+
+-- Résumé par (étudiant, matière), maintenu par différence à chaque écriture dans attendance
+-- (équivalent des déclencheurs de supabase/migrations/20261018100000_attendance_summary.sql)
+CREATE TABLE IF NOT EXISTS attendance_summary (
+    student_id TEXT NOT NULL REFERENCES students (id) ON DELETE CASCADE,
+    course_id INTEGER NOT NULL,
+    present_count INTEGER NOT NULL DEFAULT 0,
+    absent_count INTEGER NOT NULL DEFAULT 0,
+    last_session_at TEXT,
+    PRIMARY KEY (student_id, course_id)
+);
+
+-- Remplissage initial d'une base créée avant l'apparition du résumé
+INSERT INTO attendance_summary (student_id, course_id, present_count, absent_count, last_session_at)
+SELECT a.student_id, s.course_id, SUM(a.status = 'PRESENT'), SUM(a.status <> 'PRESENT'), MAX(s.date_time)
+FROM attendance a JOIN sessions s ON s.id = a.session_id
+WHERE NOT EXISTS (SELECT 1 FROM attendance_summary)
+GROUP BY a.student_id, s.course_id;
+
+CREATE TRIGGER IF NOT EXISTS attendance_summary_insert AFTER INSERT ON attendance
+BEGIN
+    INSERT INTO attendance_summary (student_id, course_id, present_count, absent_count, last_session_at)
+    SELECT NEW.student_id, s.course_id, NEW.status = 'PRESENT', NEW.status <> 'PRESENT', s.date_time
+    FROM sessions s WHERE s.id = NEW.session_id
+    ON CONFLICT (student_id, course_id) DO UPDATE SET
+        present_count = present_count + excluded.present_count,
+        absent_count = absent_count + excluded.absent_count,
+        last_session_at = max(coalesce(last_session_at, ''), excluded.last_session_at);
+END;
+
+CREATE TRIGGER IF NOT EXISTS attendance_summary_update AFTER UPDATE ON attendance
+BEGIN
+    UPDATE attendance_summary SET
+        present_count = present_count - (OLD.status = 'PRESENT'),
+        absent_count = absent_count - (OLD.status <> 'PRESENT')
+    WHERE student_id = OLD.student_id
+      AND course_id = (SELECT course_id FROM sessions WHERE id = OLD.session_id);
+    INSERT INTO attendance_summary (student_id, course_id, present_count, absent_count, last_session_at)
+    SELECT NEW.student_id, s.course_id, NEW.status = 'PRESENT', NEW.status <> 'PRESENT', s.date_time
+    FROM sessions s WHERE s.id = NEW.session_id
+    ON CONFLICT (student_id, course_id) DO UPDATE SET
+        present_count = present_count + excluded.present_count,
+        absent_count = absent_count + excluded.absent_count,
+        last_session_at = max(coalesce(last_session_at, ''), excluded.last_session_at);
+END;
+
+CREATE TRIGGER IF NOT EXISTS attendance_summary_delete AFTER DELETE ON attendance
+BEGIN
+    UPDATE attendance_summary SET
+        present_count = present_count - (OLD.status = 'PRESENT'),
+        absent_count = absent_count - (OLD.status <> 'PRESENT')
+    WHERE student_id = OLD.student_id
+      AND course_id = (SELECT course_id FROM sessions WHERE id = OLD.session_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS attendance_summary_session_delete BEFORE DELETE ON sessions
+BEGIN
+    UPDATE attendance_summary SET
+        present_count = present_count - (
+            SELECT COUNT(*) FROM attendance a
+            WHERE a.session_id = OLD.id AND a.student_id = attendance_summary.student_id AND a.status = 'PRESENT'),
+        absent_count = absent_count - (
+            SELECT COUNT(*) FROM attendance a
+            WHERE a.session_id = OLD.id AND a.student_id = attendance_summary.student_id AND a.status <> 'PRESENT')
+    WHERE course_id = OLD.course_id
+      AND student_id IN (SELECT student_id FROM attendance WHERE session_id = OLD.id);
+    -- Les présences supprimées ensuite en cascade ne retrouvent plus leur séance : rien n'est retiré deux fois
+END;
+
+DROP VIEW IF EXISTS student_stats;
+CREATE VIEW student_stats AS
+SELECT
+    st.id AS student_id,
+    st.first_name,
+    st.last_name,
+    st.stream,
+    SUM(su.present_count + su.absent_count) AS total_sessions,
+    SUM(su.present_count) AS present_count,
+    SUM(su.absent_count) AS absent_count,
+    ROUND(100.0 * SUM(su.present_count) / SUM(su.present_count + su.absent_count), 1) AS attendance_percentage,
+    MAX(su.last_session_at) AS last_session_at
+FROM students st
+JOIN attendance_summary su ON su.student_id = st.id
+GROUP BY st.id
+HAVING SUM(su.present_count + su.absent_count) > 0;
+"""
+
+
+def normalize_timestamp(value):
+    """Horodatage au format renvoyé par PostgREST pour une colonne `timestamp` ('YYYY-MM-DDTHH:MM:SS')."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day).isoformat()
+    return datetime.fromisoformat(value).isoformat()
+
+
+class SQLiteRepository(Repository):
+
+    def __init__(self, path='epl_local.db'):
+        self.path = path
+        # Streamlit exécute les scripts dans plusieurs threads : une connexion partagée, protégée par un verrou
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.RLock()
+        with self.lock:
+            self.conn.execute("PRAGMA foreign_keys = ON")
+            if path != ':memory:':
+                self.conn.execute("PRAGMA journal_mode = WAL")
+            self._add_missing_columns()
+            self.conn.executescript(SCHEMA)
+
+    def _add_missing_columns(self):
+        """Bases locales créées avant l'ajout de colonnes : updated_at (initialisée à maintenant), password_hash."""
+        added = (
+            ('students', 'updated_at', "strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')"),
+            ('courses', 'updated_at', "strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')"),
+            ('delegate_access', 'password_hash', None),
+        )
+        for table, column, initial in added:
+            columns = {row['name'] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+            if columns and column not in columns:
+                with self.conn:
+                    self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} TEXT")
+                    if initial is not None:
+                        self.conn.execute(f"UPDATE {table} SET {column} = {initial}")
+
+    # --- Outils internes ---
+    def _query(self, sql, params=()):
+        note_resource(' '.join(sql.split())[:120])
+        with self.lock:
+            return [dict(row) for row in self.conn.execute(sql, params).fetchall()]
+
+    def _write(self, sql, params=(), many=False):
+        note_resource(' '.join(sql.split())[:120])
+        with self.lock, self.conn:
+            if many:
+                return self.conn.executemany(sql, params)
+            return self.conn.execute(sql, params)
+
+    def _upsert(self, table, records, conflict):
+        if not records:
+            return
+        columns = list(records[0].keys())
+        updates = [c for c in columns if c not in conflict]
+        sql = (
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)}) "
+            f"ON CONFLICT ({', '.join(conflict)}) DO "
+            + (f"UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in updates)}" if updates else "NOTHING")
+        )
+        self._write(sql, [tuple(r[c] for c in columns) for r in records], many=True)
+
+    # --- Identifiants ---
+    def list_credentials(self):
+        return self._query("SELECT id, role FROM delegate_access ORDER BY id")
+
+    def get_credential(self, identifier):
+        rows = self._query(
+            "SELECT id, role, password, password_hash FROM delegate_access WHERE lower(id) = lower(?)", (identifier,)
+        )
+        return rows[0] if rows else None
+
+    def upsert_credentials(self, records):
+        self._upsert('delegate_access', records, ('id',))
+
+    # --- Étudiants ---
+    def find_students_by_id(self, student_id):
+        return self._query("SELECT * FROM students WHERE id = ?", (student_id,))
+
+    def list_students(self, stream=None, updated_after=None):
+        conditions, params = self._roster_filters('stream', stream, updated_after)
+        return self._query(f"SELECT * FROM students{conditions} ORDER BY last_name", params)
+
+    def insert_student(self, data):
+        columns = list(data.keys())
+        self._write(
+            f"INSERT INTO students ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+            tuple(data[c] for c in columns)
+        )
+        return self.find_students_by_id(data['id'])
+
+    def insert_students(self, records):
+        if not records:
+            return
+        columns = list(records[0].keys())
+        self._write(
+            f"INSERT INTO students ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+            [tuple(r[c] for c in columns) for r in records],
+            many=True
+        )
+
+    def upsert_students(self, records):
+        self._upsert('students', records, ('id',))
+
+    # --- Cours ---
+    def list_courses(self, stream=None, updated_after=None):
+        conditions, params = self._roster_filters('stream_target', stream, updated_after)
+        return self._query(f"SELECT * FROM courses{conditions} ORDER BY id", params)
+
+    @staticmethod
+    def _roster_filters(stream_column, stream, updated_after):
+        clauses, params = [], []
+        if stream is not None:
+            clauses.append(f"{stream_column} = ?")
+            params.append(stream)
+        if updated_after is not None:
+            clauses.append("updated_at > ?")
+            params.append(updated_after)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def insert_courses(self, records):
+        created = []
+        with self.lock, self.conn:
+            for record in records:
+                columns = list(record.keys())
+                row = self.conn.execute(
+                    f"INSERT INTO courses ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)}) RETURNING *",
+                    tuple(record[c] for c in columns)
+                ).fetchone()
+                created.append(dict(row))
+        return created
+
+    # --- Sessions ---
+    def find_session_id(self, course_id, date_time):
+        rows = self._query(
+            "SELECT id FROM sessions WHERE course_id = ? AND date_time = ?",
+            (course_id, normalize_timestamp(date_time))
+        )
+        return rows[0]['id'] if rows else None
+
+    def create_session(self, course_id, date_time):
+        cursor = self._write(
+            "INSERT INTO sessions (course_id, date_time) VALUES (?, ?)",
+            (course_id, normalize_timestamp(date_time))
+        )
+        return cursor.lastrowid
+
+    def _write_roll_call(self, course_id, date_time, records):
+        session_id = self.conn.execute(
+            "INSERT INTO sessions (course_id, date_time) VALUES (?, ?) "
+            "ON CONFLICT (course_id, date_time) DO UPDATE SET course_id = excluded.course_id RETURNING id",
+            (course_id, normalize_timestamp(date_time))
+        ).fetchone()[0]
+        self.conn.executemany(
+            "INSERT INTO attendance (session_id, student_id, status) VALUES (?, ?, ?) "
+            "ON CONFLICT (session_id, student_id) DO UPDATE SET status = excluded.status",
+            [(session_id, r['student_id'], r['status']) for r in records]
+        )
+        return session_id
+
+    def save_roll_call(self, course_id, date_time, records):
+        # Même opération que la fonction SQL save_roll_call : une transaction
+        with self.lock, self.conn:
+            return self._write_roll_call(course_id, date_time, records)
+
+    def save_roll_calls(self, roll_calls):
+        # Même opération que la fonction SQL save_roll_calls : une transaction, un point de sauvegarde par appel
+        results = []
+        with self.lock, self.conn:
+            if not self.conn.in_transaction:
+                self.conn.execute("BEGIN")
+            for item in roll_calls:
+                self.conn.execute("SAVEPOINT roll_call")
+                try:
+                    results.append({'session_id': self._write_roll_call(item['course_id'], item['date_time'], item['records'])})
+                except (sqlite3.Error, ValueError) as e:
+                    self.conn.execute("ROLLBACK TO roll_call")
+                    results.append({'error': str(e)})
+                self.conn.execute("RELEASE roll_call")
+        return results
+
+    def list_sessions(self, course_ids, limit=20, date_from=None, date_to=None, before=None):
+        if not course_ids:
+            return []
+        clauses = [f"s.course_id IN ({', '.join('?' for _ in course_ids)})"]
+        params = list(course_ids)
+        if date_from is not None:
+            clauses.append("s.date_time >= ?")
+            params.append(normalize_timestamp(date_from))
+        if date_to is not None:
+            clauses.append("s.date_time < ?")
+            params.append(normalize_timestamp(date_to))
+        if before is not None:
+            clauses.append("(s.date_time < ? OR (s.date_time = ? AND s.id < ?))")
+            params.extend([before[0], before[0], before[1]])
+        rows = self._query(
+            f"SELECT s.id, s.course_id, s.date_time, c.name AS course_name FROM sessions s "
+            f"LEFT JOIN courses c ON c.id = s.course_id "
+            f"WHERE {' AND '.join(clauses)} ORDER BY s.date_time DESC, s.id DESC LIMIT ?",
+            (*params, limit)
+        )
+        for row in rows:
+            name = row.pop('course_name')
+            row['courses'] = {'name': name} if name is not None else None
+        return rows
+
+    def list_recent_sessions(self, limit=100, stream=None, created_from=None, created_to=None, before=None):
+        clauses, params = [], []
+        if stream is not None:
+            clauses.append("c.stream_target = ?")
+            params.append(stream)
+        if created_from is not None:
+            clauses.append("s.created_at >= ?")
+            params.append(created_from)
+        if created_to is not None:
+            clauses.append("s.created_at < ?")
+            params.append(created_to)
+        if before is not None:
+            clauses.append("(s.created_at < ? OR (s.created_at = ? AND s.id < ?))")
+            params.extend([before[0], before[0], before[1]])
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        rows = self._query(
+            "SELECT s.id, s.created_at, s.date_time, s.course_id, c.name, c.stream_target "
+            f"FROM sessions s LEFT JOIN courses c ON c.id = s.course_id{where} "
+            "ORDER BY s.created_at DESC, s.id DESC LIMIT ?",
+            (*params, limit)
+        )
+        for row in rows:
+            name, stream = row.pop('name'), row.pop('stream_target')
+            row['courses'] = {'name': name, 'stream_target': stream} if name is not None else None
+        return rows
+
+    # --- Présences ---
+    def upsert_attendance(self, records):
+        self._upsert('attendance', records, ('session_id', 'student_id'))
+
+    def list_session_attendance(self, session_id):
+        return self._query("SELECT student_id, status FROM attendance WHERE session_id = ?", (session_id,))
+
+    def student_course_stats(self, student_id):
+        # Même requête que la fonction SQL student_course_stats (supabase/migrations)
+        return self._query(
+            "SELECT c.name AS course_name, SUM(su.present_count) AS present_count, "
+            "SUM(su.present_count + su.absent_count) AS total_count "
+            "FROM attendance_summary su "
+            "LEFT JOIN courses c ON c.id = su.course_id "
+            "WHERE su.student_id = ? AND su.present_count + su.absent_count > 0 GROUP BY c.name",
+            (student_id,)
+        )
+
+    def attendance_export_page(self, after=None, limit=1000):
+        where, params = "", []
+        if after:
+            where, params = "WHERE (a.session_id, a.student_id) > (?, ?)", list(after)
+        rows = self._query(
+            "SELECT a.session_id, a.student_id, a.status, st.id, st.last_name, st.first_name, st.stream, "
+            "s.date_time, c.name AS course_name FROM attendance a "
+            "JOIN students st ON st.id = a.student_id "
+            "JOIN sessions s ON s.id = a.session_id "
+            "LEFT JOIN courses c ON c.id = s.course_id "
+            f"{where} ORDER BY a.session_id, a.student_id LIMIT ?",
+            (*params, limit)
+        )
+        return [{
+            'session_id': row['session_id'],
+            'student_id': row['student_id'],
+            'status': row['status'],
+            'students': {
+                'id': row['id'],
+                'last_name': row['last_name'],
+                'first_name': row['first_name'],
+                'stream': row['stream']
+            },
+            'sessions': {
+                'date_time': row['date_time'],
+                'courses': {'name': row['course_name']} if row['course_name'] is not None else None
+            }
+        } for row in rows]
+
+    # --- Vue et comptages ---
+    def list_student_stats(self):
+        return self._query("SELECT * FROM student_stats")
+
+    def query_student_stats(self, streams=None, search=None, max_rate=None, order_by='attendance_percentage',
+                            descending=False, limit=50, offset=0):
+        if order_by not in STATS_SORT_COLUMNS:
+            raise ValueError(f"Colonne de tri inconnue : {order_by!r}")
+        clauses, params = [], []
+        if streams is not None:
+            clauses.append(f"stream IN ({', '.join('?' * len(streams))})" if streams else "0")
+            params.extend(streams)
+        if search:
+            pattern = '%' + search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            clauses.append("(last_name LIKE ? ESCAPE '\\' OR first_name LIKE ? ESCAPE '\\' OR student_id LIKE ? ESCAPE '\\')")
+            params.extend([pattern] * 3)
+        if max_rate is not None:
+            clauses.append("attendance_percentage < ?")
+            params.append(max_rate)
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        direction = "DESC" if descending else "ASC"
+        with self.lock:
+            total = self._query(f"SELECT COUNT(*) AS n FROM student_stats{where}", params)[0]['n']
+            rows = self._query(
+                f"SELECT * FROM student_stats{where} "
+                f"ORDER BY {order_by} IS NULL, {order_by} {direction}, student_id {direction} LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            )
+        return {'rows': rows, 'total': total}
+
+    def count_rows(self, table, estimated=False):
+        if table not in TABLES:
+            raise ValueError(f"Table inconnue : {table!r}")
+        return self._query(f"SELECT COUNT(*) AS n FROM {table}")[0]['n']
+
+    def database_statistics(self, weeks=8):
+        # Même résultat que la fonction SQL db_statistics ; SQLite compte vite sans estimation,
+        # et la taille vient de la table virtuelle dbstat quand elle est compilée
+        tables = [
+            {'table': table, 'estimated_rows': self._query(f"SELECT COUNT(*) AS n FROM {table}")[0]['n'],
+             'total_bytes': None}
+            for table in sorted(TABLES + ('attendance_summary',))
+        ]
+        try:
+            sizes = {row['name']: row['bytes'] for row in self._query(
+                "SELECT name, SUM(pgsize) AS bytes FROM dbstat GROUP BY name"
+            )}
+            # Taille d'une table = ses pages + celles de ses index
+            indexes = self._query("SELECT name, tbl_name FROM sqlite_master WHERE type = 'index'")
+            for row in tables:
+                row['total_bytes'] = sizes.get(row['table'], 0) + sum(
+                    sizes.get(index['name'], 0) for index in indexes if index['tbl_name'] == row['table']
+                )
+        except sqlite3.OperationalError:
+            pass
+
+        # Semaine = lundi de la date de création de la séance
+        weekly = self._query(
+            "SELECT date(s.created_at, 'weekday 0', '-6 days') AS week, "
+            "COUNT(DISTINCT s.id) AS sessions, COUNT(a.session_id) AS attendance "
+            "FROM sessions s LEFT JOIN attendance a ON a.session_id = s.id "
+            "WHERE s.created_at >= strftime('%Y-%m-%dT00:00:00', 'now', 'weekday 0', '-6 days', ?) "
+            "GROUP BY week ORDER BY week",
+            (f"-{7 * (weeks - 1)} days",)
+        )
+        return {'tables': tables, 'weekly': weekly}
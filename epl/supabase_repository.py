@@ -0,0 +1,191 @@
+"""Backend de production : requêtes PostgREST via le client Supabase."""
+import re
+
+from epl.repository import Repository, STATS_SORT_COLUMNS
+
+
+def like_literal(value):
+    """`value` dans un motif LIKE/ILIKE, sans jokers : `%`, `_` et `\\` sont échappés."""
+    return re.sub(r'([\\%_])', r'\\\1', value)
+
+
+def quoted_value(value):
+    """
+    `value` entre guillemets pour un filtre PostgREST (or=(...), in.(...)) : les virgules, points
+    et parenthèses y perdent leur sens réservé ; `"` et `\\` sont échappés par une barre oblique inverse.
+    """
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+class SupabaseRepository(Repository):
+    """
+    Les lectures (GET/HEAD, y compris les fonctions en lecture seule appelées avec
+    `get=True`) sont reprises par le transport HTTP (`epl/transport.py`) ; la reprise
+    propre à postgrest est désactivée (`retry(False)`) pour ne pas cumuler les deux.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    # --- Identifiants ---
+    def list_credentials(self):
+        return self.client.table('delegate_access').select("id, role").order('id').retry(False).execute().data
+
+    def get_credential(self, identifier):
+        # lower(id) indexé et unique (migration 20261018130000_delegate_access_password_hash)
+        rows = self.client.rpc('get_credential', {'p_identifier': identifier}, get=True).retry(False).execute().data
+        return rows[0] if rows else None
+
+    def upsert_credentials(self, records):
+        self.client.table('delegate_access').upsert(records, on_conflict='id').execute()
+
+    # --- Étudiants ---
+    def find_students_by_id(self, student_id):
+        return self.client.table('students')\
+            .select("*")\
+            .eq('id', student_id)\
+            .retry(False).execute().data
+
+    def list_students(self, stream=None, updated_after=None):
+        query = self.client.table('students').select("*")
+        if stream is not None:
+            query = query.eq('stream', stream)
+        if updated_after is not None:
+            query = query.gt('updated_at', updated_after)
+        return query.order('last_name').retry(False).execute().data
+
+    def insert_student(self, data):
+        return self.client.table('students').insert(data).execute().data
+
+    def insert_students(self, records):
+        self.client.table('students').insert(records).execute()
+
+    def upsert_students(self, records):
+        self.client.table('students').upsert(records, on_conflict='id').execute()
+
+    # --- Cours ---
+    def list_courses(self, stream=None, updated_after=None):
+        query = self.client.table('courses').select("*")
+        if stream is not None:
+            query = query.eq('stream_target', stream)
+        if updated_after is not None:
+            query = query.gt('updated_at', updated_after)
+        return query.retry(False).execute().data
+
+    def insert_courses(self, records):
+        return self.client.table('courses').insert(records).execute().data
+
+    # --- Sessions ---
+    def find_session_id(self, course_id, date_time):
+        result = self.client.table('sessions')\
+            .select("id")\
+            .eq("course_id", course_id)\
+            .eq("date_time", date_time)\
+            .retry(False).execute()
+        return result.data[0]['id'] if result.data else None
+
+    def create_session(self, course_id, date_time):
+        result = self.client.table('sessions').insert({
+            "course_id": course_id,
+            "date_time": date_time
+        }).execute()
+        return result.data[0]['id']
+
+    def save_roll_call(self, course_id, date_time, records):
+        return self.client.rpc('save_roll_call', {
+            'p_course_id': course_id,
+            'p_date_time': date_time,
+            'p_records': records
+        }).execute().data
+
+    def save_roll_calls(self, roll_calls):
+        return self.client.rpc('save_roll_calls', {'p_roll_calls': roll_calls}).execute().data
+
+    def list_sessions(self, course_ids, limit=20, date_from=None, date_to=None, before=None):
+        query = self.client.table('sessions')\
+            .select("id, course_id, date_time, courses(name)")\
+            .in_('course_id', course_ids)
+        if date_from is not None:
+            query = query.gte('date_time', date_from)
+        if date_to is not None:
+            query = query.lt('date_time', date_to)
+        if before is not None:
+            date_time, session_id = before
+            query = query.or_(f'date_time.lt."{date_time}",and(date_time.eq."{date_time}",id.lt.{session_id})')
+        return query.order('date_time', desc=True)\
+            .order('id', desc=True)\
+            .limit(limit)\
+            .retry(False).execute().data
+
+    def list_recent_sessions(self, limit=100, stream=None, created_from=None, created_to=None, before=None):
+        # Jointure interne quand on filtre sur la filière du cours
+        courses = "courses!inner(name, stream_target)" if stream is not None else "courses(name, stream_target)"
+        query = self.client.table('sessions').select(f"id, created_at, date_time, course_id, {courses}")
+        if stream is not None:
+            query = query.eq('courses.stream_target', stream)
+        if created_from is not None:
+            query = query.gte('created_at', created_from)
+        if created_to is not None:
+            query = query.lt('created_at', created_to)
+        if before is not None:
+            created_at, session_id = before
+            query = query.or_(f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{session_id})')
+        return query.order('created_at', desc=True)\
+            .order('id', desc=True)\
+            .limit(limit)\
+            .retry(False).execute().data
+
+    # --- Présences ---
+    def upsert_attendance(self, records):
+        self.client.table('attendance').upsert(records, on_conflict='session_id, student_id').execute()
+
+    def list_session_attendance(self, session_id):
+        return self.client.table('attendance').select("student_id, status").eq('session_id', session_id).retry(False).execute().data
+
+    def student_course_stats(self, student_id):
+        return self.client.rpc('student_course_stats', {'p_student_id': student_id}, get=True).retry(False).execute().data
+
+    def attendance_export_page(self, after=None, limit=1000):
+        query = self.client.table('attendance')\
+            .select("session_id, student_id, status, students(id, last_name, first_name, stream), sessions(date_time, courses(name))")
+        if after:
+            last_session, last_student = after
+            query = query.or_(
+                f'session_id.gt."{last_session}",'
+                f'and(session_id.eq."{last_session}",student_id.gt."{last_student}")'
+            )
+        return query.order('session_id').order('student_id').limit(limit).retry(False).execute().data
+
+    # --- Vue et comptages ---
+    def list_student_stats(self):
+        return self.client.from_('student_stats').select("*").retry(False).execute().data
+
+    def query_student_stats(self, streams=None, search=None, max_rate=None, order_by='attendance_percentage',
+                            descending=False, limit=50, offset=0):
+        if order_by not in STATS_SORT_COLUMNS:
+            raise ValueError(f"Colonne de tri inconnue : {order_by!r}")
+        # Page et nombre total dans la même réponse (en-tête Content-Range)
+        query = self.client.from_('student_stats').select("*", count="exact")
+        if streams is not None:
+            query = query.in_('stream', list(streams))
+        if search:
+            # Terme littéral (« KOFFI, Ama » compris) : jokers LIKE échappés, puis valeur entre guillemets
+            # pour la syntaxe or=(...). PostgREST lit toujours `*` comme `%` : un `*` saisi devient `_`.
+            pattern = quoted_value(f"*{like_literal(search).replace('*', '_')}*")
+            query = query.or_(",".join(f"{field}.ilike.{pattern}" for field in ('last_name', 'first_name', 'student_id')))
+        if max_rate is not None:
+            query = query.lt('attendance_percentage', max_rate)
+        # NULL en dernier dans les deux sens (« .nullslast »), comme `ORDER BY colonne IS NULL` côté SQLite
+        response = query.order(order_by, desc=descending, nullsfirst=False)\
+            .order('student_id', desc=descending)\
+            .range(offset, offset + limit - 1)\
+            .retry(False).execute()
+        return {'rows': response.data, 'total': response.count or 0}
+
+    def count_rows(self, table, estimated=False):
+        return self.client.table(table)\
+            .select("*", count="estimated" if estimated else "exact", head=True)\
+            .retry(False).execute().count or 0
+
+    def database_statistics(self, weeks=8):
+        return self.client.rpc('db_statistics', {'p_weeks': weeks}, get=True).retry(False).execute().data
@@ -0,0 +1,127 @@
+"""
+Trace des appels à la base pendant une exécution du script Streamlit.
+
+`TracingRepository` enveloppe le `Repository` partagé : quand une trace est active
+sur le thread courant (`start_trace()`), chaque méthode appelée est enregistrée avec
+ses arguments (les filtres), le nombre de lignes, la taille JSON du résultat, son
+début et sa durée. Les threads de fond (file des appels, rafraîchissements du cache)
+n'ont pas de trace active : seul le thread du script est suivi.
+
+Pendant un appel, la couche HTTP (`epl/transport.py`) et le backend SQLite signalent
+les ressources réellement interrogées (`note_resource`) : « GET students?id=eq... »
+ou le début de la requête SQL.
+"""
+import json
+import threading
+import time
+
+_local = threading.local()
+
+
+class QueryTrace:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.calls = []
+        self.current = None
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def summary(self):
+        """Nombre d'appels, durée cumulée (s) et appels identiques répétés (même méthode, mêmes arguments)."""
+        seen = {}
+        for call in self.calls:
+            key = (call['method'], call['arguments'])
+            seen[key] = seen.get(key, 0) + 1
+        return {
+            'calls': len(self.calls),
+            'duration': sum(call['duration'] for call in self.calls),
+            'repeated': sum(count - 1 for count in seen.values() if count > 1),
+        }
+
+
+def start_trace():
+    _local.trace = QueryTrace()
+    return _local.trace
+
+
+def stop_trace():
+    trace = getattr(_local, 'trace', None)
+    _local.trace = None
+    return trace
+
+
+def current_trace():
+    return getattr(_local, 'trace', None)
+
+
+def note_resource(resource):
+    """Ressource interrogée par l'appel en cours (sans effet hors trace)."""
+    trace = current_trace()
+    if trace is not None and trace.current is not None:
+        trace.current['resources'].append(resource)
+
+
+def _describe(args, kwargs):
+    parts = [repr(a) for a in args] + [f"{k}={v!r}" for k, v in kwargs.items() if v is not None]
+    text = ", ".join(parts)
+    return text if len(text) <= 200 else text[:197] + "..."
+
+
+def _size(result):
+    try:
+        return len(json.dumps(result, default=str))
+    except (TypeError, ValueError):
+        return None
+
+
+def _rows(result):
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict) and isinstance(result.get('rows'), list):
+        return len(result['rows'])
+    return None if result is None else 1
+
+
+class TracingRepository:
+    """Mandataire d'un `Repository` ; hors trace, les appels passent sans mesure."""
+
+    def __init__(self, repo):
+        self._repo = repo
+
+    def __getattr__(self, name):
+        attribute = getattr(self._repo, name)
+        if name.startswith('_') or not callable(attribute):
+            return attribute
+
+        def traced(*args, **kwargs):
+            trace = current_trace()
+            if trace is None or trace.current is not None:
+                # Hors trace, ou appel imbriqué dans un appel déjà suivi
+                return attribute(*args, **kwargs)
+            call = {
+                'method': name,
+                'arguments': _describe(args, kwargs),
+                'resources': [],
+                'start': trace.elapsed(),
+                'duration': None,
+                'rows': None,
+                'bytes': None,
+                'error': None,
+            }
+            trace.current = call
+            start = time.perf_counter()
+            try:
+                result = attribute(*args, **kwargs)
+            except Exception as e:
+                call['error'] = f"{type(e).__name__}: {e}"
+                raise
+            finally:
+                call['duration'] = time.perf_counter() - start
+                trace.current = None
+                trace.calls.append(call)
+            call['rows'] = _rows(result)
+            call['bytes'] = _size(result)
+            return result
+        return traced
@@ -0,0 +1,149 @@
+"""
+Couche HTTP sous le client Supabase.
+
+Par défaut, le client PostgREST crée son propre `httpx.Client` : délai de 120 s,
+aucune reprise sur erreur réseau, et rien pour savoir si les connexions sont
+réutilisées. Une réponse lente bloque alors un thread de script Streamlit, et les
+délégués qui font l'appel à 8 h s'empilent derrière.
+
+`create_http_client()` construit le client partagé que reçoit `create_client` :
+
+- un pool de connexions keep-alive dimensionné (`pool_size`, `keepalive_expiry`) ;
+- des délais explicites de connexion, de lecture, d'écriture et d'attente du pool ;
+- des reprises avec recul exponentiel et aléa complet (« full jitter ») pour les
+  lectures idempotentes (GET/HEAD) seulement : erreur réseau, délai dépassé, 502/503/504/520 ;
+- une mesure de latence par requête, agrégée par ressource (table, vue ou fonction).
+
+Les écritures (POST, PATCH...) ne sont jamais rejouées ici : les appels le sont par
+la file locale (`epl/outbox.py`), avec sa propre clé d'idempotence.
+"""
+import random
+import threading
+import time
+from collections import deque
+from urllib.parse import unquote
+
+import httpx
+
+from epl.tracing import note_resource
+
+IDEMPOTENT_METHODS = ('GET', 'HEAD')
+RETRY_STATUSES = (502, 503, 504, 520)
+
+
+class TransportStats:
+    """Latences et compteurs par ressource ('GET students', 'POST rpc/save_roll_call'...)."""
+
+    def __init__(self, window=500):
+        self.window = window
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+    def record(self, endpoint, seconds, status=None, retried=False):
+        with self.lock:
+            entry = self.endpoints.setdefault(endpoint, {
+                'latencies': deque(maxlen=self.window), 'requests': 0, 'errors': 0, 'retries': 0,
+            })
+            entry['requests'] += 1
+            entry['latencies'].append(seconds)
+            if status is None or status >= 500:
+                entry['errors'] += 1
+            if retried:
+                entry['retries'] += 1
+
+    def snapshot(self):
+        """Par ressource : requêtes, erreurs, reprises et latences p50/p95/max (secondes) sur la fenêtre récente."""
+        with self.lock:
+            endpoints = {name: (dict(entry), sorted(entry['latencies'])) for name, entry in self.endpoints.items()}
+
+        def quantile(values, q):
+            return values[min(len(values) - 1, int(q * len(values)))] if values else None
+
+        return {
+            name: {
+                'requests': entry['requests'],
+                'errors': entry['errors'],
+                'retries': entry['retries'],
+                'p50': quantile(latencies, 0.5),
+                'p95': quantile(latencies, 0.95),
+                'max': latencies[-1] if latencies else None,
+            }
+            for name, (entry, latencies) in sorted(endpoints.items())
+        }
+
+
+def endpoint_name(request):
+    """'GET students' pour /rest/v1/students, 'POST rpc/save_roll_call' pour /rest/v1/rpc/save_roll_call."""
+    path = request.url.path
+    if '/rest/v1/' in path:
+        path = path.split('/rest/v1/', 1)[1]
+    return f"{request.method} {path.strip('/') or '/'}"
+
+
+class ResilientTransport(httpx.HTTPTransport):
+    """
+    Transport httpx avec reprises des lectures idempotentes et mesure de latence.
+
+    - `retries` : nombre de reprises après la première tentative ;
+    - `backoff` / `max_backoff` (secondes) : recul exponentiel, tiré au hasard entre 0 et la borne.
+    """
+
+    def __init__(self, stats=None, retries=2, backoff=0.2, max_backoff=2.0, **kwargs):
+        super().__init__(**kwargs)
+        self.stats = stats if stats is not None else TransportStats()
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def _delay(self, attempt):
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def handle_request(self, request):
+        endpoint = endpoint_name(request)
+        note_resource(f"{endpoint}?{unquote(request.url.query.decode())}" if request.url.query else endpoint)
+        retriable = request.method in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                response = super().handle_request(request)
+            except httpx.TransportError:
+                self.stats.record(endpoint, time.perf_counter() - start, retried=attempt > 0)
+                if not retriable or attempt >= self.retries:
+                    raise
+            else:
+                self.stats.record(endpoint, time.perf_counter() - start, response.status_code, retried=attempt > 0)
+                if not retriable or attempt >= self.retries or response.status_code not in RETRY_STATUSES:
+                    return response
+                response.close()
+            time.sleep(self._delay(attempt))
+            attempt += 1
+
+    def pool_status(self):
+        """Connexions ouvertes dans le pool et celles qui sont inactives (réutilisables)."""
+        connections = list(getattr(self._pool, 'connections', ()))
+        return {
+            'open': len(connections),
+            'idle': sum(1 for c in connections if c.is_idle()),
+        }
+
+
+def create_http_client(connect_timeout=5.0, read_timeout=15.0, write_timeout=15.0, pool_timeout=5.0,
+                       pool_size=20, keepalive_expiry=30.0, retries=2, http2=True, stats=None):
+    """Client httpx à passer au client Supabase, et son transport (statistiques, état du pool) : (client, transport)."""
+    transport = ResilientTransport(
+        stats=stats,
+        retries=retries,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=keepalive_expiry,
+        ),
+    )
+    client = httpx.Client(
+        transport=transport,
+        timeout=httpx.Timeout(connect=connect_timeout, read=read_timeout, write=write_timeout, pool=pool_timeout),
+        follow_redirects=True,
+    )
+    return client, transport
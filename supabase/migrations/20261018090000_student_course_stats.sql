@@ -0,0 +1,27 @@
+-- Statistiques de présence d'un étudiant, agrégées par matière côté base.
+-- Une ligne compacte par matière : la latence et la taille de la réponse ne
+-- dépendent plus du nombre de séances suivies par l'étudiant.
+
+create index if not exists attendance_student_id_idx on public.attendance (student_id);
+
+create or replace function public.student_course_stats(p_student_id text)
+returns table (
+    course_name text,
+    present_count bigint,
+    total_count bigint
+)
+language sql
+stable
+as $$
+    select
+        c.name as course_name,
+        count(*) filter (where a.status = 'PRESENT') as present_count,
+        count(*) as total_count
+    from public.attendance a
+    join public.sessions s on s.id = a.session_id
+    left join public.courses c on c.id = s.course_id
+    where a.student_id = p_student_id
+    group by c.name;
+$$;
+
+grant execute on function public.student_course_stats(text) to anon, authenticated;
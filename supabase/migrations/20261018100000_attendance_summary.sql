@@ -0,0 +1,163 @@
+-- Résumé des présences par (étudiant, matière), maintenu par différence à chaque
+-- écriture dans attendance. Le profil public (student_course_stats) et les tableaux
+-- de bord (vue student_stats) lisent ce résumé au lieu de réagréger attendance.
+
+create table if not exists public.attendance_summary (
+    student_id text not null references public.students (id) on delete cascade,
+    course_id bigint not null,
+    present_count integer not null default 0,
+    absent_count integer not null default 0,
+    last_session_at timestamp,
+    primary key (student_id, course_id)
+);
+
+-- Applique la différence d'une instruction sur attendance (tables de transition :
+-- un seul upsert agrégé par appel, quel que soit le nombre d'étudiants de la feuille).
+create or replace function public.attendance_summary_apply()
+returns trigger
+language plpgsql
+-- Exécutée avec les droits du propriétaire : les rôles qui écrivent les présences
+-- n'ont pas besoin d'accès en écriture au résumé.
+security definer
+set search_path = public
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        -- Les lignes dont la séance vient d'être supprimée ont déjà été retirées
+        -- par attendance_summary_session_delete (jointure interne sur sessions).
+        insert into public.attendance_summary as su (student_id, course_id, present_count, absent_count)
+        select o.student_id, s.course_id,
+               -count(*) filter (where o.status = 'PRESENT'),
+               -count(*) filter (where o.status <> 'PRESENT')
+        from old_rows o
+        join public.sessions s on s.id = o.session_id
+        group by o.student_id, s.course_id
+        on conflict (student_id, course_id) do update set
+            present_count = su.present_count + excluded.present_count,
+            absent_count = su.absent_count + excluded.absent_count;
+    end if;
+
+    if tg_op in ('INSERT', 'UPDATE') then
+        insert into public.attendance_summary as su (student_id, course_id, present_count, absent_count, last_session_at)
+        select n.student_id, s.course_id,
+               count(*) filter (where n.status = 'PRESENT'),
+               count(*) filter (where n.status <> 'PRESENT'),
+               max(s.date_time)
+        from new_rows n
+        join public.sessions s on s.id = n.session_id
+        group by n.student_id, s.course_id
+        on conflict (student_id, course_id) do update set
+            present_count = su.present_count + excluded.present_count,
+            absent_count = su.absent_count + excluded.absent_count,
+            last_session_at = greatest(su.last_session_at, excluded.last_session_at);
+    end if;
+
+    return null;
+end;
+$$;
+
+drop trigger if exists attendance_summary_insert on public.attendance;
+create trigger attendance_summary_insert
+    after insert on public.attendance
+    referencing new table as new_rows
+    for each statement execute function public.attendance_summary_apply();
+
+drop trigger if exists attendance_summary_update on public.attendance;
+create trigger attendance_summary_update
+    after update on public.attendance
+    referencing old table as old_rows new table as new_rows
+    for each statement execute function public.attendance_summary_apply();
+
+drop trigger if exists attendance_summary_delete on public.attendance;
+create trigger attendance_summary_delete
+    after delete on public.attendance
+    referencing old table as old_rows
+    for each statement execute function public.attendance_summary_apply();
+
+-- Suppression d'une séance : on retire ses présences du résumé tant que la séance existe encore.
+create or replace function public.attendance_summary_session_delete()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    update public.attendance_summary su set
+        present_count = su.present_count - d.present_count,
+        absent_count = su.absent_count - d.absent_count
+    from (
+        select a.student_id,
+               count(*) filter (where a.status = 'PRESENT') as present_count,
+               count(*) filter (where a.status <> 'PRESENT') as absent_count
+        from public.attendance a
+        where a.session_id = old.id
+        group by a.student_id
+    ) d
+    where su.student_id = d.student_id and su.course_id = old.course_id;
+    return old;
+end;
+$$;
+
+drop trigger if exists attendance_summary_session_delete on public.sessions;
+create trigger attendance_summary_session_delete
+    before delete on public.sessions
+    for each row execute function public.attendance_summary_session_delete();
+
+-- Reconstruction complète (remplissage initial, ou réparation après une modification manuelle de sessions).
+create or replace function public.refresh_attendance_summary()
+returns void
+language sql
+as $$
+    delete from public.attendance_summary;
+    insert into public.attendance_summary (student_id, course_id, present_count, absent_count, last_session_at)
+    select a.student_id, s.course_id,
+           count(*) filter (where a.status = 'PRESENT'),
+           count(*) filter (where a.status <> 'PRESENT'),
+           max(s.date_time)
+    from public.attendance a
+    join public.sessions s on s.id = a.session_id
+    group by a.student_id, s.course_id;
+$$;
+
+select public.refresh_attendance_summary();
+
+-- Lectures : profil étudiant et vue des tableaux de bord passent par le résumé
+create or replace function public.student_course_stats(p_student_id text)
+returns table (
+    course_name text,
+    present_count bigint,
+    total_count bigint
+)
+language sql
+stable
+as $$
+    select
+        c.name as course_name,
+        sum(su.present_count) as present_count,
+        sum(su.present_count + su.absent_count) as total_count
+    from public.attendance_summary su
+    left join public.courses c on c.id = su.course_id
+    where su.student_id = p_student_id
+      and su.present_count + su.absent_count > 0
+    group by c.name;
+$$;
+
+drop view if exists public.student_stats;
+create view public.student_stats as
+select
+    st.id as student_id,
+    st.first_name,
+    st.last_name,
+    st.stream,
+    sum(su.present_count + su.absent_count) as total_sessions,
+    sum(su.present_count) as present_count,
+    sum(su.absent_count) as absent_count,
+    round(100.0 * sum(su.present_count) / sum(su.present_count + su.absent_count), 1) as attendance_percentage,
+    max(su.last_session_at) as last_session_at
+from public.students st
+join public.attendance_summary su on su.student_id = st.id
+group by st.id, st.first_name, st.last_name, st.stream
+having sum(su.present_count + su.absent_count) > 0;
+
+grant select on public.attendance_summary to anon, authenticated;
+grant select on public.student_stats to anon, authenticated;
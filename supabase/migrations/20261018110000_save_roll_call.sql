@@ -0,0 +1,66 @@
+-- Enregistrement d'un appel en un seul aller-retour : la séance (course_id, date_time)
+-- est créée ou retrouvée, puis toutes les présences sont écrites dans la même
+-- transaction. L'ancien enchaînement lecture -> insertion -> upsert laissait une
+-- fenêtre où une double soumission créait deux séances identiques.
+
+-- 1. Fusionne les séances en double déjà présentes dans la plus ancienne
+with duplicates as (
+    select id, min(id) over (partition by course_id, date_time) as keeper_id
+    from public.sessions
+)
+insert into public.attendance (session_id, student_id, status)
+select d.keeper_id, a.student_id, a.status
+from public.attendance a
+join duplicates d on d.id = a.session_id
+where d.id <> d.keeper_id
+on conflict (session_id, student_id) do nothing;
+
+with duplicates as (
+    select id, min(id) over (partition by course_id, date_time) as keeper_id
+    from public.sessions
+)
+delete from public.attendance a
+using duplicates d
+where d.id = a.session_id and d.id <> d.keeper_id;
+
+with duplicates as (
+    select id, min(id) over (partition by course_id, date_time) as keeper_id
+    from public.sessions
+)
+delete from public.sessions s
+using duplicates d
+where d.id = s.id and d.id <> d.keeper_id;
+
+-- 2. Une seule séance par cours et par horaire
+create unique index if not exists sessions_course_id_date_time_key
+    on public.sessions (course_id, date_time);
+
+-- 3. Séance + présences, atomiquement ; retourne l'id de la séance
+create or replace function public.save_roll_call(
+    p_course_id bigint,
+    p_date_time timestamp,
+    p_records jsonb
+)
+returns bigint
+language plpgsql
+as $$
+declare
+    v_session_id bigint;
+begin
+    -- « do update » (sans effet) plutôt que « do nothing » pour que returning
+    -- renvoie aussi l'id d'une séance existante
+    insert into public.sessions (course_id, date_time)
+    values (p_course_id, p_date_time)
+    on conflict (course_id, date_time) do update set course_id = excluded.course_id
+    returning id into v_session_id;
+
+    insert into public.attendance (session_id, student_id, status)
+    select v_session_id, r.student_id, r.status
+    from jsonb_to_recordset(p_records) as r (student_id text, status text)
+    on conflict (session_id, student_id) do update set status = excluded.status;
+
+    return v_session_id;
+end;
+$$;
+
+grant execute on function public.save_roll_call(bigint, timestamp, jsonb) to anon, authenticated;
@@ -0,0 +1,31 @@
+-- Filigrane de synchronisation différentielle des listes d'étudiants et de cours.
+-- L'application garde ces listes en mémoire et ne redemande que les lignes dont
+-- updated_at est postérieur à la dernière synchronisation.
+
+alter table public.students add column if not exists updated_at timestamptz not null default clock_timestamp();
+alter table public.courses add column if not exists updated_at timestamptz not null default clock_timestamp();
+
+create index if not exists students_updated_at_idx on public.students (updated_at);
+create index if not exists courses_updated_at_idx on public.courses (updated_at);
+
+create or replace function public.touch_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    -- clock_timestamp() plutôt que now() : l'heure de la modification, pas celle du début
+    -- de la transaction, pour limiter les lignes validées « dans le passé » du filigrane
+    new.updated_at := clock_timestamp();
+    return new;
+end;
+$$;
+
+drop trigger if exists students_touch_updated_at on public.students;
+create trigger students_touch_updated_at
+    before update on public.students
+    for each row execute function public.touch_updated_at();
+
+drop trigger if exists courses_touch_updated_at on public.courses;
+create trigger courses_touch_updated_at
+    before update on public.courses
+    for each row execute function public.touch_updated_at();
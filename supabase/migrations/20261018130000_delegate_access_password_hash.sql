@@ -0,0 +1,28 @@
+-- Mots de passe hachés (PBKDF2-SHA256, calculés par l'application) dans delegate_access.
+-- La connexion lit une seule ligne par identifiant (index unique sur lower(id)). Les lignes encore
+-- en clair sont converties à la première connexion réussie, qui vide `password`.
+
+alter table public.delegate_access add column if not exists password_hash text;
+alter table public.delegate_access alter column password drop not null;
+
+-- Identifiants uniques sans tenir compte de la casse : la connexion cherche lower(id)
+-- par cet index (un ilike ne peut pas s'en servir). La création échoue si deux lignes
+-- ne diffèrent que par la casse : les fusionner d'abord.
+create unique index if not exists delegate_access_lower_id_idx on public.delegate_access (lower(id));
+
+create or replace function public.get_credential(p_identifier text)
+returns table (
+    id text,
+    role text,
+    password text,
+    password_hash text
+)
+language sql
+stable
+as $$
+    select d.id, d.role, d.password, d.password_hash
+    from public.delegate_access d
+    where lower(d.id) = lower(p_identifier);
+$$;
+
+grant execute on function public.get_credential(text) to anon, authenticated;
@@ -0,0 +1,52 @@
+-- Statistiques de la base pour l'onglet Maintenance, en un seul appel et sans
+-- parcours complet : nombres de lignes estimés par le planificateur (pg_class.reltuples),
+-- tailles sur disque (tables + index + TOAST) et croissance par semaine, calculée
+-- seulement sur les séances récentes.
+
+create index if not exists sessions_created_at_idx on public.sessions (created_at);
+
+create or replace function public.db_statistics(p_weeks integer default 8)
+returns jsonb
+language sql
+stable
+-- Les tailles et estimations du catalogue ne dépendent pas des droits de l'appelant
+security definer
+set search_path = public
+as $$
+    select jsonb_build_object(
+        'tables', (
+            select coalesce(jsonb_agg(jsonb_build_object(
+                'table', c.relname,
+                -- reltuples vaut -1 tant que la table n'a jamais été analysée
+                'estimated_rows', greatest(c.reltuples, 0)::bigint,
+                'total_bytes', pg_total_relation_size(c.oid)
+            ) order by c.relname), '[]'::jsonb)
+            from pg_class c
+            join pg_namespace n on n.oid = c.relnamespace
+            where n.nspname = 'public'
+              and c.relkind = 'r'
+              and c.relname in ('students', 'courses', 'sessions', 'attendance', 'delegate_access', 'attendance_summary')
+        ),
+        'weekly', (
+            select coalesce(jsonb_agg(jsonb_build_object(
+                'week', w.week,
+                'sessions', w.sessions,
+                'attendance', w.attendance
+            ) order by w.week), '[]'::jsonb)
+            from (
+                select to_char(date_trunc('week', s.created_at), 'YYYY-MM-DD') as week,
+                       count(distinct s.id) as sessions,
+                       count(a.session_id) as attendance
+                from public.sessions s
+                left join public.attendance a on a.session_id = s.id
+                where s.created_at >= date_trunc('week', now()) - make_interval(weeks => p_weeks - 1)
+                group by 1
+            ) w
+        )
+    );
+$$;
+
+-- Fonction security definer : pas d'exécution par défaut (public) ni pour anon ;
+-- l'onglet Maintenance l'appelle avec une clé authenticated ou service_role
+revoke execute on function public.db_statistics(integer) from public, anon;
+grant execute on function public.db_statistics(integer) to authenticated, service_role;
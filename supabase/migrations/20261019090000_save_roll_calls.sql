@@ -0,0 +1,32 @@
+-- Écriture d'un lot d'appels de la file locale en un seul aller-retour.
+-- Chaque appel passe par save_roll_call dans son propre bloc d'exception (point de
+-- sauvegarde) : un appel refusé n'annule pas les autres et son erreur est renvoyée
+-- à sa place dans le résultat, pour que la file ne retente que celui-là.
+create or replace function public.save_roll_calls(p_roll_calls jsonb)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_item jsonb;
+    v_results jsonb := '[]'::jsonb;
+begin
+    for v_item in select value from jsonb_array_elements(p_roll_calls) with ordinality order by ordinality
+    loop
+        begin
+            v_results := v_results || jsonb_build_array(jsonb_build_object(
+                'session_id', public.save_roll_call(
+                    (v_item ->> 'course_id')::bigint,
+                    (v_item ->> 'date_time')::timestamp,
+                    v_item -> 'records'
+                )
+            ));
+        exception when others then
+            v_results := v_results || jsonb_build_array(jsonb_build_object('error', sqlerrm));
+        end;
+    end loop;
+
+    return v_results;
+end;
+$$;
+
+grant execute on function public.save_roll_calls(jsonb) to anon, authenticated;
@@ -0,0 +1,141 @@
+"""Connexion : hachés PBKDF2, migration des mots de passe en clair et cache des vérifications."""
+import sqlite3
+
+import pytest
+
+from epl import auth
+from epl.repository import create_repository
+
+
+@pytest.fixture(autouse=True)
+def fast_hashes(monkeypatch):
+    # PBKDF2 est volontairement lent : un réglage réduit suffit pour les tests
+    monkeypatch.setattr(auth, 'ITERATIONS', 1000)
+
+
+class CountingRepository:
+    """Enveloppe un Repository et compte les lectures d'identifiants."""
+
+    def __init__(self, repo):
+        self.repo = repo
+        self.lookups = 0
+
+    def get_credential(self, identifier):
+        self.lookups += 1
+        return self.repo.get_credential(identifier)
+
+    def upsert_credentials(self, records):
+        return self.repo.upsert_credentials(records)
+
+
+@pytest.fixture
+def repo():
+    return CountingRepository(create_repository('sqlite', path=':memory:'))
+
+
+def stored(repo, identifier):
+    return repo.repo.get_credential(identifier)
+
+
+def test_hash_round_trip():
+    encoded = auth.hash_password('secret')
+
+    assert encoded.startswith('pbkdf2_sha256$1000$')
+    assert auth.verify_password('secret', encoded)
+    assert not auth.verify_password('Secret', encoded)
+    assert not auth.verify_password('secret', 'plaintext')
+    assert auth.hash_password('secret') != encoded  # sel aléatoire
+
+
+def test_login_with_hash(repo):
+    repo.upsert_credentials([{'id': 'PROF', 'role': 'PROF', 'password_hash': auth.hash_password('prof')}])
+
+    assert auth.authenticate(repo, 'PROF', 'prof') == {'role': 'PROF', 'scope': 'ALL'}
+    assert auth.authenticate(repo, 'PROF', 'wrong') is None
+    assert auth.authenticate(repo, 'NOBODY', 'prof') is None
+
+
+def test_identifier_is_trimmed_and_case_insensitive(repo):
+    repo.upsert_credentials([{'id': 'LT', 'role': 'DELEGATE', 'password_hash': auth.hash_password('lt')}])
+
+    assert auth.authenticate(repo, '  lt ', 'lt') == {'role': 'DELEGATE', 'scope': 'LT'}
+
+
+def test_identifier_stored_in_another_case_can_log_in(repo):
+    repo.upsert_credentials([{'id': 'Prof', 'role': 'PROF', 'password_hash': auth.hash_password('prof')}])
+
+    assert auth.authenticate(repo, 'PROF', 'prof') == {'role': 'PROF', 'scope': 'ALL'}
+
+
+def test_identifiers_differing_only_by_case_are_rejected(repo):
+    repo.upsert_credentials([{'id': 'LT', 'role': 'DELEGATE', 'password_hash': auth.hash_password('lt')}])
+
+    with pytest.raises(sqlite3.IntegrityError):
+        repo.upsert_credentials([{'id': 'lt', 'role': 'DELEGATE', 'password_hash': auth.hash_password('x')}])
+
+
+def test_legacy_plaintext_is_migrated_on_first_login(repo):
+    repo.upsert_credentials([{'id': 'GC', 'role': 'DELEGATE', 'password': 'gc', 'password_hash': None}])
+
+    assert auth.authenticate(repo, 'GC', 'wrong') is None
+    assert stored(repo, 'GC')['password'] == 'gc'  # un échec ne migre rien
+
+    assert auth.authenticate(repo, 'GC', 'gc') == {'role': 'DELEGATE', 'scope': 'GC'}
+    row = stored(repo, 'GC')
+    assert row['password'] is None
+    assert auth.verify_password('gc', row['password_hash'])
+    assert auth.authenticate(repo, 'GC', 'gc') == {'role': 'DELEGATE', 'scope': 'GC'}
+
+
+def test_weaker_hash_is_rehashed_after_login(repo):
+    old_hash = auth.hash_password('admin', iterations=500)
+    repo.upsert_credentials([{'id': 'ADMIN', 'role': 'ADMIN', 'password_hash': old_hash}])
+    assert auth.needs_rehash(old_hash)
+
+    assert auth.authenticate(repo, 'ADMIN', 'admin') == {'role': 'ADMIN', 'scope': 'ALL'}
+    new_hash = stored(repo, 'ADMIN')['password_hash']
+    assert new_hash.startswith('pbkdf2_sha256$1000$')
+    assert not auth.needs_rehash(new_hash)
+    assert auth.verify_password('admin', new_hash)
+
+
+def test_failed_login_does_not_rehash(repo):
+    old_hash = auth.hash_password('admin', iterations=500)
+    repo.upsert_credentials([{'id': 'ADMIN', 'role': 'ADMIN', 'password_hash': old_hash}])
+
+    assert auth.authenticate(repo, 'ADMIN', 'wrong') is None
+    assert stored(repo, 'ADMIN')['password_hash'] == old_hash
+
+
+def test_session_cache_skips_the_lookup(repo):
+    repo.upsert_credentials([{'id': 'LT', 'role': 'DELEGATE', 'password_hash': auth.hash_password('lt')}])
+    verified = auth.VerifiedSessionCache(ttl=300)
+
+    assert auth.authenticate(repo, 'LT', 'lt', verified) == {'role': 'DELEGATE', 'scope': 'LT'}
+    assert auth.authenticate(repo, 'lt', 'lt', verified) == {'role': 'DELEGATE', 'scope': 'LT'}
+    assert repo.lookups == 1
+
+    # Un autre mot de passe n'est jamais servi par le cache
+    assert auth.authenticate(repo, 'LT', 'wrong', verified) is None
+    assert repo.lookups == 2
+
+
+def test_session_cache_forget_and_expiry(repo):
+    repo.upsert_credentials([{'id': 'LT', 'role': 'DELEGATE', 'password_hash': auth.hash_password('lt')}])
+    verified = auth.VerifiedSessionCache(ttl=300)
+    auth.authenticate(repo, 'LT', 'lt', verified)
+
+    verified.forget('lt')
+    assert verified.get('LT', 'lt') is None
+
+    expired = auth.VerifiedSessionCache(ttl=0)
+    expired.put('LT', 'lt', {'role': 'DELEGATE', 'scope': 'LT'})
+    assert expired.get('LT', 'lt') is None
+
+
+def test_session_cache_keeps_no_password():
+    verified = auth.VerifiedSessionCache()
+    verified.put('LT', 'hunter2', {'role': 'DELEGATE', 'scope': 'LT'})
+
+    assert all(b'hunter2' not in key[1] for key in verified.entries)
+    assert verified.get('LT', 'hunter2') == {'role': 'DELEGATE', 'scope': 'LT'}
@@ -0,0 +1,200 @@
+"""Cache étiqueté (invalidation, stale-while-revalidate) et copie versionnée."""
+import threading
+import time
+
+from epl.cache import Snapshot, TaggedCache
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition non atteinte")
+        time.sleep(0.01)
+
+
+# --- TaggedCache ---
+def test_memoize_counts_hits_and_misses():
+    cache = TaggedCache()
+    calls = []
+
+    @cache.memoize(ttl=60)
+    def load(x):
+        calls.append(x)
+        return {'value': x}
+
+    assert load(1) == {'value': 1}
+    assert load(1) == {'value': 1}
+    assert load(2) == {'value': 2}
+    assert calls == [1, 2]
+    assert cache.stats()['load'] == {'hits': 1, 'misses': 2, 'invalidated': 0, 'refreshes': 0, 'entries': 2}
+
+
+def test_cached_value_is_copied():
+    cache = TaggedCache()
+
+    @cache.memoize()
+    def load():
+        return {'rows': [1]}
+
+    load()['rows'].append(2)
+    assert load() == {'rows': [1]}
+
+
+def test_invalidate_drops_only_tagged_entries():
+    cache = TaggedCache()
+    calls = []
+
+    @cache.memoize(tags=lambda stream: [f"students:{stream}"])
+    def roster(stream):
+        calls.append(stream)
+        return stream
+
+    roster('LT')
+    roster('GC')
+    assert cache.invalidate('students:LT') == 1
+    roster('LT')
+    roster('GC')
+
+    assert calls == ['LT', 'GC', 'LT']
+    assert cache.stats()['roster']['invalidated'] == 1
+
+
+def test_function_name_is_always_a_tag():
+    cache = TaggedCache()
+
+    @cache.memoize()
+    def first():
+        return 1
+
+    @cache.memoize()
+    def second():
+        return 2
+
+    first()
+    second()
+    first.clear()
+    assert cache.stats()['first']['entries'] == 0
+    assert cache.stats()['second']['entries'] == 1
+
+
+def test_expired_entry_is_recomputed():
+    cache = TaggedCache()
+    calls = []
+
+    @cache.memoize(ttl=0.05)
+    def load():
+        calls.append(1)
+        return len(calls)
+
+    assert load() == 1
+    time.sleep(0.06)
+    assert load() == 2
+
+
+def test_result_computed_during_an_invalidation_is_not_kept():
+    cache = TaggedCache()
+    started, release = threading.Event(), threading.Event()
+    values = iter(['stale', 'fresh'])
+
+    @cache.memoize(tags=lambda: ['students:LT'])
+    def load():
+        value = next(values)
+        if value == 'stale':
+            started.set()
+            release.wait(2)
+        return value
+
+    worker = threading.Thread(target=load)
+    worker.start()
+    started.wait(2)
+    cache.invalidate('students:LT')  # écriture pendant la lecture
+    release.set()
+    worker.join(2)
+
+    assert load() == 'fresh'
+
+
+def test_stale_while_revalidate():
+    cache = TaggedCache()
+    version = {'n': 1}
+
+    @cache.memoize(ttl=60, refresh_after=0.05)
+    def load():
+        return version['n']
+
+    assert load() == 1
+    version['n'] = 2
+    time.sleep(0.06)
+
+    assert load() == 1  # servi immédiatement, recalculé en arrière-plan
+    wait_for(lambda: not cache.refreshing)
+    assert load() == 2
+    assert cache.stats()['load']['refreshes'] == 1
+
+
+def test_failed_refresh_keeps_the_old_value():
+    cache = TaggedCache()
+    state = {'fail': False}
+
+    @cache.memoize(ttl=60, refresh_after=0.05)
+    def load():
+        if state['fail']:
+            raise RuntimeError("base injoignable")
+        return 'ok'
+
+    load()
+    state['fail'] = True
+    time.sleep(0.06)
+    assert load() == 'ok'
+    wait_for(lambda: not cache.refreshing)
+    assert load() == 'ok'
+
+
+def test_max_entries_evicts_least_recently_used():
+    cache = TaggedCache(max_entries=2)
+
+    @cache.memoize()
+    def load(x):
+        return x
+
+    load(1)
+    load(2)
+    load(1)
+    load(3)
+    assert {key[1] for key in cache.entries} == {(1,), (3,)}
+
+
+# --- Snapshot ---
+def test_snapshot_serves_stale_copy_while_reloading():
+    version = {'n': 1}
+    snapshot = Snapshot(lambda: version['n'], max_age=300)
+
+    assert snapshot.get() == 1
+    version['n'] = 2
+    snapshot.invalidate()
+
+    assert snapshot.get() == 1
+    wait_for(lambda: not snapshot.refreshing)
+    assert snapshot.get() == 2
+    assert snapshot.version == 2
+    assert snapshot.stats() == {'hits': 2, 'misses': 1, 'invalidated': 1, 'refreshes': 1, 'entries': 1}
+
+
+def test_snapshot_keeps_serving_after_a_failed_reload():
+    state = {'fail': False}
+
+    def load():
+        if state['fail']:
+            raise RuntimeError("base injoignable")
+        return 'ok'
+
+    snapshot = Snapshot(load, max_age=300)
+    snapshot.get()
+    state['fail'] = True
+    snapshot.invalidate()
+
+    assert snapshot.get() == 'ok'
+    wait_for(lambda: not snapshot.refreshing)
+    assert snapshot.get() == 'ok'
+    assert snapshot.last_error == "RuntimeError: base injoignable"
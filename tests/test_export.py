@@ -0,0 +1,16 @@
+"""Export des présences page par page (CSV, JSON, Parquet)."""
+import pyarrow.parquet as pq
+
+from epl import backend
+from epl.repository import create_repository
+
+
+def test_empty_parquet_export_is_a_valid_file(tmp_path):
+    path = str(tmp_path / 'presences.parquet')
+
+    written, preview = backend.export_attendance(create_repository('sqlite', path=':memory:'), path, 'parquet')
+
+    table = pq.read_table(path)
+    assert (written, table.num_rows) == (0, 0)
+    assert table.schema.names == backend.ATTENDANCE_EXPORT_COLUMNS
+    assert preview.empty
@@ -0,0 +1,222 @@
+"""File locale des appels : clés d'idempotence, écriture par lots, recul exponentiel et état « failed »."""
+import time
+
+import pytest
+
+from epl import outbox as outbox_module
+from epl.outbox import AttendanceOutbox, idempotency_key
+from epl.repository import create_repository
+
+RECORDS = [{'student_id': 'LF-LT-0001', 'status': 'PRESENT'}, {'student_id': 'LF-LT-0002', 'status': 'ABSENT'}]
+
+
+class FakeRepository:
+    """Enregistre les lots reçus ; `errors` donne l'erreur d'un appel par cours, `fail` fait échouer tout le lot."""
+
+    def __init__(self):
+        self.batches = []
+        self.errors = {}
+        self.fail = None
+        self.during_write = None
+
+    def save_roll_calls(self, roll_calls):
+        self.batches.append(roll_calls)
+        if self.during_write is not None:
+            self.during_write()
+        if self.fail is not None:
+            raise self.fail
+        return [
+            {'error': self.errors[item['course_id']]} if item['course_id'] in self.errors
+            else {'session_id': 100 + item['course_id']}
+            for item in roll_calls
+        ]
+
+
+@pytest.fixture(autouse=True)
+def no_jitter(monkeypatch):
+    monkeypatch.setattr(outbox_module.random, 'uniform', lambda low, high: 1.0)
+
+
+@pytest.fixture
+def repo():
+    return FakeRepository()
+
+
+@pytest.fixture
+def written():
+    return []
+
+
+@pytest.fixture
+def queue(repo, written):
+    return AttendanceOutbox(':memory:', repo, base_delay=1.0, max_delay=8.0, max_attempts=4,
+                            on_written=lambda *call: written.append(call))
+
+
+def rows(queue):
+    return {row['key']: row for row in queue.pending()}
+
+
+def test_idempotency_key():
+    assert idempotency_key(3, '2026-10-01T08:00:00', 'LT') == '3|2026-10-01T08:00:00|LT'
+
+
+def test_resubmission_replaces_the_waiting_roll_call(queue):
+    first = queue.enqueue(1, '2026-10-01T08:00:00', 'LT', RECORDS)
+    second = queue.enqueue(1, '2026-10-01T08:00:00', 'LT', RECORDS[:1])
+    other_stream = queue.enqueue(1, '2026-10-01T08:00:00', 'GC', RECORDS)
+    other_date = queue.enqueue(1, '2026-10-02T08:00:00', 'LT', RECORDS)
+
+    assert first == second
+    assert len({first, other_stream, other_date}) == 3
+    assert queue.stats()['depth'] == 3
+    with queue.lock:
+        revision, records = queue.conn.execute(
+            "SELECT revision, records FROM attendance_outbox WHERE key = ?", (first,)
+        ).fetchone()
+    assert revision == 2
+    assert records == '[{"student_id": "LF-LT-0001", "status": "PRESENT"}]'
+
+
+def test_flush_sends_due_items_in_one_batch(queue, repo, written):
+    queue.enqueue(1, '2026-10-01T08:00:00', 'LT', RECORDS)
+    queue.enqueue(2, '2026-10-01T10:00:00', 'LT', RECORDS)
+
+    assert queue.flush() == 2
+    assert len(repo.batches) == 1
+    assert [item['course_id'] for item in repo.batches[0]] == [1, 2]
+    assert repo.batches[0][0]['records'] == RECORDS
+    assert queue.pending() == []
+    assert [call[0] for call in written] == [1, 2]
+    assert queue.stats()['flushed'] == 2
+
+
+def test_flush_respects_batch_size(repo):
+    queue = AttendanceOutbox(':memory:', repo, batch_size=2)
+    for course_id in range(5):
+        queue.enqueue(course_id, '2026-10-01T08:00:00', 'LT', RECORDS)
+
+    assert queue.flush() == 2
+    assert queue.flush() == 2
+    assert queue.flush() == 1
+    assert [len(batch) for batch in repo.batches] == [2, 2, 1]
+
+
+def test_empty_queue_makes_no_round_trip(queue, repo):
+    assert queue.flush() == 0
+    assert repo.batches == []
+
+
+def test_resubmission_during_the_write_stays_queued(queue, repo):
+    key = queue.enqueue(1, '2026-10-01T08:00:00', 'LT', RECORDS)
+    repo.during_write = lambda: queue.enqueue(1, '2026-10-01T08:00:00', 'LT', RECORDS[:1])
+
+    assert queue.flush() == 1
+    assert list(rows(queue)) == [key]  # la version envoyée est retirée, pas la nouvelle
+
+
+def test_rejected_item_is_rescheduled_alone(queue, repo, written):
+    queue.enqueue(1, '2026-10-01T08:00:00', 'LT', RECORDS)
+    rejected = queue.enqueue(2, '2026-10-01T08:00:00', 'LT', RECORDS)
+    repo.errors[2] = 'insert or update on table "sessions" violates foreign key constraint'
+
+    assert queue.flush() == 1
+    pending = rows(queue)
+    assert list(pending) == [rejected]
+    assert pending[rejected]['attempts'] == 1
+    assert pending[rejected]['last_error'] == repo.errors[2]
+    assert [call[0] for call in written] == [1]
+
+
+def test_failed_batch_backs_off_exponentially(queue, repo):
+    key = queue.enqueue(1, '2026-10-01T08:00:00', 'LT', RECORDS)
+    repo.fail = ConnectionError("base injoignable")
+
+    delays = []
+    for _ in range(3):
+        before = time.time()
+        assert queue.flush(now=float('inf')) == 0
+        delays.append(rows(queue)[key]['next_attempt_at'] - before)
+
+    assert [round(delay) for delay in delays] == [1, 2, 4]
+    assert rows(queue)[key]['last_error'] == "ConnectionError: base injoignable"
+    assert queue.stats()['failing'] == 1
+
+
+def test_backoff_is_capped(repo):
+    queue = AttendanceOutbox(':memory:', repo, base_delay=1.0, max_delay=3.0, max_attempts=10)
+    key = queue.enqueue(1, '2026-10-01T08:00:00', 'LT', RECORDS)
+    repo.fail = TimeoutError("délai dépassé")
+    for _ in range(5):
+        queue.flush(now=float('inf'))
+
+    before = time.time()
+    queue.flush(now=float('inf'))
+    assert round(rows(queue)[key]['next_attempt_at'] - before) == 3
+
+
+def test_not_due_items_wait(queue, repo):
+    queue.enqueue(1, '2026-10-01T08:00:00', 'LT', RECORDS)
+    repo.fail = ConnectionError("base injoignable")
+    queue.flush()
+    repo.fail = None
+
+    assert queue.flush() == 0  # recul en cours
+    assert queue.flush(now=time.time() + 60) == 1
+
+
+def test_item_fails_after_max_attempts_and_can_be_retried(queue, repo):
+    key = queue.enqueue(1, '2026-10-01T08:00:00', 'LT', RECORDS)
+    repo.errors[1] = 'new row violates check constraint'
+    for _ in range(4):
+        queue.flush(now=float('inf'))
+
+    assert rows(queue)[key]['status'] == 'failed'
+    stats = queue.stats()
+    assert (stats['depth'], stats['failing'], stats['failed']) == (0, 0, 1)
+    attempts = len(repo.batches)
+    assert queue.flush(now=float('inf')) == 0
+    assert len(repo.batches) == attempts  # plus retenté automatiquement
+
+    del repo.errors[1]
+    assert queue.retry_failed() == 1
+    assert rows(queue)[key]['status'] == 'pending'
+    assert queue.flush() == 1
+
+
+def test_resubmission_revives_a_failed_item(queue, repo):
+    key = queue.enqueue(1, '2026-10-01T08:00:00', 'LT', RECORDS)
+    repo.errors[1] = 'new row violates check constraint'
+    for _ in range(4):
+        queue.flush(now=float('inf'))
+
+    queue.enqueue(1, '2026-10-01T08:00:00', 'LT', RECORDS)
+    row = rows(queue)[key]
+    assert (row['status'], row['attempts'], row['last_error']) == ('pending', 0, None)
+
+
+def test_queue_survives_a_restart(tmp_path, repo):
+    path = str(tmp_path / 'outbox.db')
+    AttendanceOutbox(path, repo).enqueue(1, '2026-10-01T08:00:00', 'LT', RECORDS)
+
+    reopened = AttendanceOutbox(path, repo)
+    assert reopened.stats()['depth'] == 1
+    assert reopened.flush() == 1
+
+
+def test_batch_against_sqlite_writes_valid_roll_calls_only():
+    db = create_repository('sqlite', path=':memory:')
+    db.upsert_students([
+        {'id': 'LF-LT-0001', 'last_name': 'KOFFI', 'first_name': 'Ama', 'stream': 'LT'},
+        {'id': 'LF-LT-0002', 'last_name': 'MENSAH', 'first_name': 'Kodjo', 'stream': 'LT'},
+    ])
+    course_id = db.insert_courses([{'name': 'Algèbre', 'stream_target': 'LT'}])[0]['id']
+    queue = AttendanceOutbox(':memory:', db)
+    queue.enqueue(course_id, '2026-10-01T08:00:00', 'LT', RECORDS)
+    rejected = queue.enqueue(course_id + 1, '2026-10-01T08:00:00', 'LT', RECORDS)  # cours inexistant
+
+    assert queue.flush() == 1
+    assert list(rows(queue)) == [rejected]
+    session_id = db.find_session_id(course_id, '2026-10-01T08:00:00')
+    assert session_id is not None
+    assert db.find_session_id(course_id + 1, '2026-10-01T08:00:00') is None
@@ -0,0 +1,59 @@
+"""Listes en mémoire synchronisées par différence (RosterCache)."""
+from epl.roster import RosterCache
+
+
+class FakeTable:
+    """Table dont `load(updated_after)` renvoie les lignes modifiées après le filigrane, et note les appels."""
+
+    def __init__(self, rows):
+        self.rows = {row['id']: row for row in rows}
+        self.loads = []
+
+    def load(self, updated_after):
+        self.loads.append(updated_after)
+        return [dict(row) for row in self.rows.values()
+                if updated_after is None or row['updated_at'] > updated_after]
+
+
+def roster_for(table, **options):
+    return RosterCache(table.load, stream_field='stream', order_by='last_name', **options)
+
+
+TABLE = [
+    {'id': 'LF-LT-0001', 'last_name': 'KOFFI', 'stream': 'LT', 'updated_at': '2026-10-01T08:00:00+00:00'},
+    {'id': 'LF-GC-0001', 'last_name': 'AGBEKO', 'stream': 'GC', 'updated_at': '2026-10-02T08:00:00+00:00'},
+]
+
+
+def test_first_access_loads_everything_then_serves_from_memory():
+    table = FakeTable(TABLE)
+    roster = roster_for(table, refresh_interval=60)
+
+    assert [row['id'] for row in roster.select()] == ['LF-GC-0001', 'LF-LT-0001']
+    assert [row['id'] for row in roster.select('LT')] == ['LF-LT-0001']
+    assert table.loads == [None]
+    assert roster.stats() == {'hits': 1, 'misses': 1, 'invalidated': 0, 'refreshes': 0, 'entries': 2}
+
+
+def test_invalidate_triggers_a_delta_sync_from_the_watermark():
+    table = FakeTable(TABLE)
+    roster = roster_for(table, refresh_interval=60)
+    roster.select()
+
+    table.rows['LF-LT-0001'] = {**TABLE[0], 'stream': 'GC', 'updated_at': '2026-10-03T08:00:00+00:00'}
+    roster.invalidate()
+
+    assert [row['id'] for row in roster.select('GC')] == ['LF-GC-0001', 'LF-LT-0001']
+    assert roster.select('LT') == []
+    assert table.loads == [None, '2026-10-02T08:00:00+00:00']
+    assert roster.last_delta_rows == 1
+
+
+def test_full_sync_drops_deleted_rows():
+    table = FakeTable(TABLE)
+    roster = roster_for(table, refresh_interval=0, full_sync_interval=0)
+    roster.select()
+
+    del table.rows['LF-GC-0001']
+    assert [row['id'] for row in roster.select()] == ['LF-LT-0001']
+    assert roster.full_syncs == 2
@@ -0,0 +1,64 @@
+"""Index de recherche en mémoire : matricules, préfixes de noms, accents et fautes de frappe."""
+from epl.search import StudentSearchIndex
+
+
+STUDENTS = [
+    {'id': 'LF-LT-0001', 'last_name': 'KOFFI', 'first_name': 'Ama', 'stream': 'LT'},
+    {'id': 'LF-LT-0002', 'last_name': 'MENSAH', 'first_name': 'Kodjo', 'stream': 'LT'},
+    {'id': 'LF-GC-0001', 'last_name': 'AGBÉKO', 'first_name': 'Élodie', 'stream': 'GC'},
+    {'id': 'LF-GC-0002', 'last_name': 'KOFFIGAN', 'first_name': 'Yao', 'stream': 'GC'},
+]
+
+
+def ids(results):
+    return [row['id'] for row in results]
+
+
+def test_search_by_exact_and_prefix_id():
+    index = StudentSearchIndex(STUDENTS)
+
+    assert ids(index.search('lf-lt-0002')) == ['LF-LT-0002']
+    assert ids(index.search('LF-GC')) == ['LF-GC-0001', 'LF-GC-0002']
+
+
+def test_search_by_name_prefixes():
+    index = StudentSearchIndex(STUDENTS)
+
+    assert ids(index.search('kof am')) == ['LF-LT-0001']
+    assert ids(index.search('koffi')) == ['LF-LT-0001', 'LF-GC-0002']  # mot exact avant préfixe
+
+
+def test_search_ignores_accents_and_tolerates_typos():
+    index = StudentSearchIndex(STUDENTS)
+
+    assert ids(index.search('elodie')) == ['LF-GC-0001']
+    assert ids(index.search('mensha')) == ['LF-LT-0002']
+
+
+def test_search_respects_limit_and_empty_query():
+    index = StudentSearchIndex(STUDENTS)
+
+    assert len(index.search('LF', limit=2)) == 2
+    assert index.search('   ') == []
+
+
+def test_upsert_and_remove_update_the_index():
+    index = StudentSearchIndex(STUDENTS)
+
+    index.upsert({**STUDENTS[0], 'last_name': 'ADJOVI'})
+    assert ids(index.search('adjovi')) == ['LF-LT-0001']
+    assert 'LF-LT-0001' not in ids(index.search('koffi'))
+
+    index.remove('LF-LT-0001')
+    index.remove('LF-LT-0001')  # sans effet
+    assert index.search('adjovi') == []
+    assert ids(index.search('LF-LT')) == ['LF-LT-0002']
+    assert len(index) == 3
+
+
+def test_partial_upsert_keeps_the_other_columns():
+    index = StudentSearchIndex(STUDENTS)
+
+    index.upsert({'id': 'LF-LT-0001', 'last_name': 'ADJOVI'})  # seules les colonnes modifiées
+    assert index.search('adjovi ama') == [{**STUDENTS[0], 'last_name': 'ADJOVI'}]
+    assert ids(index.search('koffi')) == ['LF-GC-0002']
@@ -0,0 +1,61 @@
+"""Requêtes PostgREST construites par SupabaseRepository (sans réseau : transport httpx simulé)."""
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+import pytest
+
+from epl.repository import create_repository
+
+
+@pytest.fixture
+def requests_seen():
+    return []
+
+
+@pytest.fixture
+def repo(requests_seen):
+    def handler(request):
+        requests_seen.append(request)
+        return httpx.Response(200, json=[], headers={'content-range': '0-0/0'})
+
+    http_client = httpx.Client(transport=httpx.MockTransport(handler))
+    return create_repository('supabase', url='http://db.test', key='key', http_client=http_client)
+
+
+def query_of(request):
+    return {name: values[0] for name, values in parse_qs(urlsplit(str(request.url)).query).items()}
+
+
+def test_search_keeps_commas_and_parentheses(repo, requests_seen):
+    repo.query_student_stats(search='KOFFI, Ama (LT)')
+
+    condition = query_of(requests_seen[-1])['or']
+    assert condition == (
+        '(last_name.ilike."*KOFFI, Ama (LT)*",'
+        'first_name.ilike."*KOFFI, Ama (LT)*",'
+        'student_id.ilike."*KOFFI, Ama (LT)*")'
+    )
+
+
+def test_search_escapes_quotes_and_like_wildcards(repo, requests_seen):
+    repo.query_student_stats(search='a"b 5% x_y')
+
+    condition = query_of(requests_seen[-1])['or']
+    assert 'last_name.ilike."*a\\"b 5\\\\% x\\\\_y*"' in condition
+
+
+def test_nulls_sort_last_in_both_directions(repo, requests_seen):
+    repo.query_student_stats(order_by='last_session_at', descending=True)
+    repo.query_student_stats(order_by='last_session_at', descending=False)
+
+    assert query_of(requests_seen[0])['order'] == 'last_session_at.desc.nullslast,student_id.desc'
+    assert query_of(requests_seen[1])['order'] == 'last_session_at.asc.nullslast,student_id.asc'
+
+
+def test_credential_lookup_goes_through_the_indexed_function(repo, requests_seen):
+    assert repo.get_credential('lt') is None
+
+    request = requests_seen[-1]
+    assert request.method == 'GET'
+    assert urlsplit(str(request.url)).path == '/rest/v1/rpc/get_credential'
+    assert query_of(request) == {'p_identifier': 'lt'}
@@ -0,0 +1 @@
+"""Pages de l'application, chargées par st.navigation depuis app.py."""
@@ -0,0 +1,30 @@
+"""Étudiants sous 50 % de présence, filtrés et paginés par la base."""
+import pandas as pd
+import streamlit as st
+
+from epl.services import get_student_stats_page
+from views.common import STATS_PAGE_SIZES, admin_header, stats_page_nav, stats_page_offset
+
+
+admin_header("Alertes Absences", "🚨")
+
+# Seuil, tri et pagination appliqués par la base : seules les lignes affichées sont transférées
+page_size = STATS_PAGE_SIZES[2]
+alerts = get_student_stats_page(max_rate=50, limit=page_size, offset=stats_page_offset("alerts", page_size, None))
+red_list = pd.DataFrame(alerts['rows'])
+
+if not alerts['total']:
+    st.success("✅ Aucun étudiant en dessous de 50%.")
+else:
+    st.error(f"⚠️ {alerts['total']} étudiant(s) nécessite(nt) une attention.")
+    stats_page_nav("alerts", alerts['total'], page_size)
+    
+    st.dataframe(
+        red_list[['first_name', 'last_name', 'stream', 'attendance_percentage', 'absent_count']],
+        column_config={
+            "attendance_percentage": st.column_config.ProgressColumn("Taux", format="%.1f%%", min_value=0, max_value=100),
+            "absent_count": st.column_config.NumberColumn("Absences totales"),
+        },
+        use_container_width=True,
+        hide_index=True
+    )
@@ -0,0 +1,144 @@
+"""Éléments d'interface communs aux pages (`views/`)."""
+import functools
+
+import pandas as pd
+import streamlit as st
+
+from epl.config import get_setting
+from epl.tracing import current_trace, start_trace, stop_trace
+
+LOGO_URL = "https://tse4.mm.bing.net/th/id/OIP.AQ-vlqgp9iyDGW8ag9oCsgHaHS?rs=1&pid=ImgDetMain&o=7&rm=3"
+
+# Fonction header pour pages admin
+def admin_header(title, icon):
+    col_logo, col_title = st.columns([1, 4])
+    with col_logo:
+        st.markdown(f"""
+        <div class='logo-frame-small'>
+            <div class='logo-corner logo-corner-tl'></div>
+            <div class='logo-corner logo-corner-tr'></div>
+            <div class='logo-corner logo-corner-bl'></div>
+            <div class='logo-corner logo-corner-br'></div>
+            <img src="{LOGO_URL}" alt="Logo EPL">
+        </div>
+        """, unsafe_allow_html=True)
+    with col_title:
+        st.title(f"{icon} {title}")
+    return col_title
+
+# Explorateur et alertes : une page de student_stats, filtrée et triée par la base
+STATS_PAGE_SIZES = [25, 50, 100, 200]
+STATS_SORT_LABELS = {
+    'attendance_percentage': "Taux de présence",
+    'absent_count': "Absences",
+    'present_count': "Présences",
+    'total_sessions': "Sessions",
+    'last_name': "Nom",
+    'first_name': "Prénom",
+    'student_id': "Matricule",
+    'stream': "Filière",
+    'last_session_at': "Dernière session",
+}
+
+def stats_page_offset(key, page_size, filters):
+    """Offset de la page courante ; on repart de la première page quand les filtres changent."""
+    if st.session_state.get(f"{key}_filters") != filters:
+        st.session_state[f"{key}_filters"] = filters
+        st.session_state[f"{key}_page"] = 0
+    return st.session_state.get(f"{key}_page", 0) * page_size
+
+def stats_page_nav(key, total, page_size):
+    """Boutons précédent / suivant et position dans le résultat."""
+    page_count = max(1, -(-total // page_size))
+    page = st.session_state.get(f"{key}_page", 0)
+    if page >= page_count:
+        # Le résultat a rétréci depuis le dernier affichage : dernière page disponible
+        st.session_state[f"{key}_page"] = page_count - 1
+        st.rerun()
+    col_prev, col_info, col_next = st.columns([1, 3, 1])
+    if col_prev.button("⬅️ Précédent", key=f"{key}_prev", disabled=page == 0, use_container_width=True):
+        st.session_state[f"{key}_page"] = page - 1
+        st.rerun()
+    if col_next.button("Suivant ➡️", key=f"{key}_next", disabled=page >= page_count - 1, use_container_width=True):
+        st.session_state[f"{key}_page"] = page + 1
+        st.rerun()
+    col_info.caption(f"Page {page + 1} / {page_count} · {total} étudiant(s)")
+
+def query_trace_enabled():
+    """Trace des appels à la base : pour l'ADMIN, ou pour tous avec QUERY_TRACE=1."""
+    return (str(get_setting("QUERY_TRACE", "0")).lower() in ("1", "true", "yes")
+            or st.session_state.get('user_role') == 'ADMIN')
+
+def traced_fragment(func):
+    """`st.fragment` dont les réexécutions isolées ont leur propre trace des requêtes.
+
+    Une réexécution de fragment ne repasse pas par app.py : sans cela, la cascade en bas de page
+    resterait celle de la dernière exécution complète. Lors d'une exécution complète, les appels
+    du fragment sont déjà dans la trace de la page.
+    """
+    @st.fragment
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if current_trace() is not None or not query_trace_enabled():
+            return func(*args, **kwargs)
+        trace = start_trace()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            stop_trace()
+        render_query_trace(trace, "de cette zone (dernière interaction)")
+        return result
+    return wrapper
+
+def render_query_trace(trace, scope="de la dernière exécution complète"):
+    """Cascade des appels à la base d'une exécution (voir epl/tracing.py), repliée sous la page ou le fragment."""
+    trace_summary = trace.summary()
+    with st.expander(
+        f"🔬 Requêtes {scope} : {trace_summary['calls']} appel(s), "
+        f"{trace_summary['duration'] * 1000:.0f} ms en base"
+        + (f", {trace_summary['repeated']} répété(s)" if trace_summary['repeated'] else "")
+    ):
+        if not trace.calls:
+            st.caption("Aucun appel à la base (tout est servi depuis les caches).")
+        else:
+            repeats = {}
+            for call in trace.calls:
+                repeats[(call['method'], call['arguments'])] = repeats.get((call['method'], call['arguments']), 0) + 1
+            df_trace = pd.DataFrame([
+                {
+                    "#": i + 1,
+                    "Méthode": call['method'],
+                    "Arguments": call['arguments'],
+                    "Ressources": " · ".join(call['resources']),
+                    "Début (ms)": call['start'] * 1000,
+                    "Fin (ms)": (call['start'] + call['duration']) * 1000,
+                    "Durée (ms)": call['duration'] * 1000,
+                    "Lignes": call['rows'],
+                    "Octets": call['bytes'],
+                    "Répétitions": repeats[(call['method'], call['arguments'])],
+                    "Erreur": call['error'],
+                }
+                for i, call in enumerate(trace.calls)
+            ])
+            df_trace["Appel"] = df_trace["#"].astype(str) + ". " + df_trace["Méthode"]
+            # Cascade : une barre par appel, placée à son instant de début dans l'exécution
+            import altair as alt  # chargé seulement quand il y a une cascade à dessiner
+
+            waterfall = alt.Chart(df_trace).mark_bar(minBandSize=2).encode(
+                x=alt.X("Début (ms):Q", title="Temps depuis le début de l'exécution (ms)"),
+                x2="Fin (ms):Q",
+                y=alt.Y("Appel:N", sort=None, title=None),
+                color=alt.condition(alt.datum["Répétitions"] > 1, alt.value("#ef4444"), alt.value("#3b82f6")),
+                tooltip=["Méthode", "Arguments", "Ressources", "Durée (ms)", "Lignes", "Octets", "Répétitions"]
+            ).properties(height=max(120, 22 * len(df_trace)))
+            st.altair_chart(waterfall, use_container_width=True)
+            st.caption("En rouge : appels identiques (même méthode, mêmes arguments) répétés dans la même exécution.")
+            st.dataframe(
+                df_trace.drop(columns=["Appel", "Fin (ms)"]),
+                column_config={
+                    "Début (ms)": st.column_config.NumberColumn(format="%.1f"),
+                    "Durée (ms)": st.column_config.NumberColumn(format="%.1f"),
+                },
+                hide_index=True,
+                use_container_width=True
+            )
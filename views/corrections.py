@@ -0,0 +1,104 @@
+"""Correction rétroactive des présences d'une session passée."""
+import time
+
+import pandas as pd
+import streamlit as st
+
+from epl.services import get_courses, get_past_sessions, get_students, repo, update_attendance_correction
+from views.common import admin_header, traced_fragment
+
+
+# Éditeur de correction : cocher une case ne réexécute que ce fragment, pas les filtres ni la liste des séances
+@traced_fragment
+def correction_editor():
+    st.divider()
+    st.markdown("#### Modifier les présences :")
+    
+    edited_df = st.data_editor(
+        st.session_state['editor_data'],
+        column_config={
+            "Présent": st.column_config.CheckboxColumn("Présent", help="Cocher si présent"),
+            "ID": st.column_config.Column(disabled=True),
+            "Nom": st.column_config.Column(disabled=True),
+            "Prénom": st.column_config.Column(disabled=True),
+        },
+        hide_index=True,
+        use_container_width=True,
+        height=400
+    )
+    
+    col_save1, col_save2, col_save3 = st.columns([1, 2, 1])
+    with col_save2:
+        if st.button("💾 Enregistrer les corrections", type="primary", use_container_width=True):
+            updated_map = dict(zip(edited_df['ID'], edited_df['Présent']))
+            
+            if update_attendance_correction(st.session_state['fix_session_id'], st.session_state['fix_original'], updated_map):
+                st.success("✅ Modifications enregistrées !")
+                time.sleep(1.5)
+                del st.session_state['editor_data']
+                st.rerun()
+
+
+admin_header("Correction d'Appel", "✏️")
+st.info("Modifier rétroactivement les présences d'une session passée.")
+
+col_f, col_c, col_p = st.columns(3)
+stream_fix = col_f.selectbox("1. Filière", ["LT", "GC", "IABD", "IS", "GE", "GM"], key="fix_stream")
+fix_courses = {c['name']: c['id'] for c in get_courses(stream_fix)}
+chosen_fix_course = col_c.selectbox("2. Matière", ["Toutes"] + list(fix_courses.keys()), key="fix_course")
+fix_period = col_p.date_input("3. Période (optionnel)", value=[], key="fix_period")
+
+course_ids = tuple(fix_courses.values()) if chosen_fix_course == "Toutes" else (fix_courses[chosen_fix_course],)
+date_from = date_to = None
+if isinstance(fix_period, (list, tuple)) and len(fix_period) == 2:
+    date_from = fix_period[0].isoformat()
+    date_to = (fix_period[1] + pd.Timedelta(days=1)).isoformat()
+
+# Pagination keyset sur (date_time, id) : pile des curseurs des pages parcourues
+fix_filters = (course_ids, date_from, date_to)
+if st.session_state.get('fix_filters') != fix_filters:
+    st.session_state['fix_filters'] = fix_filters
+    st.session_state['fix_cursors'] = [None]
+
+sessions_data, next_cursor = get_past_sessions(course_ids, date_from, date_to, st.session_state['fix_cursors'][-1])
+
+if sessions_data:
+    sess_options = {}
+    for s in sessions_data:
+        course_name = s['courses']['name'] if s.get('courses') else "Matière Inconnue"
+        label = f"{s['date_time'][:10]} {s['date_time'][11:16]} | {course_name} (#{s['id']})"
+        sess_options[label] = s['id']
+    
+    col_s, col_prev, col_next = st.columns([4, 1, 1])
+    page_number = len(st.session_state['fix_cursors'])
+    chosen_sess_label = col_s.selectbox(f"4. Sélectionner la séance (page {page_number})", list(sess_options.keys()), key="session_select")
+    if col_prev.button("◀ Plus récentes", key="fix_prev_page", disabled=page_number == 1, use_container_width=True):
+        st.session_state['fix_cursors'].pop()
+        st.rerun()
+    if col_next.button("Plus anciennes ▶", key="fix_next_page", disabled=next_cursor is None, use_container_width=True):
+        st.session_state['fix_cursors'].append(next_cursor)
+        st.rerun()
+    
+    if st.button("📥 Charger les données", type="primary", key="load_session"):
+        chosen_sess_id = sess_options[chosen_sess_label]
+        
+        all_students = get_students(stream_fix)
+        attendance_records = repo.list_session_attendance(chosen_sess_id)
+        recorded = {r['student_id']: r['status'] == 'PRESENT' for r in attendance_records}
+        
+        data_for_editor = []
+        for s in all_students:
+            data_for_editor.append({
+                "ID": s['id'],
+                "Nom": s['last_name'],
+                "Prénom": s['first_name'],
+                "Présent": recorded.get(s['id'], False)
+            })
+        
+        st.session_state['editor_data'] = pd.DataFrame(data_for_editor)
+        st.session_state['fix_session_id'] = chosen_sess_id
+        # État chargé (None : pas de ligne de présence) pour n'envoyer que les changements
+        st.session_state['fix_original'] = {s['id']: recorded.get(s['id']) for s in all_students}
+
+if 'editor_data' in st.session_state:
+    correction_editor()
@@ -0,0 +1,79 @@
+"""Tableau de bord (professeur) et statistiques globales (admin), depuis la copie partagée de student_stats."""
+import time
+from datetime import datetime
+
+import altair as alt
+import streamlit as st
+
+from epl import backend
+from epl.services import get_global_stats, get_stats_snapshot
+from views.common import admin_header
+
+
+if st.session_state['user_role'] == 'ADMIN':
+    admin_header("Statistiques Globales", "📈")
+else:
+    admin_header("Tableau de Bord Académique", "📊")
+
+df = get_global_stats()
+    
+# Âge de la copie servie ; elle est rechargée en arrière-plan quand elle est périmée
+snapshot = get_stats_snapshot()
+if snapshot.loaded_at is not None:
+    col_age, col_refresh = st.columns([4, 1])
+    age_seconds = snapshot.age()
+    age_label = f"{age_seconds:.0f} s" if age_seconds < 60 else f"{age_seconds / 60:.0f} min"
+    col_age.caption(
+        f"🕒 Données du {datetime.fromtimestamp(snapshot.loaded_at).strftime('%d/%m/%Y %H:%M:%S')} "
+        f"(il y a {age_label}, version {snapshot.version})"
+        + (" · actualisation en cours..." if snapshot.refreshing else "")
+    )
+    if col_refresh.button("🔄 Actualiser", key="refresh_stats", use_container_width=True):
+        snapshot.invalidate()
+        snapshot.get()
+        time.sleep(0.5)
+        st.rerun()
+    
+if df.empty:
+    st.warning("📭 Aucune donnée statistique disponible.")
+else:
+    filieres_dispo = df['stream'].unique()
+    filieres = st.multiselect("Filtrer par filière", filieres_dispo, default=filieres_dispo, key="filter_stream")
+    df_filtered = df[df['stream'].isin(filieres)]
+    
+    col1, col2, col3 = st.columns(3)
+    avg = df_filtered['attendance_percentage'].mean()
+    col1.metric("🎯 Taux Moyen", f"{avg:.1f}%")
+    col2.metric("👥 Étudiants", len(df_filtered))
+    max_sess = df_filtered['total_sessions'].max() if 'total_sessions' in df_filtered.columns else 0
+    col3.metric("📅 Sessions Max", max_sess)
+    
+    st.divider()
+    
+    # Les graphiques reçoivent des agrégats (classes, quartiles) et non une ligne par étudiant
+    c1, c2 = st.columns(2)
+    with c1:
+        st.markdown("**Distribution des taux**")
+        histogram = backend.rate_histogram(df_filtered)
+        chart = alt.Chart(histogram).mark_bar().encode(
+            x=alt.X("bin_start:Q", bin="binned", title="Taux (%)", scale=alt.Scale(domain=[0, 100])),
+            x2="bin_end:Q",
+            y=alt.Y("sum(count):Q", title="Nombre d'étudiants"),
+            color='stream:N',
+            tooltip=['stream', 'bin_start', 'bin_end', 'count']
+        ).interactive()
+        st.altair_chart(chart, use_container_width=True)
+    
+    with c2:
+        st.markdown("**Comparatif par filière**")
+        box_stats = backend.rate_boxplot(df_filtered)
+        base = alt.Chart(box_stats).encode(x=alt.X('stream:N', title="Filière"), color='stream:N')
+        whiskers = base.mark_rule().encode(
+            y=alt.Y('lower:Q', title="Taux de présence (%)"), y2='upper:Q'
+        )
+        boxes = base.mark_bar(size=28).encode(
+            y='q1:Q', y2='q3:Q',
+            tooltip=['stream', 'count', 'lower', 'q1', 'median', 'q3', 'upper', 'outliers']
+        )
+        medians = base.mark_tick(color='white', size=28, thickness=2).encode(y='median:Q')
+        st.altair_chart(whiskers + boxes + medians, use_container_width=True)
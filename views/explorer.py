@@ -0,0 +1,54 @@
+"""Explorateur de student_stats : filtres, tri et pagination dans la requête, export CSV."""
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from epl import backend
+from epl.services import get_student_stats_page, repo
+from views.common import STATS_PAGE_SIZES, STATS_SORT_LABELS, admin_header, stats_page_nav, stats_page_offset
+
+
+admin_header("Explorateur de Données", "🔎")
+
+# Filtres, tri et pagination dans la requête : une page à la fois, quel que soit l'effectif
+all_streams = ["LT", "GC", "IABD", "IS", "GE", "GM"]
+col_s, col_q = st.columns([2, 2])
+chosen_streams = col_s.multiselect("Filières", all_streams, default=all_streams, key="explorer_streams")
+search_text = col_q.text_input("Rechercher (nom, prénom ou matricule)", key="explorer_search").strip()
+col_o, col_d, col_n = st.columns([2, 1, 1])
+order_by = col_o.selectbox("Trier par", list(STATS_SORT_LABELS), format_func=STATS_SORT_LABELS.get,
+                           key="explorer_order")
+descending = col_d.toggle("Décroissant", key="explorer_desc")
+page_size = col_n.selectbox("Lignes par page", STATS_PAGE_SIZES, index=1, key="explorer_page_size")
+
+filters = {
+    'streams': None if set(chosen_streams) == set(all_streams) else tuple(sorted(chosen_streams)),
+    'search': search_text or None,
+    'order_by': order_by,
+    'descending': descending,
+}
+page = get_student_stats_page(
+    limit=page_size, offset=stats_page_offset("explorer", page_size, (tuple(filters.items()), page_size)), **filters
+)
+
+if not page['total']:
+    st.info("📭 Aucun étudiant ne correspond à ces filtres.")
+else:
+    stats_page_nav("explorer", page['total'], page_size)
+    st.dataframe(
+        pd.DataFrame(page['rows']),
+        column_config={
+            "attendance_percentage": st.column_config.ProgressColumn("Taux", format="%.1f%%", min_value=0, max_value=100),
+        },
+        use_container_width=True,
+        hide_index=True
+    )
+    # Le fichier n'est généré qu'au clic, page par page, avec les mêmes filtres et le même tri
+    st.download_button(
+        f"📥 Télécharger le résultat filtré (CSV, {page['total']} lignes)",
+        data=lambda: backend.student_stats_csv(repo, **filters),
+        file_name=f"student_stats_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
+        mime="text/csv",
+        key="explorer_download",
+    )
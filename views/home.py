@@ -0,0 +1,318 @@
+"""Page publique : recherche d'un étudiant et ses présences, et formulaire de connexion du staff."""
+import time
+
+import pandas as pd
+import streamlit as st
+
+from epl.services import get_student_stats, login, search_student
+from views.common import LOGO_URL, traced_fragment
+
+# Recherche et profil : une frappe ou un clic ne réexécute que ce fragment, pas les cartes de la page
+@traced_fragment
+def search_panel():
+    # BARRE DE RECHERCHE
+    search_container = st.container()
+    with search_container:
+        search_col1, search_col2 = st.columns([3, 1])
+        with search_col1:
+            search_query = st.text_input(
+                " ",
+                placeholder="Ex: LF-LT-... ou 'Koffi' ou 'Ama'...",
+                label_visibility="collapsed",
+                key="main_search"
+            )
+        with search_col2:
+            search_clicked = st.button("🔍 Rechercher", use_container_width=True, type="primary", key="search_btn")
+
+    # RÉSULTATS DE RECHERCHE
+    if search_query and search_clicked:
+        with st.spinner("Recherche en cours..."):
+            results = search_student(search_query)
+
+            if results:
+                if len(results) == 1:
+                    student = results[0]
+                    st.session_state['selected_student'] = student
+                else:
+                    st.markdown(f"**{len(results)} résultat(s) trouvé(s)**")
+
+                    options = [f"{s['last_name']} {s['first_name']} • ID: {s['id']} • {s['stream']}" 
+                              for s in results]
+
+                    selected_option = st.selectbox(
+                        "Sélectionnez votre profil:",
+                        options,
+                        index=0,
+                        key="student_select"
+                    )
+
+                    if st.button("📊 Voir les statistiques", type="primary", key="view_stats"):
+                        selected_index = options.index(selected_option)
+                        student = results[selected_index]
+                        st.session_state['selected_student'] = student
+
+    # PROFIL ÉTUDIANT
+    if 'selected_student' in st.session_state:
+        student = st.session_state['selected_student']
+
+        st.markdown("---")
+        st.markdown(f"""
+        <div class='student-profile animate-fade-in'>
+            <div style='display: flex; justify-content: space-between; align-items: flex-start; margin-bottom: 1.5rem; flex-wrap: wrap; gap: 1rem;'>
+                <div>
+                    <h2 style='margin: 0 0 0.5rem 0;'>👤 Votre Profil Académique</h2>
+                    <p style='color: #cbd5e1; margin: 0;'>Informations personnelles et statistiques</p>
+                </div>
+                <span class='licence-badge'>Licence • {student['stream']}</span>
+            </div>
+            <div class='responsive-grid'>
+                <div class='metric-card'>
+                    <h4 style='color: #94a3b8; margin-bottom: 0.5rem;'>Nom Complet</h4>
+                    <p style='font-size: clamp(1rem, 2.2vw, 1.2rem); font-weight: bold; margin: 0; color: #f1f5f9;'>
+                        {student['last_name'].upper()} {student['first_name']}
+                    </p>
+                </div>
+                <div class='metric-card'>
+                    <h4 style='color: #94a3b8; margin-bottom: 0.5rem;'>Matricule</h4>
+                    <p style='font-size: clamp(1.2rem, 2.8vw, 1.4rem); font-weight: bold; margin: 0; color: #3B82F6;'>
+                        {student['id']}
+                    </p>
+                    <small style='color: #64748b;'>Identifiant unique</small>
+                </div>
+                <div class='metric-card'>
+                    <h4 style='color: #94a3b8; margin-bottom: 0.5rem;'>Filière</h4>
+                    <p style='font-size: clamp(1rem, 2.2vw, 1.2rem); font-weight: bold; margin: 0; color: #10B981;'>
+                        {student['stream']}
+                    </p>
+                </div>
+                <div class='metric-card'>
+                    <h4 style='color: #94a3b8; margin-bottom: 0.5rem;'>Niveau</h4>
+                    <p style='font-size: clamp(1rem, 2.2vw, 1.2rem); font-weight: bold; margin: 0; color: #8B5CF6;'>
+                        Licence
+                    </p>
+                    <small style='color: #64748b;'>Cycle académique</small>
+                </div>
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+
+        # STATISTIQUES
+        with st.spinner("Chargement de vos statistiques..."):
+            stats = get_student_stats(student['id'])
+
+            if stats:
+                # KPI CARDS
+                cols = st.columns(4)
+                kpis = [
+                    (f"{stats['attendance_percentage']}%", "Taux de Présence", "#3B82F6"),
+                    (stats['total_sessions'], "Séances Total", "#60A5FA"),
+                    (stats['present_count'], "Présences", "#10B981"),
+                    (stats['absent_count'], "Absences", "#EF4444")
+                ]
+
+                for idx, (value, title, color) in enumerate(kpis):
+                    with cols[idx]:
+                        progress_html = f'<progress value="{stats["attendance_percentage"]}" max="100" style="width: 100%; height: 8px; margin-top: 0.5rem;"></progress>' if idx == 0 else ''
+                        st.markdown(f"""
+                        <div class='metric-card animate-fade-in'>
+                            <h4 style='color: #cbd5e1; margin-bottom: 0.5rem;'>{title}</h4>
+                            <div class='highlight-stat' style='color: {color};'>{value}</div>
+                            {progress_html}
+                        </div>
+                        """, unsafe_allow_html=True)
+
+                # DÉTAIL PAR MATIÈRE
+                if stats['courses_stats']:
+                    st.markdown("### 📚 Détail par matière")
+
+                    courses_df = []
+                    for course_name, course_stats in stats['courses_stats'].items():
+                        course_percentage = (course_stats['present'] / course_stats['total'] * 100) if course_stats['total'] > 0 else 0
+                        courses_df.append({
+                            'Matière': course_name,
+                            'Séances': course_stats['total'],
+                            'Présences': course_stats['present'],
+                            'Taux': f"{round(course_percentage, 1)}%"
+                        })
+
+                    courses_data = pd.DataFrame(courses_df)
+
+                    tab1, tab2 = st.tabs(["📈 Graphique", "📋 Tableau"])
+
+                    with tab1:
+                        import altair as alt  # chargé seulement quand un profil étudiant est affiché
+
+                        chart_data = pd.DataFrame(courses_df)
+                        chart_data['Taux_num'] = chart_data['Taux'].str.replace('%', '').astype(float)
+
+                        chart = alt.Chart(chart_data).mark_bar().encode(
+                            x=alt.X('Matière', sort='-y', title='Matière'),
+                            y=alt.Y('Taux_num', title='Taux de présence (%)'),
+                            color=alt.Color('Taux_num', scale=alt.Scale(scheme='blues')),
+                            tooltip=['Matière', 'Taux', 'Séances', 'Présences']
+                        ).properties(height=300)
+
+                        st.altair_chart(chart, use_container_width=True)
+
+                    with tab2:
+                        st.dataframe(
+                            courses_data.sort_values('Taux', ascending=False),
+                            column_config={
+                                "Taux": st.column_config.ProgressColumn(
+                                    "Taux",
+                                    format="%s",
+                                    min_value=0,
+                                    max_value=100
+                                )
+                            },
+                            use_container_width=True,
+                            hide_index=True
+                        )
+
+                # ACTIONS
+                st.caption(f"🔄 Dernière mise à jour: {stats['last_updated']}")
+
+                col_reset1, col_reset2, col_reset3 = st.columns([1, 2, 1])
+                with col_reset2:
+                    if st.button("🔁 Nouvelle recherche", type="secondary", use_container_width=True):
+                        del st.session_state['selected_student']
+                        st.rerun(scope="fragment")
+
+            else:
+                st.info("📊 Aucune donnée de présence disponible pour le moment.")
+
+
+if 'show_login' not in st.session_state:
+    st.session_state['show_login'] = False
+
+if not st.session_state['show_login']:
+    # BARRE DE NAVIGATION
+    st.markdown("""
+    <div class="nav-bar animate-fade-in">
+        <div class="nav-title">
+            <div class="nav-logo">🎓</div>
+            <span style="font-weight: bold; color: #f1f5f9; font-size: clamp(0.95rem, 2vw, 1.1rem);">
+                Portail Académique EPL
+            </span>
+        </div>
+        <div class="nav-actions">
+    """, unsafe_allow_html=True)
+    
+    # Bouton d'accès admin
+    if st.button("🔐 Accès Staff", key="nav_admin_access", type="secondary"):
+        st.session_state['show_login'] = True
+        st.rerun()
+    
+    st.markdown("</div></div>", unsafe_allow_html=True)
+    
+    # CONTENU PRINCIPAL
+    st.markdown('<div class="main-container">', unsafe_allow_html=True)
+    
+    # EN-TÊTE
+    st.markdown("""
+        <div class='main-header animate-fade-in'>
+            <h1 style='margin: 0;'>Suivi Académique en Temps Réel</h1>
+            <p style='color: rgba(255,255,255,0.9); font-size: clamp(0.95rem, 2.2vw, 1.1rem); margin-top: 0.5rem;'>
+                Université de Lomé • École Polytechnique
+            </p>
+            <div style='margin-top: 1rem;'>
+                <span class='licence-badge animate-pulse'>Programme Licence</span>
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    # SECTION RECHERCHE
+    st.markdown("""
+    <div class='search-box animate-fade-in'>
+        <h2 style='color: #f1f5f9; margin-bottom: 1rem;'>🔍 Vérifiez vos présences</h2>
+        <p style='color: #cbd5e1;'>Recherchez votre profil avec votre ID, nom ou prénom</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    search_panel()
+    
+    # SECTION INFORMATIVE
+    st.markdown("---")
+    st.markdown("### 💡 Fonctionnalités du Portail")
+    
+    cols_info = st.columns(3)
+    features = [
+        ("🚀", "Performance en Direct", "Taux de présence mis à jour après chaque appel enregistré par le staff.", "#3B82F6"),
+        ("📈", "Statistiques Détaillées", "Visualisez vos progrès par matière", "#10B981"),
+        ("🔄", "Traçabilité Complète", "Visualisez l'historique précis de toutes vos sessions et sessions corrigées.", "#10B981")
+    ]
+    
+    for idx, (icon, title, desc, color) in enumerate(features):
+        with cols_info[idx]:
+            st.markdown(f"""
+            <div class='home-card animate-fade-in'>
+                <div style='color: {color}; font-size: 2rem; margin-bottom: 1rem;'>{icon}</div>
+                <h4 style='color: {color};'>{title}</h4>
+                <p>{desc}</p>
+            </div>
+            """, unsafe_allow_html=True)
+    
+    # FOOTER
+    st.markdown("---")
+    col_footer1, col_footer2, col_footer3 = st.columns([1, 2, 1])
+    with col_footer2:
+        st.markdown(f"""
+        <div style='text-align: center; padding: 1.5rem 0;'>
+            <div class='logo-frame-small' style='margin: 0 auto 1rem auto;'>
+                <img src="{LOGO_URL}" alt="Logo EPL">
+            </div>
+            <p style='color: #94a3b8; font-size: 0.85rem; margin: 0; line-height: 1.5;'>
+                © 2025 École Polytechnique de Lomé<br>
+                <span style='font-size: 0.8rem; color: #64748b;'>Portail Académique v2.0 • created by OB</span>
+            </p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    st.markdown('</div>', unsafe_allow_html=True)
+
+else:
+    # ============ PAGE DE CONNEXION ============
+    st.markdown("<div style='height: 30px'></div>", unsafe_allow_html=True)
+    col1, col2, col3 = st.columns([1, 2, 1])
+    
+    with col2:
+        # Logo
+        st.markdown(f"""
+        <div class='logo-frame-login animate-fade-in'>
+            <div class='logo-corner logo-corner-tl'></div>
+            <div class='logo-corner logo-corner-tr'></div>
+            <div class='logo-corner logo-corner-bl'></div>
+            <div class='logo-corner logo-corner-br'></div>
+            <img src="{LOGO_URL}" alt="Logo EPL">
+        </div>
+        """, unsafe_allow_html=True)
+        
+        st.markdown("<h2 style='text-align: center; margin-bottom: 1.5rem;'>Accès Administration</h2>", unsafe_allow_html=True)
+        
+        # Carte de connexion
+        with st.container():
+            
+            
+            login_id = st.text_input("Identifiant", key="login_identifier",
+                                     placeholder="ADMIN, PROF ou votre filière (LT, GC...)")
+            pwd = st.text_input("Mot de passe", type="password", key="login_password", 
+                               placeholder="Entrez le mot de passe d'accès")
+            
+            col_btn1, col_btn2, col_btn3 = st.columns([1, 2, 1])
+            with col_btn2:
+                if st.button("🔐 Se connecter", use_container_width=True, type="primary"):
+                    if login(login_id, pwd):
+                        st.success("✅ Connexion réussie !")
+                        time.sleep(0.5)
+                        st.rerun()
+                    else:
+                        st.error("❌ Accès refusé. Vérifiez vos identifiants.")
+            
+            st.markdown("</div>", unsafe_allow_html=True)
+        
+        # Bouton retour
+        if st.button("← Retour à l'accueil", type="secondary", use_container_width=True):
+            st.session_state['show_login'] = False
+            if 'selected_student' in st.session_state:
+                del st.session_state['selected_student']
+            st.rerun()
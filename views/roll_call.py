@@ -0,0 +1,119 @@
+"""Faire l'appel : feuille de présence d'un cours, en une grille."""
+import time
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from epl import backend
+from epl.services import get_courses, get_students, save_attendance
+from views.common import admin_header, traced_fragment
+
+
+# Feuille de présence : cocher une case, filtrer ou marquer tout le monde ne réexécute que ce fragment
+@traced_fragment
+def attendance_sheet(chosen_date):
+    ctx = st.session_state['attendance_context']
+    st.divider()
+    st.subheader(f"Appel : {ctx['course_name']} ({len(ctx['students'])} étudiants)")
+    
+    # Grille unique (un seul widget quel que soit l'effectif) : les présents sont gardés dans
+    # un ensemble d'IDs ; la grille ne montre que les étudiants qui passent le filtre
+    def restart_roll_call_grid(mark=None):
+        """Repart d'une grille vierge à partir des présents actuels ; `mark` (True/False) s'applique aux lignes filtrées."""
+        present = set(st.session_state['roll_call_present'])
+        if mark is not None:
+            visible = {s['id'] for s in backend.filter_roster(ctx['students'], st.session_state.get('roll_call_filter', ''))}
+            present = present | visible if mark else present - visible
+        st.session_state['roll_call_base'] = present
+        st.session_state['roll_call_present'] = set(present)
+        st.session_state['roll_call_version'] += 1
+    
+    col_filter, col_all_present, col_all_absent = st.columns([2, 1, 1])
+    col_filter.text_input("🔎 Filtrer (nom, prénom ou matricule)", key="roll_call_filter",
+                          on_change=restart_roll_call_grid)
+    col_all_present.button("✅ Tous présents", key="roll_call_all_present", on_click=restart_roll_call_grid,
+                           args=(True,), use_container_width=True)
+    col_all_absent.button("❌ Tous absents", key="roll_call_all_absent", on_click=restart_roll_call_grid,
+                          args=(False,), use_container_width=True)
+    
+    visible = backend.filter_roster(ctx['students'], st.session_state.get('roll_call_filter', ''))
+    base = st.session_state['roll_call_base']
+    grid = pd.DataFrame({
+        "ID": [s['id'] for s in visible],
+        "Étudiant": [f"{s['last_name']} {s['first_name']}" for s in visible],
+        "Présent": [s['id'] in base for s in visible],
+    })
+    edited = st.data_editor(
+        grid,
+        column_config={
+            "ID": st.column_config.TextColumn("Matricule", disabled=True),
+            "Étudiant": st.column_config.TextColumn(disabled=True),
+            "Présent": st.column_config.CheckboxColumn("Présent", help="Décocher si absent"),
+        },
+        hide_index=True,
+        use_container_width=True,
+        height=min(600, 38 + 35 * max(len(grid), 1)),
+        key=f"roll_call_grid_{st.session_state['roll_call_version']}"
+    )
+    visible_ids = set(grid["ID"])
+    present_ids = (base - visible_ids) | set(edited.loc[edited["Présent"], "ID"])
+    st.session_state['roll_call_present'] = present_ids
+    st.caption(f"✅ {len(present_ids)} présent(s) · ❌ {len(ctx['students']) - len(present_ids)} absent(s)"
+               + (f" · {len(visible)} affiché(s) sur {len(ctx['students'])}" if len(visible) != len(ctx['students']) else ""))
+    
+    st.markdown("---")
+    col_submit1, col_submit2, col_submit3 = st.columns([1, 2, 1])
+    with col_submit2:
+        submitted = st.button("✅ Enregistrer l'appel", use_container_width=True, type="primary", key="submit_roll_call")
+    
+    if submitted:
+        with st.spinner("Enregistrement en cours..."):
+            success = save_attendance(
+                ctx['course_id'], 
+                chosen_date, 
+                ctx['stream'],
+                present_ids, 
+                ctx['students']
+            )
+            
+            if success:
+                st.balloons()
+                st.success("✅ Appel enregistré ! Il sera synchronisé avec la base dans quelques instants.")
+                del st.session_state['attendance_context']
+                time.sleep(1.5)
+                st.rerun()
+
+admin_header("Nouvelle Feuille de Présence", "📝")
+
+if st.session_state['user_role'] == 'DELEGATE':
+    target_stream = st.session_state['user_scope']
+    st.info(f"📍 **Filière assignée :** `{target_stream}`")
+else:
+    target_stream = st.selectbox("Sélectionner la filière", ["LT", "GC", "IABD", "IS", "GE", "GM"], key="stream_select")
+
+c1, c2 = st.columns(2)
+courses = get_courses(target_stream)
+
+if not courses:
+    st.warning("⚠️ Aucun cours trouvé pour cette filière.")
+else:
+    course_map = {c['name']: c['id'] for c in courses}
+    chosen_course = c1.selectbox("Matière", list(course_map.keys()), key="course_select")
+    chosen_date = c2.date_input("Date du cours", datetime.now(), key="date_select")
+    
+    if st.button("📋 Charger la liste des étudiants", type="primary", key="load_students"):
+        st.session_state['attendance_context'] = {
+            'students': get_students(target_stream),
+            'course_id': course_map[chosen_course],
+            'course_name': chosen_course,
+            'stream': target_stream
+        }
+        students = st.session_state['attendance_context']['students']
+        st.session_state['roll_call_base'] = {s['id'] for s in students}
+        st.session_state['roll_call_present'] = set(st.session_state['roll_call_base'])
+        st.session_state['roll_call_version'] = st.session_state.get('roll_call_version', 0) + 1
+        st.session_state['roll_call_filter'] = ""
+
+if 'attendance_context' in st.session_state:
+    attendance_sheet(chosen_date)
@@ -0,0 +1,650 @@
+"""Super Admin : gestion des étudiants, exports, maintenance et journal d'activité."""
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from epl import auth, backend
+from epl.services import (
+    DATA_BACKEND, cache_stats, count_attendance_estimate, export_attendance, get_all_courses_export,
+    get_all_students_export, get_database_statistics, get_delegate_activity_log, get_search_index,
+    get_verified_sessions, init_http_client, init_metrics_exporter, invalidate_student, metrics, outbox,
+    purge_caches, render_metrics, repo,
+)
+from views.common import admin_header, traced_fragment
+
+
+admin_header("Super Admin & Outils Avancés", "🛡️")
+tab_etudiant, tab_export, tab_autres, tab_activite = st.tabs([
+"👨‍🎓 Gestion des Étudiants", 
+"📥 Exporter les Données", 
+"⚙️ Maintenance", 
+"⏳ Journal d'Activité" # Le nouvel onglet
+])
+# =========================================================
+# 1.1. Onglet Gestion des Étudiants
+# =========================================================
+@traced_fragment
+def student_management_tab():
+    st.subheader("👤 Ajouter un Nouvel Étudiant")
+    st.info("Utilisez les filières existantes (LT, GC, IABD, IS, GE, GM). L'ID doit être unique.")
+    
+    # Formulaire d'ajout
+    with st.form("add_student_form", clear_on_submit=True):
+        col_id, col_filiere = st.columns(2)
+        new_id = col_id.text_input("Matricule (ID Unique)*", placeholder="Ex: LF-LT-019", help="Doit être unique")
+        new_stream = col_filiere.selectbox("Filière*", ["LT", "GC", "IABD", "IS", "GE", "GM"])
+        
+        col_nom, col_prenom = st.columns(2)
+        new_last_name = col_nom.text_input("Nom de Famille*").upper()
+        new_first_name = col_prenom.text_input("Prénom*")
+        
+        # Champs optionnels
+        col_phone, col_email = st.columns(2)
+        new_phone = col_phone.text_input("📞 Téléphone (Optionnel)")
+        new_email = col_email.text_input("📧 Email (Optionnel)")
+        
+        col_submit1, col_submit2 = st.columns([1, 2])
+        with col_submit2:
+            submitted = st.form_submit_button("➕ Enregistrer l'étudiant", type="primary", use_container_width=True)
+        
+        if submitted:
+            if new_id and new_last_name and new_first_name and new_stream:
+                # Vérifier si l'ID existe déjà
+                existing_student = repo.find_students_by_id(new_id)
+                
+                if existing_student:
+                    st.error(f"❌ L'ID '{new_id}' existe déjà. Veuillez en choisir un autre.")
+                else:
+                    try:
+                        # Préparer les données
+                        student_data = {
+                            "id": new_id,
+                            "last_name": new_last_name,
+                            "first_name": new_first_name,
+                            "stream": new_stream
+                        }
+                        
+                        # Ajouter les champs optionnels s'ils sont remplis
+                        if new_phone:
+                            student_data["phone"] = new_phone
+                        if new_email:
+                            student_data["email"] = new_email
+                        
+                        # Insertion dans Supabase
+                        inserted = repo.insert_student(student_data)
+                        
+                        if inserted:
+                            get_search_index().upsert(inserted[0])
+                            st.success(f"✅ Étudiant {new_last_name} {new_first_name} ajouté avec succès !")
+                            st.balloons()
+                            # Invalider uniquement ce qui concerne cet étudiant pour qu'il apparaisse dans l'appel
+                            invalidate_student(new_id, new_stream)
+                            time.sleep(2)
+                            st.rerun()
+                        else:
+                            st.error("❌ Erreur lors de l'ajout de l'étudiant.")
+                            
+                    except Exception as e:
+                        st.error(f"❌ Erreur technique : {str(e)}")
+            else:
+                st.warning("⚠️ Veuillez remplir tous les champs obligatoires (*).")
+    
+    st.divider()
+    
+    # Rechercher et modifier un étudiant
+    st.subheader("🔍 Rechercher et Modifier un Étudiant")
+    
+    col_search, col_action = st.columns([3, 1])
+    with col_search:
+        search_term = st.text_input("Rechercher par ID, nom ou prénom", 
+                                   placeholder="Entrez un ID, nom ou prénom...",
+                                   key="student_search")
+    
+    if search_term:
+        try:
+            # Recherche dans l'index en mémoire (pas d'aller-retour à chaque frappe)
+            search_results = get_search_index().search(search_term, limit=10)
+            
+            if search_results:
+                students_df = pd.DataFrame(search_results)
+                
+                st.markdown(f"**📋 {len(search_results)} résultat(s) trouvé(s)**")
+                
+                # Afficher les résultats dans un data editor
+                edited_df = st.data_editor(
+                    students_df[['id', 'last_name', 'first_name', 'stream', 'phone', 'email']],
+                    column_config={
+                        "id": st.column_config.TextColumn("Matricule", disabled=True),
+                        "last_name": st.column_config.TextColumn("Nom"),
+                        "first_name": st.column_config.TextColumn("Prénom"),
+                        "stream": st.column_config.SelectboxColumn(
+                            "Filière",
+                            options=["LT", "GC", "IABD", "IS", "GE", "GM"]
+                        ),
+                        "phone": st.column_config.TextColumn("Téléphone"),
+                        "email": st.column_config.TextColumn("Email")
+                    },
+                    use_container_width=True,
+                    hide_index=True,
+                    num_rows="dynamic",
+                    key="student_editor"
+                )
+                
+                if st.button("💾 Enregistrer les modifications", type="primary", use_container_width=True):
+                    try:
+                        # Seules les lignes modifiées par rapport aux résultats affichés, en un seul upsert
+                        changed = backend.changed_rows(
+                            search_results, edited_df.to_dict('records'),
+                            columns=('last_name', 'first_name', 'stream', 'phone', 'email')
+                        )
+                        if changed:
+                            repo.upsert_students(changed)
+                            previous_streams = {row['id']: row.get('stream') for row in search_results}
+                            for student in changed:  # lignes partielles : complétées par l'index
+                                get_search_index().upsert(student)
+                                invalidate_student(student['id'], previous_streams.get(student['id']), student.get('stream'))
+                        
+                        st.success(f"✅ {len(changed)} étudiant(s) mis à jour avec succès !")
+                        time.sleep(1)
+                        st.rerun()
+                        
+                    except Exception as e:
+                        st.error(f"❌ Erreur lors de la mise à jour : {str(e)}")
+                        
+            else:
+                st.info("ℹ️ Aucun étudiant trouvé avec ce critère de recherche.")
+                
+        except Exception as e:
+            st.error(f"❌ Erreur de recherche : {str(e)}")
+
+# =========================================================
+# 1.2. Onglet Exporter les Données
+# =========================================================
+def read_export(export):
+    """Contenu du fichier d'export, lu au clic ; le fichier est ensuite marqué pour suppression."""
+    with open(export['path'], 'rb') as f:
+        data = f.read()
+    export['downloaded'] = True
+    return data
+
+@traced_fragment
+def export_tab():
+    st.subheader("📊 Téléchargement des Enregistrements")
+    st.info("Exportez les données brutes pour l'analyse ou l'archivage.")
+    
+    # Options d'export
+    export_type = st.radio(
+        "Type d'exportation :",
+        ["📋 Toutes les présences", "👨‍🎓 Liste des étudiants", "📚 Liste des cours"],
+        horizontal=True
+    )
+    
+    current_time = datetime.now().strftime("%Y%m%d_%H%M")
+
+    # Exécuter l'export selon le type sélectionné
+    if export_type == "📋 Toutes les présences":
+        # Export en flux : le fichier est écrit page par page sur disque, à la demande
+        export_format = st.radio("Format :", ["CSV", "JSON", "Parquet"], horizontal=True, key="attendance_export_format")
+        fmt = export_format.lower()
+        estimated_rows = count_attendance_estimate()
+        st.caption(f"≈ {estimated_rows} enregistrements de présence (estimation)")
+
+        if st.button("⚙️ Préparer l'export des présences", type="primary", key="prepare_attendance_export"):
+            # Supprimer le fichier de l'export précédent
+            previous_export = st.session_state.pop('attendance_export', None)
+            if previous_export and os.path.exists(previous_export['path']):
+                os.remove(previous_export['path'])
+
+            fd, export_path = tempfile.mkstemp(prefix="EPL_presences_", suffix=f".{fmt}")
+            os.close(fd)
+            progress_bar = st.progress(0.0, text="Export en cours...")
+
+            def update_export_progress(written):
+                ratio = min(written / estimated_rows, 1.0) if estimated_rows else 0.0
+                progress_bar.progress(ratio, text=f"{written} enregistrements exportés...")
+
+            try:
+                rows_written, preview = export_attendance(export_path, fmt, on_progress=update_export_progress)
+                progress_bar.progress(1.0, text=f"✅ {rows_written} enregistrements exportés")
+                st.session_state['attendance_export'] = {
+                    'path': export_path,
+                    'format': fmt,
+                    'rows': rows_written,
+                    'preview': preview
+                }
+            except Exception as e:
+                os.remove(export_path)
+                st.error(f"Erreur d'exportation: {e}")
+
+        # Le fichier déjà téléchargé est supprimé à l'exécution suivante
+        attendance_export = st.session_state.get('attendance_export')
+        if attendance_export and attendance_export.get('downloaded'):
+            if os.path.exists(attendance_export['path']):
+                os.remove(attendance_export['path'])
+            del st.session_state['attendance_export']
+            attendance_export = None
+            st.caption("✅ Export téléchargé ; préparez-en un nouveau si besoin.")
+        if attendance_export and os.path.exists(attendance_export['path']):
+            if attendance_export['rows'] == 0:
+                st.warning("📭 Aucune donnée de presences à exporter.")
+            else:
+                st.markdown(f"**Aperçu des {attendance_export['rows']} enregistrements :**")
+                st.dataframe(attendance_export['preview'], hide_index=True)
+
+                export_fmt = attendance_export['format']
+                col_dl1, col_dl2, col_dl3 = st.columns([1, 2, 1])
+                with col_dl2:
+                    # Le fichier n'est lu qu'au clic, pas à chaque rerun
+                    st.download_button(
+                        label=f"⬇️ Télécharger ({attendance_export['rows']} enregistrements)",
+                        data=lambda: read_export(attendance_export),
+                        file_name=f'EPL_presences_export_{current_time}.{export_fmt}',
+                        mime=backend.EXPORT_MIME_TYPES[export_fmt],
+                        on_click="ignore",
+                        use_container_width=True,
+                        type="primary",
+                        key="download_presences"
+                    )
+    else:
+        if export_type == "👨‍🎓 Liste des étudiants":
+            df_export = get_all_students_export()
+            export_name = "etudiants"
+        else:  # Liste des cours
+            df_export = get_all_courses_export()
+            export_name = "cours"
+
+        if df_export.empty:
+            st.warning(f"📭 Aucune donnée de {export_name} à exporter.")
+        else:
+            st.markdown(f"**Aperçu des {len(df_export)} enregistrements :**")
+            st.dataframe(df_export.head(), hide_index=True)
+            
+            # Préparer le fichier CSV
+            csv_data = df_export.to_csv(index=False, encoding='utf-8-sig')
+            
+            # Bouton de téléchargement
+            col_dl1, col_dl2, col_dl3 = st.columns([1, 2, 1])
+            with col_dl2:
+                st.download_button(
+                    label=f"⬇️ Télécharger ({len(df_export)} enregistrements)",
+                    data=csv_data,
+                    file_name=f'EPL_{export_name}_export_{current_time}.csv',
+                    mime='text/csv',
+                    use_container_width=True,
+                    type="primary",
+                    key=f"download_{export_name}"
+                )
+            
+            # Option d'export JSON
+            if st.checkbox("Exporter également en format JSON"):
+                json_data = df_export.to_json(orient='records', force_ascii=False, indent=2)
+                
+                st.download_button(
+                    label="⬇️ Télécharger en JSON",
+                    data=json_data,
+                    file_name=f'EPL_{export_name}_export_{current_time}.json',
+                    mime='application/json',
+                    use_container_width=True,
+                    type="secondary"
+                )
+
+            # Option d'export Parquet (colonnaire, compressé)
+            if st.checkbox("Exporter également en format Parquet"):
+                st.download_button(
+                    label="⬇️ Télécharger en Parquet",
+                    data=backend.dataframe_to_parquet(df_export),
+                    file_name=f'EPL_{export_name}_export_{current_time}.parquet',
+                    mime=backend.EXPORT_MIME_TYPES['parquet'],
+                    use_container_width=True,
+                    type="secondary"
+                )
+
+   # =========================================================
+# 1.3. Onglet Maintenance
+# =========================================================
+@traced_fragment
+def maintenance_tab():
+    st.subheader("⚙️ Outils de Maintenance")
+
+    col_maint1, col_maint2 = st.columns(2)
+
+# -----------------------------------------------------
+# COLONNE 1 : Caches & Statistiques BD
+# -----------------------------------------------------
+    with col_maint1:
+        st.markdown("#### 🔄 Gestion des Caches")
+        if st.button("🗑️ Purger tous les caches", 
+                     help="Force le rechargement de toutes les données depuis la base",
+                     use_container_width=True,
+                     type="secondary"):
+            purge_caches()
+        
+            st.success("✅ Caches purgés. Les prochaines requêtes rechargeront les données.")
+            time.sleep(1)
+            st.rerun()
+
+        # Effet des invalidations ciblées : succès / échecs par fonction depuis le démarrage
+        caches = cache_stats()
+        if caches:
+            with st.expander("📈 Succès / échecs du cache"):
+                df_cache = pd.DataFrame([
+                    {
+                        "Fonction": name,
+                        "Succès": counter['hits'],
+                        "Échecs": counter['misses'],
+                        "Taux de succès": counter['hits'] / max(1, counter['hits'] + counter['misses']),
+                        "Invalidés": counter['invalidated'],
+                        "En cache": counter['entries'],
+                    }
+                    for name, counter in caches.items()
+                ])
+                st.dataframe(
+                    df_cache,
+                    column_config={"Taux de succès": st.column_config.ProgressColumn(format="percent", min_value=0, max_value=1)},
+                    hide_index=True,
+                    use_container_width=True
+                )
+        
+        st.markdown("---")
+
+        # Temps passé par fonction du chemin critique, avec le cache de la fonction load_* correspondante
+        st.markdown("#### ⏱️ Mesures des fonctions")
+        function_stats = metrics.snapshot()
+        if not function_stats:
+            st.caption("Aucune mesure depuis le démarrage.")
+        else:
+            df_metrics = pd.DataFrame([
+                {
+                    "Fonction": name,
+                    "Appels": f['calls'],
+                    "Exceptions": f['errors'],
+                    "p50 (ms)": f['p50'] * 1000,
+                    "p95 (ms)": f['p95'] * 1000,
+                    "Max (ms)": f['max'] * 1000,
+                    "Total (s)": f['sum'],
+                    "Succès cache": caches.get(name.replace('get_', 'load_', 1), {}).get('hits'),
+                    "Échecs cache": caches.get(name.replace('get_', 'load_', 1), {}).get('misses'),
+                }
+                for name, f in function_stats.items()
+            ])
+            st.dataframe(
+                df_metrics,
+                column_config={
+                    **{c: st.column_config.NumberColumn(format="%.1f") for c in ["p50 (ms)", "p95 (ms)", "Max (ms)"]},
+                    "Total (s)": st.column_config.NumberColumn(format="%.2f"),
+                },
+                hide_index=True,
+                use_container_width=True
+            )
+        col_m1, col_m2 = st.columns(2)
+        col_m1.download_button(
+            "📥 Format Prometheus", data=render_metrics, file_name="epl_metrics.prom",
+            mime="text/plain; version=0.0.4", use_container_width=True, key="download_metrics"
+        )
+        if col_m2.button("♻️ Remettre à zéro", key="reset_metrics", use_container_width=True):
+            metrics.reset()
+            st.rerun(scope="fragment")
+        metrics_exporter = init_metrics_exporter()
+        if metrics_exporter is not None:
+            st.caption(f"Écrit toutes les {metrics_exporter.interval:.0f} s dans `{metrics_exporter.path}`"
+                       + (f" · ⚠️ {metrics_exporter.last_error}" if metrics_exporter.last_error else ""))
+
+        st.markdown("---")
+    
+        st.markdown("#### 📊 Statistiques Base de Données")
+        try:
+            # Estimations du planificateur et tailles, en une seule requête mise en cache
+            db_stats = get_database_statistics(8)
+            table_stats = {row['table']: row for row in db_stats['tables']}
+            weekly = pd.DataFrame(db_stats['weekly'], columns=['week', 'sessions', 'attendance'])
+            this_week, last_week = backend.weekly_growth(db_stats['weekly'])
+        
+            st.metric("👨‍🎓 Étudiants", table_stats.get('students', {}).get('estimated_rows', 0))
+            st.metric("📋 Enregistrements de présence", table_stats.get('attendance', {}).get('estimated_rows', 0),
+                      delta=f"+{this_week['attendance']} cette semaine (semaine précédente : +{last_week['attendance']})",
+                      delta_color="normal" if this_week['attendance'] else "off")
+            st.metric("📅 Sessions de cours", table_stats.get('sessions', {}).get('estimated_rows', 0),
+                      delta=f"+{this_week['sessions']} cette semaine (semaine précédente : +{last_week['sessions']})",
+                      delta_color="normal" if this_week['sessions'] else "off")
+            st.caption(f"Estimations · mises à jour le {db_stats['generated_at'].strftime('%d/%m/%Y à %H:%M')}")
+        
+            with st.expander("💾 Tailles et croissance hebdomadaire"):
+                df_sizes = pd.DataFrame(db_stats['tables'], columns=['table', 'estimated_rows', 'total_bytes'])
+                # Taille inconnue (None, SQLite sans dbstat) : cellule vide plutôt qu'une erreur
+                df_sizes['total_bytes'] = pd.to_numeric(df_sizes['total_bytes'], errors='coerce') / 1024 ** 2
+                st.dataframe(
+                    df_sizes.rename(columns={'table': 'Table', 'estimated_rows': 'Lignes (est.)', 'total_bytes': 'Taille (Mo)'}),
+                    column_config={"Taille (Mo)": st.column_config.NumberColumn(format="%.2f")},
+                    hide_index=True,
+                    use_container_width=True
+                )
+                if not weekly.empty:
+                    st.bar_chart(weekly.set_index('week')[['attendance']].rename(columns={'attendance': 'Présences / semaine'}))
+        
+        except Exception as e:
+            st.error(f"❌ Erreur de statistiques: {str(e)}")
+
+        st.markdown("---")
+
+        st.markdown("#### 📤 File d'attente des appels")
+        queue_stats = outbox.stats()
+        col_q1, col_q2, col_q3 = st.columns(3)
+        col_q1.metric("Appels en attente", queue_stats['depth'],
+                      help="Appels soumis par les délégués, pas encore écrits en base")
+        col_q2.metric("Appels en échec", queue_stats['failed'],
+                      help=f"Appels refusés {outbox.max_attempts} fois : ils ne sont plus retentés automatiquement")
+        col_q3.metric("Latence d'écriture (p95)",
+                      f"{queue_stats['flush_p95']:.1f} s" if queue_stats['flush_p95'] is not None else "—",
+                      help=f"Délai entre la soumission et l'écriture en base ({queue_stats['flushed']} derniers appels)")
+        if queue_stats['oldest_age'] is not None:
+            st.caption(f"Plus ancien appel en attente : {queue_stats['oldest_age']:.0f} s · "
+                       f"{queue_stats['failing']} en reprise après échec")
+        if not queue_stats['running']:
+            st.warning("⚠️ Le thread d'écriture n'est pas actif.")
+        if queue_stats['failed']:
+            st.error(f"❌ {queue_stats['failed']} appel(s) en échec, non écrit(s) en base. "
+                     f"Dernière erreur : {queue_stats['last_error']}")
+            if st.button("🔁 Relancer les appels en échec", key="retry_failed_roll_calls"):
+                outbox.retry_failed()
+                st.rerun(scope="fragment")
+        elif queue_stats['failing']:
+            st.warning(f"Dernière erreur : {queue_stats['last_error']}")
+        if queue_stats['failing'] or queue_stats['failed']:
+            with st.expander("Voir les appels en attente ou en échec"):
+                df_pending = pd.DataFrame(outbox.pending())
+                df_pending['enqueued_at'] = pd.to_datetime(df_pending['enqueued_at'], unit='s', utc=True)
+                df_pending['next_attempt_at'] = pd.to_datetime(df_pending['next_attempt_at'], unit='s', utc=True)
+                st.dataframe(df_pending, hide_index=True, use_container_width=True)
+        
+        if DATA_BACKEND == "supabase":
+            st.markdown("---")
+            st.markdown("#### 🌐 Connexion Supabase (HTTP)")
+            transport = init_http_client()[1]
+            pool = transport.pool_status()
+            endpoint_stats = transport.stats.snapshot()
+            col_h1, col_h2, col_h3 = st.columns(3)
+            col_h1.metric("Connexions ouvertes", pool['open'], help=f"dont {pool['idle']} inactive(s), réutilisables")
+            col_h2.metric("Requêtes", sum(e['requests'] for e in endpoint_stats.values()))
+            col_h3.metric("Reprises", sum(e['retries'] for e in endpoint_stats.values()),
+                          help="Lectures rejouées après une erreur réseau, un délai dépassé ou une réponse 502/503/504")
+            if endpoint_stats:
+                with st.expander("⏱️ Latence par ressource"):
+                    st.dataframe(
+                        pd.DataFrame([
+                            {
+                                "Ressource": name,
+                                "Requêtes": e['requests'],
+                                "Erreurs": e['errors'],
+                                "Reprises": e['retries'],
+                                "p50 (ms)": e['p50'] * 1000,
+                                "p95 (ms)": e['p95'] * 1000,
+                                "Max (ms)": e['max'] * 1000,
+                            }
+                            for name, e in endpoint_stats.items()
+                        ]),
+                        column_config={c: st.column_config.NumberColumn(format="%.0f") for c in ["p50 (ms)", "p95 (ms)", "Max (ms)"]},
+                        hide_index=True,
+                        use_container_width=True
+                    )
+        
+# -----------------------------------------------------
+# COLONNE 2 : Gestion des Accès & Nettoyage
+# -----------------------------------------------------
+    with col_maint2:
+        st.markdown("#### 🔑 Gestion des Accès (Tous les Rôles)")
+    
+        # 1. Identifiants et rôles uniquement : les mots de passe ne sont stockés que hachés
+        try:
+            credentials = repo.list_credentials()
+        except Exception as e:
+            st.error(f"Erreur lors du chargement des identifiants: {e}")
+            credentials = []
+
+        # 2. Préparation des données pour affichage et édition
+        df_users = pd.DataFrame(
+            [{"ID/Scope": row['id'], "Rôle": row['role'], "Nouveau Mot de Passe": ""} for row in credentials],
+            columns=["ID/Scope", "Rôle", "Nouveau Mot de Passe"]
+        )
+
+        st.caption("Saisissez un nouveau mot de passe sur les lignes à modifier ; laissez vide pour conserver l'actuel. (ID/Scope : ADMIN, PROF, LT, GC, etc.)")
+    
+        edited_df = st.data_editor(
+            df_users,
+            column_config={
+                "ID/Scope": st.column_config.TextColumn(disabled=True),
+                "Rôle": st.column_config.TextColumn(disabled=True),
+                "Nouveau Mot de Passe": st.column_config.TextColumn(
+                    "Nouveau Mot de Passe", 
+                    help="Nouveau mot de passe pour cet ID/Rôle (enregistré haché)."
+                )
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+
+        # 3. Traitement de l'enregistrement
+        if st.button("💾 Enregistrer les Mots de Passe Modifiés", type="primary", use_container_width=True):
+            try:
+                # Un dictionnaire garantit l'unicité : si un ID apparaît deux fois, la dernière valeur l'emporte
+                unique_records = {} 
+            
+                for index, row in edited_df.iterrows():
+                    new_password = row['Nouveau Mot de Passe']
+                    if not isinstance(new_password, str) or not new_password.strip():
+                        continue
+                    unique_records[row['ID/Scope']] = {
+                        "id": row['ID/Scope'], # Clé primaire pour l'upsert
+                        "role": row['Rôle'], 
+                        "password_hash": auth.hash_password(new_password.strip()),
+                        "password": None
+                    }
+            
+                if unique_records:
+                    repo.upsert_credentials(list(unique_records.values()))
+                    # Les anciennes vérifications de ces identifiants ne sont plus valables
+                    for record_id in unique_records:
+                        get_verified_sessions().forget(record_id)
+                    st.success(f"✅ Mot de passe mis à jour pour : {', '.join(unique_records)}")
+                    time.sleep(1.5)
+                    st.rerun()
+                else:
+                    st.info("Aucun nouveau mot de passe saisi.")
+
+            except Exception as e:
+                # Afficher une erreur plus générique si l'erreur PostgreSQL n'est pas informative
+                st.error(f"❌ Erreur lors de la sauvegarde. Détails techniques: {e}")
+
+# =========================================================
+# 1.4. Onglet Journal d'Activité des Délégués (Traçabilité)
+# =========================================================
+@traced_fragment
+def activity_tab():
+    st.header("⏳ Journal d'Activité et Traçabilité")
+    st.info("""
+    Historique complet des sessions créées (journal de remplissage), des plus récentes aux plus anciennes,
+    par pages de 100. Le **Délégué Responsable** est identifié par sa filière d'accès.
+    """)
+    
+    # FILTRES (appliqués par la base, sur tout l'historique)
+    col_f1, col_f2 = st.columns([1, 2])
+    selected_stream = col_f1.selectbox("Filtrer par Filière (Délégué)", ['TOUTES', "LT", "GC", "IABD", "IS", "GE", "GM"],
+                                       key="activity_stream")
+    # Sans période choisie, tout l'historique (chargé par pages de 100)
+    period = col_f2.date_input("Période de remplissage", (), key="activity_period", format="DD/MM/YYYY")
+    
+    stream_filter = None if selected_stream == 'TOUTES' else selected_stream
+    created_from = created_to = None
+    if period:
+        # Jours de l'heure locale affichée dans le journal, pas de minuit UTC
+        created_from, created_to = backend.local_day_bounds(period[0], period[1] if len(period) == 2 else None)
+        if len(period) == 2:
+            st.caption(f"Période affichée : du {period[0]:%d/%m/%Y} au {period[1]:%d/%m/%Y} inclus (heure locale).")
+        else:
+            st.caption(f"Période affichée : depuis le {period[0]:%d/%m/%Y} (heure locale).")
+    else:
+        st.caption("Période affichée : tout l'historique. Choisissez une période pour la restreindre.")
+    
+    # Pages déjà chargées pour ces filtres (curseurs keyset) ; un changement de filtre repart de la première
+    filters = (stream_filter, created_from, created_to)
+    if st.session_state.get('activity_filters') != filters:
+        st.session_state['activity_filters'] = filters
+        st.session_state['activity_cursors'] = [None]
+    
+    pages = []
+    next_cursor = None
+    for cursor in st.session_state['activity_cursors']:
+        page, next_cursor = get_delegate_activity_log(stream_filter, created_from, created_to, cursor)
+        pages.append(page)
+    df_filtered_activity = pd.concat(pages, ignore_index=True) if pages else pd.DataFrame()
+    
+    if df_filtered_activity.empty:
+        st.warning("Aucune donnée de session trouvée pour ces filtres.")
+    else:
+        st.metric(
+            "Total de sessions affichées", 
+            len(df_filtered_activity), 
+            f"Dernière mise à jour : {datetime.now().strftime('%H:%M:%S')}"
+        )
+        
+        # Affichage de la traçabilité complète
+        st.dataframe(
+            df_filtered_activity,
+            column_order=[
+                "Délégué_Responsable", 
+                "Date_Remplissage_Reelle",
+                "Heure_Remplissage_Reelle", 
+                "Matière", 
+                "Date_Session_Prévue",
+                "Statut_Session"
+            ],
+            column_config={
+                "Heure_Remplissage_Reelle": st.column_config.TimeColumn("Heure Remplissage", format="HH:mm:ss"),
+                "Date_Remplissage_Reelle": st.column_config.DateColumn("Date Remplissage", format="DD/MM/YYYY"),
+                "Date_Session_Prévue": st.column_config.DateColumn("Date Session Prévue", format="DD/MM/YYYY"),
+                "Délégué_Responsable": st.column_config.TextColumn("Délégué (Filière)")
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+        
+        if next_cursor is not None:
+            if st.button("⬇️ Charger les sessions plus anciennes", key="activity_more", use_container_width=True):
+                st.session_state['activity_cursors'].append(next_cursor)
+                st.rerun(scope="fragment")
+        else:
+            st.caption("Fin de l'historique pour ces filtres.")
+
+
+# Chaque onglet est un fragment : une interaction n'y réexécute que l'onglet concerné
+with tab_etudiant:
+    student_management_tab()
+with tab_export:
+    export_tab()
+with tab_autres:
+    maintenance_tab()
+with tab_activite:
+    activity_tab()